@@ -28,14 +28,27 @@ from .hotstring import *  # noqa: F401 F403
 from .key_state import *  # noqa: F401 F403
 from .menu import *  # noqa: F401 F403
 from .message_box import *  # noqa: F401 F403
+from .monitor import *  # noqa: F401 F403
 from .mouse import *  # noqa: F401 F403
+from .process_info import *  # noqa: F401 F403
 from .remap_key import *  # noqa: F401 F403
 from .sending import *  # noqa: F401 F403
 from .settings import *  # noqa: F401 F403
+from .text_insertion import *  # noqa: F401 F403
+from .text_watcher import *  # noqa: F401 F403
 from .timer import *  # noqa: F401 F403
 from .tooltip import *  # noqa: F401 F403
 from .window import *  # noqa: F401 F403
+from .window_events import *  # noqa: F401 F403
+from .window_index import *  # noqa: F401 F403
+from .window_layout import *  # noqa: F401 F403
 from .window_message import *  # noqa: F401 F403
+from .window_query import *  # noqa: F401 F403
+from .window_spatial import *  # noqa: F401 F403
+
+from . import actions  # noqa: F401
+from . import keys  # noqa: F401
+from . import profiling  # noqa: F401
 
 # Override modules with functions
 hotkey = default_context.hotkey  # noqa: F405
@@ -0,0 +1,192 @@
+import dataclasses as dc
+from typing import Optional, Tuple, Union
+
+from .flow import ahk_call, global_ahk_lock, _clear_thread_settings
+from .settings import get_settings, optional_ms
+from .sending import _get_send_mode
+from .window import Window, Windows
+
+__all__ = [
+    "Action",
+    "ActivateWindow",
+    "Run",
+    "Send",
+    "Sequence",
+]
+
+
+class Action:
+    """The base class of the actions."""
+
+    __slots__ = ()
+
+    def compile(self) -> Tuple[Tuple[str, ...], ...]:
+        """Compile the action into the AHK commands.
+
+        Returns the tuple of the steps. Each step is a tuple of the command
+        name followed by its arguments.
+        """
+        raise NotImplementedError
+
+    def __call__(self):
+        """Run the action from Python."""
+        data, lengths = _encode(self.compile())
+        with global_ahk_lock:
+            try:
+                ahk_call("RunAction", data, lengths)
+            finally:
+                # The steps change the settings of the current AHK thread.
+                _clear_thread_settings()
+
+
+@dc.dataclass(frozen=True)
+class Send(Action):
+    """Send(keys: str, *, mode=None, **options)
+
+    The action that sends the *keys*.
+
+    For the arguments refer to :func:`~ahkpy.send`.
+    """
+
+    keys: str
+    mode: Optional[str]
+    level: Optional[int]
+    key_delay: Optional[float]
+    key_duration: Optional[float]
+    mouse_delay: Optional[float]
+    __slots__ = ("keys", "mode", "level", "key_delay", "key_duration", "mouse_delay")
+
+    def __init__(self, keys: str, *, mode=None, level=None, key_delay=None, key_duration=None, mouse_delay=None):
+        object.__setattr__(self, "keys", keys)
+        object.__setattr__(self, "mode", mode)
+        object.__setattr__(self, "level", level)
+        object.__setattr__(self, "key_delay", key_delay)
+        object.__setattr__(self, "key_duration", key_duration)
+        object.__setattr__(self, "mouse_delay", mouse_delay)
+
+    def compile(self):
+        mode = _get_send_mode(self.mode, self.key_delay, self.key_duration, self.mouse_delay)
+        if mode not in {"input", "event", "play"}:
+            raise ValueError(f"{mode!r} is not a valid send mode")
+        settings = get_settings()
+        level = self.level
+        if level is None:
+            level = settings.send_level
+        elif not 0 <= level <= 100:
+            raise ValueError("level must be between 0 and 100")
+        if mode == "play":
+            defaults = (settings.key_delay_play, settings.key_duration_play, settings.mouse_delay_play)
+        else:
+            defaults = (settings.key_delay, settings.key_duration, settings.mouse_delay)
+        delays = (
+            optional_ms(value if value is not None else default)
+            for value, default in zip((self.key_delay, self.key_duration, self.mouse_delay), defaults)
+        )
+        return (("Send", mode, str(int(level)), *map(str, delays), str(self.keys)),)
+
+
+@dc.dataclass(frozen=True)
+class ActivateWindow(Action):
+    """ActivateWindow(windows: Union[ahkpy.Windows, ahkpy.Window])
+
+    The action that activates the first window matching the *windows*
+    criteria, or the given :class:`~ahkpy.Window`.
+
+    The :class:`~ahkpy.WindowQuery` criteria are evaluated in Python, so they
+    cannot be used in actions.
+    """
+
+    windows: Union[Windows, Window]
+    __slots__ = ("windows",)
+
+    def compile(self):
+        windows = self.windows
+        if isinstance(windows, Window):
+            if not windows.id:
+                raise ValueError("cannot activate a nonexistent window")
+            windows = Windows(id=windows.id).include_hidden_windows()
+        elif not isinstance(windows, Windows):
+            raise TypeError(f"windows must be a Windows or Window instance, not {type(windows).__name__}")
+        if None in (windows.title, windows.class_name, windows.id, windows.pid, windows.exe, windows.text):
+            raise ValueError("the windows criteria match no windows")
+        try:
+            title_mode = _TITLE_MATCH_MODES[windows.title_mode]
+        except KeyError:
+            raise ValueError(f"{windows.title_mode!r} is not a valid title match mode") from None
+        if windows.text_mode not in {"fast", "slow"}:
+            raise ValueError(f"{windows.text_mode!r} is not a valid text match mode")
+        return ((
+            "WinActivate",
+            "On" if windows.hidden_windows else "Off",
+            "On" if windows.hidden_text else "Off",
+            title_mode,
+            windows.text_mode,
+            str(optional_ms(get_settings().win_delay)),
+            *windows._query(),
+        ),)
+
+
+@dc.dataclass(frozen=True)
+class Run(Action):
+    """Run(target: str, working_dir: str = None)
+
+    The action that runs the *target* program, document, or URL in the
+    *working_dir*.
+
+    :command: `Run <https://www.autohotkey.com/docs/commands/Run.htm>`_
+    """
+
+    target: str
+    working_dir: Optional[str]
+    __slots__ = ("target", "working_dir")
+
+    def __init__(self, target: str, working_dir: str = None):
+        object.__setattr__(self, "target", target)
+        object.__setattr__(self, "working_dir", working_dir)
+
+    def compile(self):
+        if not self.target:
+            raise ValueError("target must not be blank")
+        return (("Run", str(self.target), str(self.working_dir or "")),)
+
+
+@dc.dataclass(frozen=True)
+class Sequence(Action):
+    """Sequence(*actions: ahkpy.actions.Action)
+
+    The action that runs the *actions* one after another.
+    """
+
+    actions: Tuple[Action, ...]
+    __slots__ = ("actions",)
+
+    def __init__(self, *actions):
+        for action in actions:
+            if not isinstance(action, Action):
+                raise TypeError(f"{action!r} is not an action")
+        object.__setattr__(self, "actions", actions)
+
+    def compile(self):
+        return tuple(step for action in self.actions for step in action.compile())
+
+
+_TITLE_MATCH_MODES = {
+    "startswith": "1",
+    "contains": "2",
+    "exact": "3",
+    "regex": "RegEx",
+}
+
+
+def _encode(steps):
+    # Encode the steps for _ParseAction in AHK: the concatenated strings, and
+    # the number of strings in every step followed by their lengths.
+    data = []
+    lengths = []
+    for step in steps:
+        lengths.append(len(step))
+        for value in step:
+            data.append(value)
+            # AHK counts the UTF-16 code units.
+            lengths.append(len(value.encode("utf-16-le")) // 2)
+    return "".join(data), ",".join(map(str, lengths))
@@ -0,0 +1,234 @@
+import asyncio
+import functools
+import sys
+import time
+
+from . import flow
+from .clipboard import get_clipboard
+from .key_state import is_key_pressed, is_key_pressed_logical
+from .window import Window, Windows, all_windows
+
+__all__ = [
+    "AHKEventLoop",
+    "AHKEventLoopPolicy",
+    "wait_clipboard",
+    "wait_key_pressed",
+    "wait_key_pressed_logical",
+    "wait_key_released",
+    "wait_key_released_logical",
+    "wait_window",
+    "wait_window_active",
+    "wait_window_close",
+    "wait_window_inactive",
+]
+
+
+class _AHKEventLoopMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Both the selector and the proactor event loops wait for I/O in
+        # self._selector.select().
+        self._selector = _PollingSelector(self._selector, self)
+
+
+class AHKSelectorEventLoop(_AHKEventLoopMixin, asyncio.SelectorEventLoop):
+    """The selector event loop that polls the AHK message queue while it's
+    waiting for I/O.
+    """
+
+
+if sys.platform == "win32":
+    class AHKProactorEventLoop(_AHKEventLoopMixin, asyncio.ProactorEventLoop):
+        """The proactor event loop that polls the AHK message queue while it's
+        waiting for I/O.
+        """
+
+    AHKEventLoop = AHKProactorEventLoop
+else:
+    AHKEventLoop = AHKSelectorEventLoop
+
+
+class AHKEventLoopPolicy(asyncio.DefaultEventLoopPolicy):
+    """The event loop policy that creates the :class:`AHKEventLoop` instances.
+
+    While the loop is idle, it waits for I/O in short slices and lets AHK
+    process its message queue between them, so hotkeys and other callbacks
+    keep working. When the loop is busy, AHK is polled at most once per 10 ms.
+    The I/O events wake the loop as soon as they arrive::
+
+        import asyncio
+        import ahkpy
+
+        asyncio.set_event_loop_policy(ahkpy.asyncio.AHKEventLoopPolicy())
+        asyncio.run(main())
+    """
+
+    def new_event_loop(self):
+        return AHKEventLoop()
+
+
+class _PollingSelector:
+    def __init__(self, selector, loop):
+        self._selector = selector
+        self._loop = loop
+        self._last_poll = float("-inf")
+
+    def __getattr__(self, name):
+        return getattr(self._selector, name)
+
+    def select(self, timeout=None):
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        while True:
+            if deadline is None:
+                slice_timeout = flow._poll_interval
+            else:
+                slice_timeout = min(flow._poll_interval, max(0, deadline - time.monotonic()))
+            event_list = self._selector.select(slice_timeout)
+
+            now = time.monotonic()
+            idle = not event_list and slice_timeout > 0
+            if idle or now - self._last_poll >= flow._poll_interval:
+                self._last_poll = now
+                flow.poll()
+            if event_list or _may_have_ready_callbacks(self._loop):
+                # Either there's I/O or an AHK callback has scheduled a
+                # callback with loop.call_soon().
+                return event_list
+            if deadline is not None and now >= deadline:
+                return event_list
+
+
+def _may_have_ready_callbacks(loop):
+    # asyncio has no public way to check if a callback was scheduled with
+    # loop.call_soon() during the select. BaseEventLoop keeps them in the
+    # _ready deque. If it's gone, return after every slice, which delays the
+    # callbacks by no more than a slice.
+    ready = getattr(loop, "_ready", None)
+    if ready is None:
+        return True
+    return bool(ready)
+
+
+async def wait_window(windows: Windows, *, timeout=None) -> Window:
+    """Wait until the window matching the *windows* criteria exists and return
+    it.
+
+    The awaitable counterpart of :meth:`Windows.wait`.
+    """
+    return await _wait_for(timeout, windows.exist, key=("exist", windows)) or Window(None)
+
+
+async def wait_window_active(windows, *, timeout=None):
+    """Wait until the window is active.
+
+    If *windows* is a :class:`Windows` instance, returns the active window like
+    :meth:`Windows.wait_active`. If *windows* is a :class:`Window` instance,
+    returns ``True`` if the window is active like :meth:`Window.wait_active`.
+    """
+    if isinstance(windows, Window):
+        return bool(await wait_window_active(all_windows.filter(id=windows.id), timeout=timeout))
+    if windows._query() == ("", "", "", ""):
+        windows = windows.filter("A")
+    return await _wait_for(timeout, windows.get_active, key=("get_active", windows)) or Window(None)
+
+
+async def wait_window_inactive(windows, *, timeout=None) -> bool:
+    """Wait until there are no matching active windows.
+
+    The awaitable counterpart of :meth:`Windows.wait_inactive` and
+    :meth:`Window.wait_inactive`.
+    """
+    if isinstance(windows, Window):
+        windows = all_windows.filter(id=windows.id)
+    return await _wait_for(timeout, windows.get_active, key=("get_active", windows), negate=True) or False
+
+
+async def wait_window_close(windows, *, timeout=None) -> bool:
+    """Wait until there are no matching windows.
+
+    The awaitable counterpart of :meth:`Windows.wait_close` and
+    :meth:`Window.wait_close`.
+    """
+    if isinstance(windows, Window):
+        windows = all_windows.filter(id=windows.id)
+    return await _wait_for(timeout, windows.exist, key=("exist", windows), negate=True) or False
+
+
+async def wait_key_pressed(key_name, timeout: float = None) -> bool:
+    """The awaitable counterpart of :func:`ahkpy.wait_key_pressed`."""
+    return await _wait_for(timeout, functools.partial(is_key_pressed, key_name), key=("P", key_name)) or False
+
+
+async def wait_key_released(key_name, timeout: float = None) -> bool:
+    """The awaitable counterpart of :func:`ahkpy.wait_key_released`."""
+    return await _wait_for(
+        timeout, functools.partial(is_key_pressed, key_name), key=("P", key_name), negate=True,
+    ) or False
+
+
+async def wait_key_pressed_logical(key_name, timeout: float = None) -> bool:
+    """The awaitable counterpart of :func:`ahkpy.wait_key_pressed_logical`."""
+    return await _wait_for(timeout, functools.partial(is_key_pressed_logical, key_name), key=("", key_name)) or False
+
+
+async def wait_key_released_logical(key_name, timeout: float = None) -> bool:
+    """The awaitable counterpart of :func:`ahkpy.wait_key_released_logical`."""
+    return await _wait_for(
+        timeout, functools.partial(is_key_pressed_logical, key_name), key=("", key_name), negate=True,
+    ) or False
+
+
+async def wait_clipboard(timeout: float = None) -> str:
+    """The awaitable counterpart of :func:`ahkpy.wait_clipboard`."""
+    return await _wait_for(timeout, get_clipboard, key="get_clipboard") or ""
+
+
+async def _wait_for(secs, check_fn, *, key=None, negate=False):
+    # The awaitable counterpart of ahkpy.flow._wait_for(). The waits are
+    # checked by the shared wait scheduler, so the concurrent waits for the
+    # same key, blocking or not, share the check_fn() calls.
+    if secs is None:
+        secs = float("inf")
+    if secs < 0:
+        raise ValueError("sleep length must be non-negative")
+    if flow._pending_send is not None:
+        flow._pending_send.flush()
+
+    scheduler = flow._wait_scheduler
+    waiter = flow._Waiter(flow._max_interval(secs), scheduler.clock())
+    waiter.event = _AsyncEvent(asyncio.get_running_loop())
+    steps = scheduler.wait_steps(secs, check_fn, key, negate, waiter, True)
+    try:
+        while True:
+            timeout = next(steps)
+            await waiter.event.wait(timeout)
+            waiter.event.clear()
+    except StopIteration as stop:
+        return stop.value
+    finally:
+        steps.close()
+
+
+class _AsyncEvent:
+    # The waiter event for a coroutine. The scheduler may set it from another
+    # thread that runs the tick.
+
+    def __init__(self, loop):
+        self._loop = loop
+        self._future = loop.create_future()
+
+    def set(self):
+        self._loop.call_soon_threadsafe(self._set_result)
+
+    def _set_result(self):
+        if not self._future.done():
+            self._future.set_result(None)
+
+    def clear(self):
+        if self._future.done():
+            self._future = self._loop.create_future()
+
+    async def wait(self, timeout):
+        await asyncio.wait([self._future], timeout=timeout)
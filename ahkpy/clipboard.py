@@ -42,7 +42,7 @@ def wait_clipboard(timeout: float = None) -> str:
        <https://www.autohotkey.com/docs/commands/ClipWait.htm>`_
     """
     # TODO: Implement WaitForAnyData argument.
-    return _wait_for(timeout, get_clipboard) or ""
+    return _wait_for(timeout, get_clipboard, key="get_clipboard") or ""
 
 
 def on_clipboard_change(func: Callable = None, *args, prepend_handler=False):
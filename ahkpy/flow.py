@@ -1,3 +1,4 @@
+import contextvars
 import ctypes
 import functools
 import inspect
@@ -5,10 +6,12 @@ import queue
 import sys
 import threading
 import time
+from typing import NamedTuple
 
 import _ahk
 
 __all__ = [
+    "batch",
     "coop",
     "output_debug",
     "poll",
@@ -28,6 +31,152 @@ def ahk_call(cmd: str, *args):
 
     Use this function when there's no appropriate AutoHotkey.py API.
     """
+    if _profiler is not None:
+        return _profiler.ahk_call(_ahk_call, cmd, args)
+    return _ahk_call(cmd, args)
+
+
+def _ahk_call(cmd, args):
+    if _pending_send is not None:
+        _pending_send.flush()
+    if cmd in _THREAD_SETTING_COMMANDS:
+        return _ahk_call_setting(cmd, args)
+    batch = _current_batch.get(None)
+    if batch is not None:
+        return batch._ahk_call(cmd, args)
+    if cmd.__class__ is Command:
+        cmd = cmd.id
+    _acquire_ahk_lock()
+    try:
+        return _ahk.call(cmd, *args)
+    finally:
+        global_ahk_lock.release()
+
+
+def command(name: str) -> "Command":
+    """command(name: str) -> ahkpy.flow.Command
+
+    Get the handle of the AHK command/function *name*.
+
+    The name is looked up in AHK only once, and the same handle is returned for
+    the same *name*. Calling the handle skips the name lookup::
+
+        win_get_pos = ahkpy.flow.command("WinGetPos")
+        pos = win_get_pos("A")
+
+    The handle is a :class:`str` subclass, so it can be used wherever a command
+    name is accepted, e.g. in :func:`ahk_call` and :func:`ahk_call_many`.
+
+    :raises Error: if AHK has no such command/function.
+    """
+    cmd = _commands.get(name)
+    if cmd is not None:
+        return cmd
+    if not isinstance(name, str):
+        raise TypeError(f"command name must be a string, not {name.__class__.__name__}")
+    _acquire_ahk_lock()
+    try:
+        cmd = _commands.get(name)
+        if cmd is None:
+            cmd = _commands[name] = Command(name, _ahk.resolve(name))
+        return cmd
+    finally:
+        global_ahk_lock.release()
+
+
+class Command(str):
+    """The handle of the AHK command/function returned by :func:`command`."""
+
+    __slots__ = ("id",)
+
+    def __new__(cls, name, command_id):
+        self = super().__new__(cls, name)
+        #: The id of the command in the AHK command table.
+        self.id = command_id
+        return self
+
+    def __call__(self, *args):
+        """Call the command with *args* arguments."""
+        return ahk_call(self, *args)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({str(self)!r})"
+
+
+_commands = {}
+
+# The ahkpy.profiling._Profiler instance when profiling is enabled.
+_profiler = None
+
+# The ahkpy.sending._PendingSend instance when the keys collected by a send
+# buffer are waiting to be sent. It's flushed before any other AHK call.
+_pending_send = None
+
+
+def ahk_call_many(calls):
+    """Call several AHK commands/functions in a single call to AHK.
+
+    The *calls* argument is an iterable of ``(cmd, *args)`` tuples. The commands
+    are executed in order. Returns the list of the command results. If one of
+    the commands raises an :exc:`Error`, the rest of the commands are not
+    executed and the error is raised.
+
+    Use this function to reduce the overhead of calling many AHK commands one
+    by one::
+
+        ahkpy.flow.ahk_call_many([
+            ("SetTitleMatchMode", 2),
+            ("WinExist", "Notepad"),
+        ])
+    """
+    calls = [_check_call(call) for call in calls]
+    if _profiler is not None:
+        return _profiler.ahk_call(_ahk_call_many_in_batch, "ahk_call_many", calls)
+    return _ahk_call_many_in_batch("ahk_call_many", calls)
+
+
+def _ahk_call_many_in_batch(_, calls):
+    if _pending_send is not None:
+        _pending_send.flush()
+    batch = _current_batch.get(None)
+    if batch is not None:
+        return batch._ahk_call_many(calls)
+    return _ahk_call_many(calls)
+
+
+def _ahk_call_many(calls):
+    if not calls:
+        return []
+    _acquire_ahk_lock()
+    try:
+        # The setting commands may be executed only partially if an error
+        # occurs. Remember the values optimistically and forget all of them on
+        # error.
+        for cmd, *args in calls:
+            if cmd in _THREAD_SETTING_COMMANDS:
+                key, value = _thread_setting(cmd, args)
+                _thread_settings[key] = value
+        if len(calls) == 1:
+            cmd, *args = calls[0]
+            return [_ahk.call(cmd, *args)]
+        return list(_ahk.call_many(tuple(calls)))
+    except BaseException:
+        _clear_thread_settings()
+        raise
+    finally:
+        global_ahk_lock.release()
+
+
+def _check_call(call):
+    call = tuple(call)
+    if not call:
+        raise ValueError("call must contain the command name")
+    if not isinstance(call[0], str):
+        raise TypeError(f"command name must be a string, not {call[0].__class__.__name__}")
+    return call
+
+
+def _acquire_ahk_lock():
     locked = global_ahk_lock.acquire(timeout=1)
     if not locked:
         if threading.current_thread() is threading.main_thread():
@@ -39,12 +188,211 @@ def ahk_call(cmd: str, *args):
             err._ahk_silent_exc = True
             raise err
         global_ahk_lock.acquire()
+
+
+def batch():
+    """batch() -> ahkpy.flow.Batch
+
+    Return a context manager that groups AHK calls of the current thread so
+    that they are sent to AHK together.
+
+    Inside the with-statement, the commands that change AHK thread settings,
+    e.g. ``SendLevel`` or ``SetTitleMatchMode``, are deferred and sent to AHK
+    along with the next command that returns a value. Thus, a single
+    :meth:`Window.send` or :meth:`Windows.first` call makes one call to AHK
+    instead of several. The commands queued with :meth:`Batch.call` are also
+    sent together, and their results are stored in :attr:`Batch.results`::
+
+        with ahkpy.batch() as b:
+            b.call("WinGetTitle", "ahk_class Notepad")
+            b.call("WinGetClass", "A")
+        title, class_name = b.results
+
+    The global AutoHotkey lock is held while the batch is active. The queued
+    commands are sent on exit from the with-statement unless an exception
+    occurs, in which case they are discarded.
+    """
+    return Batch()
+
+
+class Batch:
+    """The context manager that collects AHK calls and sends them to AHK in a
+    single call.
+
+    Use the :func:`batch` function to create the batch.
+    """
+
+    def __init__(self):
+        #: The list of results of the commands queued with :meth:`call`.
+        self.results = []
+        self._pending = []
+        self._token = None
+
+    def __enter__(self):
+        _acquire_ahk_lock()
+        outer_batch = _current_batch.get(None)
+        if outer_batch is not None:
+            # Keep the order of the commands.
+            outer_batch.flush()
+        self._token = _current_batch.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        try:
+            if exc_type is None:
+                self.flush()
+            elif self._pending:
+                self._pending.clear()
+                # The discarded setting commands are already remembered as
+                # applied.
+                _clear_thread_settings()
+        finally:
+            _current_batch.reset(self._token)
+            self._token = None
+            global_ahk_lock.release()
+
+    def call(self, cmd: str, *args):
+        """Queue the AHK command *cmd* with *args* arguments.
+
+        The result of the command will be appended to :attr:`results` once the
+        command is sent to AHK.
+        """
+        self._pending.append((_check_call((cmd, *args)), True))
+
+    def flush(self):
+        """Send the queued commands to AHK.
+
+        Returns :attr:`results`.
+        """
+        if self._pending:
+            self._send()
+        return self.results
+
+    def _ahk_call(self, cmd, args):
+        self._pending.append(((cmd, *args), False))
+        if cmd in _THREAD_SETTING_COMMANDS:
+            # It's safe to delay the setting commands until the next command
+            # that returns a value.
+            return None
+        return self._send()[-1]
+
+    def _ahk_call_many(self, calls):
+        if not calls:
+            return []
+        self._pending.extend((call, False) for call in calls)
+        return self._send()[-len(calls):]
+
+    def _send(self):
+        pending, self._pending = self._pending, []
+        results = _ahk_call_many([call for call, _ in pending])
+        self.results.extend(
+            result
+            for (_, explicit), result in zip(pending, results)
+            if explicit
+        )
+        return results
+
+
+_current_batch = contextvars.ContextVar("ahk_batch")
+
+
+class SettingsCacheInfo(NamedTuple):
+    """The statistics of the AHK thread settings cache returned by
+    :func:`settings_cache_info`.
+    """
+
+    #: The number of setting commands that were sent to AHK.
+    applied: int
+
+    #: The number of setting commands that were skipped because the setting
+    #: already had the requested value.
+    skipped: int
+
+
+def settings_cache_info() -> SettingsCacheInfo:
+    """Get the statistics of the AHK thread settings cache.
+
+    Commands like ``SetTitleMatchMode``, ``DetectHiddenWindows``, ``SendLevel``,
+    ``SetKeyDelay``, and ``CoordMode`` are sent to AHK before many AutoHotkey.py
+    calls. AutoHotkey.py remembers the values applied in the current AHK thread
+    and skips the command if the setting already has the requested value. The
+    remembered values are forgotten when a callback starts or ends because AHK
+    runs callbacks in new threads with their own settings.
+
+    Returns a :class:`SettingsCacheInfo` tuple.
+    """
+    return SettingsCacheInfo(_settings_applied, _settings_skipped)
+
+
+def _ahk_call_setting(cmd, args):
+    global _settings_applied, _settings_skipped
+    key, value = _thread_setting(cmd, args)
+    batch = _current_batch.get(None)
+    _acquire_ahk_lock()
     try:
-        return _ahk.call(cmd, *args)
+        if _thread_settings.get(key, _MISSING) == value:
+            _settings_skipped += 1
+            return ""
+        if batch is not None:
+            # The command is deferred until the batch is sent. If the batch
+            # fails, _ahk_call_many() forgets the settings.
+            result = batch._ahk_call(cmd, args)
+        else:
+            result = _ahk.call(cmd, *args)
+        _thread_settings[key] = value
+        _settings_applied += 1
+        return result
     finally:
         global_ahk_lock.release()
 
 
+def _thread_setting(cmd, args):
+    # Split the command arguments into the key that names the setting and the
+    # value of the setting. Calling the same setting command twice with the
+    # same arguments doesn't change anything, so the value may contain empty
+    # strings that keep the current AHK value.
+    if cmd == "CoordMode":
+        return (cmd, _setting_key(args[:1])), args[1:]
+    elif cmd == "SetKeyDelay":
+        return (cmd, _setting_key(args[2:])), args[:2]
+    elif cmd == "SetMouseDelay":
+        return (cmd, _setting_key(args[1:])), args[:1]
+    elif cmd == "SetTitleMatchMode" and _setting_key(args[:1]) in {("fast",), ("slow",)}:
+        return (cmd, "speed"), _setting_key(args)
+    return (cmd, ()), args
+
+
+def _setting_key(args):
+    return tuple(str(arg).lower() for arg in args)
+
+
+def _clear_thread_settings():
+    _thread_settings.clear()
+
+
+# The commands that change the settings of the current AHK thread and return
+# nothing. The values applied by these commands are remembered in
+# _thread_settings.
+_THREAD_SETTING_COMMANDS = {
+    "CoordMode",
+    "DetectHiddenText",
+    "DetectHiddenWindows",
+    "SendLevel",
+    "SendMode",
+    "SetControlDelay",
+    "SetDefaultMouseSpeed",
+    "SetKeyDelay",
+    "SetMouseDelay",
+    "SetTitleMatchMode",
+    "SetWinDelay",
+}
+
+_thread_settings = {}
+_settings_applied = 0
+_settings_skipped = 0
+_MISSING = object()
+
+
 def sleep(secs):
     """Suspend execution of the calling thread for the given number of seconds.
 
@@ -58,29 +406,250 @@ def sleep(secs):
     _wait_for(secs, None)
 
 
-def _wait_for(secs, check_fn):
+def _wait_for(secs, check_fn, *, key=None, negate=False):
+    # Wait until check_fn() returns a true value and return it. If negate is
+    # true, wait until check_fn() returns a false value and return True. The
+    # waits with the same key share the check_fn() calls.
     if secs is None:
         secs = float("inf")
 
+    if _pending_send is not None:
+        _pending_send.flush()
     if secs < 0:
         raise ValueError("sleep length must be non-negative")
     elif secs <= _poll_interval:
         time.sleep(secs)
         poll()
-        return check_fn and check_fn()
+        if check_fn is None:
+            return None
+        return _check_wait_result(check_fn(), negate)
     else:
-        stop = time.perf_counter() + secs
-        while time.perf_counter() < stop:
-            time.sleep(_poll_interval)
-            poll()
-            result = check_fn and check_fn()
-            if result:
-                return result
+        return _wait_scheduler.wait(secs, check_fn, key, negate)
+
+
+def _check_wait_result(value, negate):
+    if negate:
+        return not value
+    return value
 
 
 # The interval between AHK message queue polls during the blocking operations.
 _poll_interval = 0.01
 
+# The maximum interval between the checks of the condition that doesn't
+# change for a long time.
+_max_check_interval = 0.05
+
+
+class _WaitScheduler:
+    # The scheduler multiplexes all pending waits into a single loop that polls
+    # AHK once per tick. The waiters check their conditions in turns: one of
+    # them runs the tick and evaluates the due queries for everyone else. The
+    # main thread is preferred because only it can raise KeyboardInterrupt
+    # while AHK is polled.
+    #
+    # The waits with the same key share a single query. If the query result
+    # doesn't change, the query is checked less often. When the result
+    # changes, the waiters of the query are woken up.
+
+    def __init__(self, clock=time.perf_counter, wait=None, poll=None):
+        self.clock = clock
+        self.wait_event = wait or _wait_event
+        self.poll = poll or _poll
+        self.lock = threading.Lock()
+        # The tick lock is reentrant because AHK may call a callback that
+        # waits for something while the tick polls AHK.
+        self.tick_lock = threading.RLock()
+        self.entries = {}
+        self.main_thread_waiting = False
+        self.next_tick = 0
+
+    def wait(self, secs, query, key, negate):
+        is_main_thread = threading.current_thread() is threading.main_thread()
+        waiter = _Waiter(_max_interval(secs), self.clock())
+        if is_main_thread:
+            with self.lock:
+                prev_main_thread_waiting = self.main_thread_waiting
+                self.main_thread_waiting = True
+        steps = self.wait_steps(secs, query, key, negate, waiter, is_main_thread)
+        try:
+            while True:
+                timeout = next(steps)
+                self.wait_event(waiter.event, timeout)
+                waiter.event.clear()
+        except StopIteration as stop:
+            return stop.value
+        finally:
+            steps.close()
+            if is_main_thread:
+                with self.lock:
+                    self.main_thread_waiting = prev_main_thread_waiting
+
+    def wait_steps(self, secs, query, key, negate, waiter, always_tick):
+        # Yield the timeouts for waiting on waiter.event between the checks and
+        # return the result of the wait. The caller resumes the generator when
+        # the event is set or the timeout expires. This lets the asyncio waits
+        # share the scheduler with the blocking ones.
+        now = waiter.since
+        deadline = now + secs
+        entry = None
+        if query is not None:
+            with self.lock:
+                entry = self._register(query, key, waiter)
+        try:
+            while True:
+                if always_tick or not self.main_thread_waiting:
+                    self._tick(now)
+                # Skip the values checked before the wait started.
+                if entry is not None and entry.version != waiter.version and entry.checked_at >= waiter.since:
+                    waiter.version = entry.version
+                    if entry.error is not None:
+                        raise entry.error
+                    result = _check_wait_result(entry.value, negate)
+                    if result:
+                        return result
+
+                now = self.clock()
+                if now >= deadline:
+                    break
+                timeout = min(deadline, max(self.next_tick, now + _poll_interval / 10)) - now
+                if timeout > 0:
+                    yield timeout
+                now = self.clock()
+
+            if entry is None:
+                return None
+            # Check the condition at the deadline unless it has just been
+            # checked.
+            if entry.checked_at < deadline:
+                with self.tick_lock:
+                    if entry.checked_at < deadline:
+                        self._evaluate(entry, self.clock())
+            if entry.error is not None:
+                raise entry.error
+            return _check_wait_result(entry.value, negate)
+        finally:
+            if entry is not None:
+                with self.lock:
+                    self._unregister(entry, waiter)
+
+    def _register(self, query, key, waiter):
+        if key is None:
+            key = waiter
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self.entries[key] = _WaitEntry(query, contextvars.copy_context())
+        else:
+            # The cached value may be a tick old. Check the query on the next
+            # tick for the new waiter.
+            entry.next_check = float("-inf")
+        entry.waiters.add(waiter)
+        entry.max_interval = min(entry.max_interval, waiter.max_interval)
+        waiter.key = key
+        return entry
+
+    def _unregister(self, entry, waiter):
+        entry.waiters.discard(waiter)
+        if entry.waiters:
+            entry.max_interval = min(w.max_interval for w in entry.waiters)
+        elif self.entries.get(waiter.key) is entry:
+            del self.entries[waiter.key]
+
+    def _tick(self, now):
+        if now < self.next_tick:
+            return
+        if not self.tick_lock.acquire(blocking=False):
+            # Another waiter is running the tick.
+            return
+        try:
+            now = self.clock()
+            if now < self.next_tick:
+                return
+            self.next_tick = now + _poll_interval
+            self.poll()
+            with self.lock:
+                due = [entry for entry in self.entries.values() if entry.next_check <= now]
+            for entry in due:
+                self._evaluate(entry, now)
+        finally:
+            self.tick_lock.release()
+
+    def _evaluate(self, entry, now):
+        try:
+            value = entry.context.run(entry.query)
+        except Exception as err:
+            value, error = None, err
+        else:
+            error = None
+
+        changed = entry.version == 0 or error is not None or value != entry.value
+        entry.checked_at = now
+        with self.lock:
+            waiters = list(entry.waiters)
+        if changed:
+            entry.value = value
+            entry.error = error
+            entry.version += 1
+            entry.interval = _poll_interval
+        else:
+            entry.interval = min(entry.interval * 1.5, entry.max_interval)
+        for waiter in waiters:
+            # Also wake the waiters that haven't seen the unchanged value.
+            if waiter.version != entry.version:
+                waiter.event.set()
+        if any(waiter.since > now for waiter in waiters):
+            # A waiter joined while the query was running.
+            entry.next_check = float("-inf")
+        else:
+            entry.next_check = now + entry.interval
+
+
+class _WaitEntry:
+    __slots__ = (
+        "query", "context", "waiters", "value", "error", "version", "checked_at", "next_check", "interval",
+        "max_interval",
+    )
+
+    def __init__(self, query, context):
+        self.query = query
+        self.context = context
+        self.waiters = set()
+        self.value = None
+        self.error = None
+        self.version = 0
+        self.checked_at = float("-inf")
+        self.next_check = float("-inf")
+        self.interval = _poll_interval
+        self.max_interval = _max_check_interval
+
+
+class _Waiter:
+    __slots__ = ("event", "max_interval", "since", "version", "key")
+
+    def __init__(self, max_interval, since=float("-inf")):
+        self.event = threading.Event()
+        self.max_interval = max_interval
+        self.since = since
+        self.version = 0
+        self.key = None
+
+
+def _max_interval(secs):
+    # Back off the checks only for long waits. A wait is checked at least 100
+    # times before the timeout.
+    return max(_poll_interval, min(_max_check_interval, secs / 100))
+
+
+def _wait_event(event, timeout):
+    return event.wait(timeout)
+
+
+def _poll():
+    poll()
+
+
+_wait_scheduler = _WaitScheduler()
+
 
 def poll():
     """Make AHK check its the message queue.
@@ -215,11 +784,33 @@ def _run_coop(queue, func, args, kwargs):
 def void(func):
     """Create a wrapper that calls *func* and returns nothing."""
     def void_wrapper(*args):
-        func(*args)
+        _clear_thread_settings()
+        try:
+            func(*args)
+        finally:
+            _clear_thread_settings()
     return void_wrapper
 
 
 def _wrap_callback(func, arg_names, bare_cb, keyword_cb):
+    return _thread_callback(_bind_callback(func, arg_names, bare_cb, keyword_cb))
+
+
+def _thread_callback(callback):
+    # AHK calls the callback in a new AHK thread that starts with the default
+    # settings. When the callback returns, AHK restores the settings of the
+    # interrupted thread. Forget the remembered settings in both cases.
+    @functools.wraps(callback)
+    def thread_wrapper(*args):
+        _clear_thread_settings()
+        try:
+            return callback(*args)
+        finally:
+            _clear_thread_settings()
+    return thread_wrapper
+
+
+def _bind_callback(func, arg_names, bare_cb, keyword_cb):
     try:
         signature = inspect.signature(func)
     except ValueError:
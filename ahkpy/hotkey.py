@@ -61,6 +61,9 @@ def hotkey(
         <https://www.autohotkey.com/docs/commands/_InputLevel.htm>`_ of the
         hotkey. Defaults to 0.
 
+    If *func* is an :class:`ahkpy.actions.Action`, it's compiled into AHK
+    commands and the hotkey runs without calling Python.
+
     If *func* is given, returns an instance of :class:`Hotkey`. Otherwise, the
     method works as a decorator::
 
@@ -150,16 +153,24 @@ class Hotkey:
         For more information about the arguments refer to
         :meth:`HotkeyContext.hotkey`.
         """
+        action = None
         if func is not None:
-            if not callable(func):
+            # Imported here to break the import cycle: ahkpy.actions imports
+            # ahkpy.window, which imports ahkpy.hotkey_context, which imports
+            # this module.
+            from .actions import Action, _encode
+
+            if isinstance(func, Action):
+                action = _encode(func.compile())
+            elif not callable(func):
                 raise TypeError(f"object {func!r} must be callable")
-
-            func = _wrap_callback(
-                func,
-                ("hotkey",),
-                _bare_hotkey_handler,
-                functools.partial(_hotkey_handler, hotkey=self),
-            )
+            else:
+                func = _wrap_callback(
+                    func,
+                    ("hotkey",),
+                    _bare_hotkey_handler,
+                    functools.partial(_hotkey_handler, hotkey=self),
+                )
 
         options = []
 
@@ -180,7 +191,10 @@ class Hotkey:
         option_str = "".join(options)
 
         with self.context._manager():
-            ahk_call("Hotkey", self.key_name, func, option_str)
+            if action is not None:
+                ahk_call("HotkeyAction", self.key_name, *action, option_str)
+            else:
+                ahk_call("Hotkey", self.key_name, func, option_str)
 
 
 def _bare_hotkey_handler(func):
@@ -43,7 +43,9 @@ def hotstring(
     *trigger* text and presses one of the end chars which initially consist of
     the following: ``-()[]{}':;"/\\,.?!\\n \\t``. If *repl* is an instance of
     :class:`str`, the user's input will be replaced with *repl*. If *repl* is a
-    callable, it will be called when the hotstring is triggered.
+    callable, it will be called when the hotstring is triggered. If *repl* is an
+    :class:`ahkpy.actions.Action`, it's compiled into AHK commands and run
+    without calling Python.
 
     When the hotstring is triggered and *repl* is a callable, *repl* is called
     with the :class:`Hotstring` instance as the *hotstring* argument if the
@@ -256,7 +258,15 @@ class Hotstring:
         For more information about the arguments refer to
         :meth:`HotkeyContext.hotstring`.
         """
-        if callable(repl):
+        # Imported here to break the import cycle: ahkpy.actions imports
+        # ahkpy.window, which imports ahkpy.hotkey_context, which imports this
+        # module.
+        from .actions import Action, _encode
+
+        action = None
+        if isinstance(repl, Action):
+            action = _encode(repl.compile())
+        elif callable(repl):
             repl = _wrap_callback(
                 repl,
                 ("hotstring",),
@@ -324,7 +334,10 @@ class Hotstring:
         option_str = "".join(options)
 
         with self.context._manager():
-            ahk_call("Hotstring", f":{option_str}:{self.trigger}", repl)
+            if action is not None:
+                ahk_call("HotstringAction", f":{option_str}:{self.trigger}", *action)
+            else:
+                ahk_call("Hotstring", f":{option_str}:{self.trigger}", repl)
 
 
 def _bare_hotstring_handler(func):
@@ -98,22 +98,24 @@ def wait_key_pressed(key_name, timeout: float = None) -> bool:
     after *timeout* seconds, then ``False`` will be returned. If *timeout* is
     not specified or ``None``, there is no limit to the wait time.
     """
-    return _wait_for(timeout, functools.partial(is_key_pressed, key_name)) or False
+    return _wait_for(timeout, functools.partial(is_key_pressed, key_name), key=("P", key_name)) or False
 
 
 def wait_key_released(key_name, timeout: float = None) -> bool:
     """Wait for a key or mouse/joystick button to be released physically."""
-    return _wait_for(timeout, lambda: not is_key_pressed(key_name)) or False
+    return _wait_for(timeout, functools.partial(is_key_pressed, key_name), key=("P", key_name), negate=True) or False
 
 
 def wait_key_pressed_logical(key_name, timeout: float = None) -> bool:
     """Wait for a key or mouse/joystick button logical state to be pressed."""
-    return _wait_for(timeout, functools.partial(is_key_pressed_logical, key_name)) or False
+    return _wait_for(timeout, functools.partial(is_key_pressed_logical, key_name), key=("", key_name)) or False
 
 
 def wait_key_released_logical(key_name, timeout: float = None) -> bool:
     """Wait for a key or mouse/joystick button logical state to be released."""
-    return _wait_for(timeout, lambda: not is_key_pressed_logical(key_name)) or False
+    return _wait_for(
+        timeout, functools.partial(is_key_pressed_logical, key_name), key=("", key_name), negate=True,
+    ) or False
 
 
 def get_key_name(key_name: str) -> str:
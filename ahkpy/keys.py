@@ -0,0 +1,287 @@
+import dataclasses as dc
+import functools
+import re
+from typing import NamedTuple, Tuple, Union
+
+__all__ = [
+    "CompiledKeys",
+    "KeyEvent",
+    "compile",
+]
+
+
+class KeyEvent(NamedTuple):
+    """The single item of the :class:`CompiledKeys` sequence."""
+
+    #: The kind of the event: ``"key"`` for a key or character, ``"click"``
+    #: for ``{Click}``, ``"raw"`` and ``"text"`` for the text that follows
+    #: ``{Raw}`` and ``{Text}``.
+    kind: str
+
+    #: The key name or character, the ``{Click}`` options, or the text.
+    value: str
+
+    #: The ``^!+#`` modifiers that are held down while the key is sent.
+    modifiers: str = ""
+
+    #: ``"down"``, ``"up"``, ``"downr"``, ``"downtemp"``, or an empty string
+    #: if the key is pressed and released.
+    action: str = ""
+
+    #: The number of times the key is sent.
+    count: int = 1
+
+
+@dc.dataclass(frozen=True)
+class CompiledKeys:
+    """The parsed key sequence returned by :func:`compile`.
+
+    The instance can be passed to :func:`~ahkpy.send` and the other ``send*``
+    functions instead of the string. Converting it to :class:`str` gives the
+    shortest equivalent AHK string, which is what is sent to AHK.
+    """
+
+    #: The tuple of the :class:`KeyEvent` items.
+    events: Tuple[KeyEvent, ...]
+
+    #: Whether the sequence starts with ``{Blind}``.
+    blind: bool = False
+
+    _ahk: str = dc.field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "_ahk", _serialize(self.blind, self.events))
+
+    def __str__(self):
+        return self._ahk
+
+    def __add__(self, other):
+        """Concatenate two key sequences.
+
+        Raises :exc:`ValueError` if the sequences differ in ``{Blind}``, or
+        the first one ends with ``{Text}``.
+        """
+        if not isinstance(other, CompiledKeys):
+            return NotImplemented
+        if self.blind != other.blind:
+            raise ValueError("cannot concatenate blind and non-blind keys")
+        if other.events and self.events and self.events[-1].kind == "text":
+            raise ValueError("cannot append keys after {Text}")
+        return CompiledKeys(self.events + other.events, self.blind)
+
+
+def compile(keys: Union[str, CompiledKeys]) -> CompiledKeys:
+    """Parse the AHK Send syntax *keys* into :class:`CompiledKeys`.
+
+    The modifiers ``^!+#``, ``{Key}``, ``{Key N}``, ``{Key Down}``,
+    ``{Key Up}``, ``{Blind}``, ``{Raw}``, ``{Text}``, ``{U+XXXX}``,
+    ``{ASC N}``, ``{vkXXscYYY}``, and ``{Click ...}`` are recognized::
+
+        keys = ahkpy.keys.compile("^{Home}{Down 3}")
+        ahkpy.send(keys)
+
+    Raises :exc:`ValueError` if the *keys* are malformed, e.g. a brace is not
+    closed or the key name is unknown.
+
+    The 1024 most recently compiled strings are cached.
+
+    For the syntax refer to `Send
+    <https://www.autohotkey.com/docs/commands/Send.htm#Parameters>`__.
+    """
+    if isinstance(keys, CompiledKeys):
+        return keys
+    if not isinstance(keys, str):
+        raise TypeError(f"keys must be a str, not {type(keys).__name__}")
+    return _compile_str(keys)
+
+
+_MODIFIERS = "^!+#"
+_ACTION_NAMES = {"down": "Down", "up": "Up", "downr": "DownR", "downtemp": "DownTemp"}
+_CLICK_WORDS = {
+    "left", "l", "right", "r", "middle", "m", "x1", "x2",
+    "wheelup", "wu", "wheeldown", "wd", "wheelleft", "wl", "wheelright", "wr",
+    "down", "d", "up", "u", "relative", "rel",
+}
+_KEY_NAMES = {
+    name.lower(): name
+    for name in (
+        "LButton RButton MButton XButton1 XButton2 WheelDown WheelUp WheelLeft WheelRight "
+        "CapsLock Space Tab Enter Return Escape Esc Backspace BS ScrollLock Delete Del Insert Ins "
+        "Home End PgUp PgDn Up Down Left Right "
+        "NumLock NumpadDiv NumpadMult NumpadAdd NumpadSub NumpadEnter NumpadDot "
+        "NumpadIns NumpadEnd NumpadDown NumpadPgDn NumpadLeft NumpadClear NumpadRight NumpadHome "
+        "NumpadUp NumpadPgUp NumpadDel "
+        "LWin RWin Control Ctrl Alt Shift LControl LCtrl RControl RCtrl LShift RShift LAlt RAlt "
+        "Browser_Back Browser_Forward Browser_Refresh Browser_Stop Browser_Search Browser_Favorites "
+        "Browser_Home Volume_Mute Volume_Down Volume_Up Media_Next Media_Prev Media_Stop "
+        "Media_Play_Pause Launch_Mail Launch_Media Launch_App1 Launch_App2 "
+        "AppsKey PrintScreen CtrlBreak Pause Break Help Sleep"
+    ).split()
+}
+_KEY_NAMES.update({f"numpad{i}": f"Numpad{i}" for i in range(10)})
+_KEY_NAMES.update({f"f{i}": f"F{i}" for i in range(1, 25)})
+_VK_SC_RE = re.compile(r"(?:vk[0-9a-f]{1,2})?(?:sc[0-9a-f]{1,3})?", re.IGNORECASE)
+_UNICODE_RE = re.compile(r"u\+([0-9a-f]{1,6})", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_str(keys):
+    events = []
+    blind = False
+    modifiers = ""
+    pos = 0
+    while pos < len(keys):
+        char = keys[pos]
+        if char in _MODIFIERS:
+            if char not in modifiers:
+                modifiers += char
+            pos += 1
+            continue
+        if char != "{":
+            events.append(KeyEvent("key", char, modifiers))
+            modifiers = ""
+            pos += 1
+            continue
+
+        # Search from pos+2 so that "{}}" is the closing brace key.
+        end = keys.find("}", pos + 2)
+        if end == -1:
+            raise ValueError(f"unclosed '{{' at position {pos} in {keys!r}")
+        body = keys[pos+1:end]
+        name, _, options = body.partition(" ")
+        if not name:
+            raise ValueError(f"missing key name at position {pos} in {keys!r}")
+        options = options.strip()
+        lower_name = name.lower()
+        if lower_name == "blind":
+            if events or modifiers or blind or options:
+                raise ValueError(f"{{Blind}} must be at the start of the keys, not at position {pos} in {keys!r}")
+            blind = True
+        elif lower_name in ("raw", "text"):
+            if modifiers or options:
+                raise ValueError(f"invalid {{{name}}} at position {pos} in {keys!r}")
+            text = keys[end+1:]
+            if text:
+                events.append(KeyEvent(lower_name, text))
+            pos = len(keys)
+            continue
+        elif lower_name == "click":
+            events.append(KeyEvent("click", _parse_click_options(options, pos, keys), modifiers))
+            modifiers = ""
+        elif lower_name == "asc":
+            # {ASC nnnnn} takes the character code instead of the count.
+            if not options.isdigit():
+                raise ValueError(f"{{ASC}} requires a character code at position {pos} in {keys!r}")
+            events.append(KeyEvent("key", f"ASC {options}", modifiers))
+            modifiers = ""
+        else:
+            key = _parse_key_name(name, pos, keys)
+            action, count = _parse_key_options(options, pos, keys)
+            events.append(KeyEvent("key", key, modifiers, action, count))
+            modifiers = ""
+        pos = end + 1
+
+    if modifiers:
+        # AHK sends the trailing modifier symbol as a character.
+        prefix = keys[len(keys.rstrip(_MODIFIERS)):-1]
+        events.append(KeyEvent("key", keys[-1], "".join(dict.fromkeys(prefix))))
+    return CompiledKeys(tuple(events), blind)
+
+
+def _parse_key_name(name, pos, keys):
+    if len(name) == 1:
+        return name
+    lower_name = name.lower()
+    if lower_name in _KEY_NAMES:
+        return _KEY_NAMES[lower_name]
+    match = _UNICODE_RE.fullmatch(name)
+    if match:
+        return f"U+{match.group(1).upper()}"
+    if _VK_SC_RE.fullmatch(name):
+        return name
+    raise ValueError(f"unknown key {name!r} at position {pos} in {keys!r}")
+
+
+def _parse_key_options(options, pos, keys):
+    if not options:
+        return "", 1
+    lower_options = options.lower()
+    if lower_options in _ACTION_NAMES:
+        return lower_options, 1
+    if options.isdigit():
+        return "", int(options)
+    raise ValueError(f"invalid key options {options!r} at position {pos} in {keys!r}")
+
+
+def _parse_click_options(options, pos, keys):
+    words = options.replace(",", " ").split()
+    numbers = 0
+    for word in words:
+        if word.lstrip("-").isdigit():
+            numbers += 1
+        elif word.lower() not in _CLICK_WORDS:
+            raise ValueError(f"invalid click option {word!r} at position {pos} in {keys!r}")
+    if numbers > 3:
+        raise ValueError(f"too many click coordinates at position {pos} in {keys!r}")
+    return " ".join(words)
+
+
+def _serialize(blind, events):
+    parts = ["{Blind}"] if blind else []
+    i = 0
+    while i < len(events):
+        event = events[i]
+        if event.kind == "text":
+            parts.append("{Text}" + event.value)
+        elif event.kind == "raw":
+            escaped = "".join(_escape(char) for char in event.value)
+            if i == len(events) - 1 and len("{Raw}") + len(event.value) < len(escaped):
+                parts.append("{Raw}" + event.value)
+            else:
+                parts.append(escaped)
+        elif event.kind == "click":
+            options = f" {event.value}" if event.value else ""
+            parts.append(f"{event.modifiers}{{Click{options}}}")
+        else:
+            # Merge the repeated keys into {Key N} if it's shorter.
+            run = 1
+            count = event.count
+            if not event.action and _can_repeat(event.value):
+                once = event._replace(count=1)
+                while i + run < len(events) and events[i + run]._replace(count=1) == once:
+                    count += events[i + run].count
+                    run += 1
+            merged = _serialize_key(event._replace(count=count))
+            repeated = _serialize_key(event._replace(count=1)) * count
+            parts.append(min(merged, repeated, key=len))
+            i += run
+            continue
+        i += 1
+    return "".join(parts)
+
+
+def _serialize_key(event):
+    if event.count == 0:
+        return ""
+    if len(event.value) == 1 and not event.action and event.count == 1:
+        return event.modifiers + _escape(event.value)
+    if event.action:
+        options = f" {_ACTION_NAMES[event.action]}"
+    elif event.count != 1:
+        options = f" {event.count}"
+    else:
+        options = ""
+    return f"{event.modifiers}{{{event.value}{options}}}"
+
+
+def _can_repeat(value):
+    # {ASC nnnnn} and the whitespace characters cannot have a count.
+    if len(value) == 1:
+        return value.isprintable() and not value.isspace()
+    return " " not in value
+
+
+def _escape(char):
+    if char in "^!+#{}":
+        return f"{{{char}}}"
+    return char
@@ -91,7 +91,10 @@ def prepare_tray_menu():
 
 
 def run_from_args():
-    usage = "py -m ahkpy [-h] [-V] [-q] [--no-tray] [-c CMD | -m MOD | FILE | -] [ARGS] ..."
+    usage = (
+        "py -m ahkpy [-h] [-V] [-q] [--no-tray] [--profile-bridge] [--profile-trace FILE] "
+        "[-c CMD | -m MOD | FILE | -] [ARGS] ..."
+    )
     parser = GUIArgumentParser(usage=usage, prog="ahkpy")
     parser.add_argument(
         "-V", "--version", action="version", version=version(),
@@ -104,6 +107,14 @@ def run_from_args():
         "--no-tray", dest="tray", action="store_false", default=True,
         help="hide the tray icon",
     )
+    parser.add_argument(
+        "--profile-bridge", action="store_true",
+        help="profile the calls to AHK and print the report at exit",
+    )
+    parser.add_argument(
+        "--profile-trace", metavar="FILE",
+        help="write the profiled calls to FILE in the Chrome trace event format; implies --profile-bridge",
+    )
     group = parser.add_mutually_exclusive_group()
     group.add_argument(
         "-c", dest="cmd", action="store_true",
@@ -127,6 +138,9 @@ def run_from_args():
     if options.tray:
         ahk.flow.ahk_call("Menu", "Tray", "Icon")
 
+    if options.profile_bridge or options.profile_trace:
+        ahk.profiling.enable(trace_file=options.profile_trace)
+
     if options.cmd:
         sys.argv[:] = ["-c", *args[1:]]
         # Add "ahkpy" and "ahk" to globals.
@@ -0,0 +1,172 @@
+import dataclasses as dc
+import threading
+from typing import Iterable, List, Optional, Sequence
+
+from .flow import ahk_call
+from .window import WindowRect, _split_by_lengths
+from .window_message import on_message
+
+__all__ = [
+    "Monitor",
+    "clear_monitors_cache",
+    "monitor_of",
+    "monitors",
+]
+
+
+@dc.dataclass(frozen=True)
+class Monitor:
+    """The immutable information about a display monitor returned by
+    :func:`monitors`.
+    """
+
+    #: The monitor number as used by AHK, starting at 1.
+    number: int
+
+    #: The device name of the monitor, e.g. ``"\\\\.\\DISPLAY1"``.
+    name: str
+
+    #: The position and size of the monitor on the virtual screen.
+    rect: WindowRect
+
+    #: The position and size of the monitor area that is not covered by the
+    #: taskbar and other docked toolbars.
+    work_area: WindowRect
+
+    #: Whether the monitor is primary.
+    is_primary: bool
+
+
+WM_SETTINGCHANGE = 0x001A
+WM_DISPLAYCHANGE = 0x007E
+SPI_SETWORKAREA = 0x002F
+
+_monitors = None
+# Incremented when the cached monitors become stale. The monitors read
+# before the change are not cached.
+_generation = 0
+_handlers = None
+_handlers_lock = threading.Lock()
+
+
+def monitors() -> List[Monitor]:
+    """Get the list of the display monitors ordered by the monitor number.
+
+    The monitors are read from AHK in a single call and cached until the
+    display settings change. The cache is cleared on the ``WM_DISPLAYCHANGE``
+    message, and on the ``WM_SETTINGCHANGE`` message that reports a change of
+    the work area, e.g. when the taskbar is moved.
+
+    :command: `SysGet
+       <https://www.autohotkey.com/docs/commands/SysGet.htm>`_
+    """
+    cached = _monitors
+    if cached is not None:
+        return list(cached)
+    _register_handlers()
+    generation = _generation
+    result = _get_monitors()
+    _cache_monitors(result, generation)
+    return list(result)
+
+
+def monitor_of(rects: Iterable[Optional[Sequence[int]]]) -> List[Optional[Monitor]]:
+    """Get the monitors of many ``(x, y, width, height)`` *rects*, e.g. the
+    :attr:`Window.rect` values, at once.
+
+    A rect belongs to the monitor it overlaps the most. If it doesn't overlap
+    any monitor, the nearest monitor is returned. The ``None`` rects map to
+    ``None``::
+
+        snapshot = ahkpy.windows.snapshot(fields=("rect",))
+        rects = zip(*(snapshot.column(f) for f in ("x", "y", "width", "height")))
+        for win, monitor in zip(snapshot, ahkpy.monitor_of(rects)):
+            print(win.id, monitor.number)
+
+    The monitors are read with :func:`monitors` once for all *rects*.
+    """
+    monitor_list = monitors()
+    bounds = [
+        (monitor, monitor.rect.x, monitor.rect.y, monitor.rect.x + monitor.rect.width,
+         monitor.rect.y + monitor.rect.height)
+        for monitor in monitor_list
+    ]
+    result = []
+    for rect in rects:
+        if rect is None or not bounds:
+            result.append(None)
+            continue
+        x, y, width, height = rect
+        right, bottom = x + width, y + height
+        best = None
+        for monitor, left, top, mon_right, mon_bottom in bounds:
+            overlap_w = min(right, mon_right) - max(x, left)
+            overlap_h = min(bottom, mon_bottom) - max(y, top)
+            if overlap_w > 0 and overlap_h > 0:
+                key = (0, -overlap_w * overlap_h)
+            else:
+                # The distance between the rect and the monitor edges.
+                dx = max(left - right, x - mon_right, 0)
+                dy = max(top - bottom, y - mon_bottom, 0)
+                key = (1, dx * dx + dy * dy)
+            if best is None or key < best[0]:
+                best = key, monitor
+        result.append(best[1])
+    return result
+
+
+def clear_monitors_cache():
+    """Drop the cached monitors, so the next :func:`monitors` call reads them
+    again.
+
+    The cache is cleared automatically when the display settings change.
+    """
+    global _monitors, _generation
+    _generation += 1
+    _monitors = None
+
+
+def _cache_monitors(result, generation):
+    global _monitors
+    if generation == _generation:
+        _monitors = tuple(result)
+
+
+def _register_handlers():
+    global _handlers
+    with _handlers_lock:
+        if _handlers is not None:
+            return
+        _handlers = [
+            on_message(WM_DISPLAYCHANGE, _handle_display_change),
+            on_message(WM_SETTINGCHANGE, _handle_setting_change),
+        ]
+
+
+def _handle_display_change():
+    clear_monitors_cache()
+
+
+def _handle_setting_change(w_param, **_):
+    if w_param == SPI_SETWORKAREA:
+        clear_monitors_cache()
+
+
+def _get_monitors() -> List[Monitor]:
+    # Don't hold any locks while calling AHK. The display change message can
+    # be dispatched during the call.
+    result = ahk_call("SysGetMonitors")
+    values = [int(value) for value in str(result["rects"]).split(",")] if result["rects"] else []
+    names = _split_by_lengths(result["names"], result["lengths"])
+    primary = int(result["primary"])
+    monitor_list = []
+    for i, name in enumerate(names):
+        left, top, right, bottom, work_left, work_top, work_right, work_bottom = values[i*8:i*8+8]
+        monitor_list.append(Monitor(
+            number=i + 1,
+            name=name,
+            rect=WindowRect(left, top, right - left, bottom - top),
+            work_area=WindowRect(work_left, work_top, work_right - work_left, work_bottom - work_top),
+            is_primary=i + 1 == primary,
+        ))
+    return monitor_list
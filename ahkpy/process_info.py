@@ -0,0 +1,182 @@
+import collections
+import ctypes
+import dataclasses as dc
+import ntpath
+import threading
+from typing import Optional
+
+__all__ = [
+    "ProcessInfo",
+    "clear_process_info_cache",
+    "get_process_info",
+]
+
+
+@dc.dataclass(frozen=True)
+class ProcessInfo:
+    """The immutable information about a running process returned by
+    :func:`get_process_info`.
+    """
+
+    #: The process identifier.
+    pid: int
+
+    #: The process creation time as a FILETIME value. Together with the
+    #: :attr:`pid` it identifies the process because the PIDs are reused.
+    start_time: int
+
+    #: The full path to the process executable.
+    path: str
+
+    #: The name of the process executable, e.g. ``"notepad.exe"``.
+    name: str
+
+    #: Whether the process is 32-bit, or ``None`` if the bitness cannot be
+    #: determined.
+    is_32bit: Optional[bool]
+
+
+_CACHE_MAXSIZE = 256
+
+_cache_lock = threading.Lock()
+# Maps the PID to the (process handle, ProcessInfo) pairs. The least recently
+# used processes come first. The open handle prevents the PID from being
+# reused, so the entry belongs to the same process until it exits.
+_cache = collections.OrderedDict()
+
+
+def get_process_info(pid: int) -> Optional[ProcessInfo]:
+    """Get the executable path, name, and bitness of the process with the
+    given *pid*.
+
+    The information is cached until the process exits, so getting it again
+    costs a single check that the process is still running. The cache holds
+    a handle to every cached process. Up to 256 processes are cached, and the
+    least recently used ones are dropped.
+
+    Returns ``None`` if the process doesn't exist or cannot be opened.
+    """
+    if not pid:
+        return None
+    with _cache_lock:
+        entry = _cache.get(pid)
+        if entry is not None:
+            handle, info = entry
+            if not _has_exited(handle):
+                _cache.move_to_end(pid)
+                return info
+            # The PID can be reused by a new process.
+            del _cache[pid]
+            _close_process(handle)
+
+    handle = _open_process(pid)
+    if handle is None:
+        return None
+    try:
+        start_time, path, is_32bit = _query_process(handle)
+    except OSError:
+        _close_process(handle)
+        return None
+    info = ProcessInfo(pid, start_time, path, ntpath.basename(path), is_32bit)
+
+    with _cache_lock:
+        prev_entry = _cache.pop(pid, None)
+        _cache[pid] = handle, info
+        while len(_cache) > _CACHE_MAXSIZE:
+            _, (old_handle, _) = _cache.popitem(last=False)
+            _close_process(old_handle)
+    if prev_entry is not None:
+        # Another thread has cached the same process.
+        _close_process(prev_entry[0])
+    return info
+
+
+def clear_process_info_cache():
+    """Drop the cached process information and close the process handles."""
+    with _cache_lock:
+        entries = list(_cache.values())
+        _cache.clear()
+    for handle, _ in entries:
+        _close_process(handle)
+
+
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+SYNCHRONIZE = 0x00100000
+WAIT_TIMEOUT = 0x102
+IMAGE_FILE_MACHINE_I386 = 0x014c
+
+
+def _open_process(pid):
+    handle = ctypes.windll.kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION | SYNCHRONIZE, False, pid)
+    return handle or None
+
+
+def _has_exited(handle):
+    return ctypes.windll.kernel32.WaitForSingleObject(handle, 0) != WAIT_TIMEOUT
+
+
+def _close_process(handle):
+    ctypes.windll.kernel32.CloseHandle(handle)
+
+
+def _query_process(handle):
+    from ctypes import wintypes
+
+    kernel32 = ctypes.windll.kernel32
+
+    creation_time = wintypes.FILETIME()
+    exit_time = wintypes.FILETIME()
+    kernel_time = wintypes.FILETIME()
+    user_time = wintypes.FILETIME()
+    ok = kernel32.GetProcessTimes(
+        handle,
+        ctypes.byref(creation_time), ctypes.byref(exit_time), ctypes.byref(kernel_time), ctypes.byref(user_time),
+    )
+    if not ok:
+        raise ctypes.WinError()
+    start_time = creation_time.dwHighDateTime << 32 | creation_time.dwLowDateTime
+
+    size = wintypes.DWORD(32768)
+    buffer = ctypes.create_unicode_buffer(size.value)
+    if not kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+        raise ctypes.WinError()
+    path = buffer.value
+
+    # The bitness is needed only by Window.send_message(). Failing to get it
+    # must not break the name and path lookups.
+    is_32bit = _query_is_32bit(kernel32, handle)
+    return start_time, path, is_32bit
+
+
+def _query_is_32bit(kernel32, handle):
+    from ctypes import wintypes
+
+    try:
+        is_wow64_process2 = kernel32.IsWow64Process2
+    except AttributeError:
+        # IsWow64Process2 is available since Windows 10, version 1511.
+        is_wow64_process2 = None
+    if is_wow64_process2 is not None:
+        process_machine = wintypes.USHORT()
+        native_machine = wintypes.USHORT()
+        if not is_wow64_process2(handle, ctypes.byref(process_machine), ctypes.byref(native_machine)):
+            return None
+        if native_machine.value == IMAGE_FILE_MACHINE_I386:
+            # OS is 32-bit.
+            return True
+        return process_machine.value == IMAGE_FILE_MACHINE_I386
+
+    is_wow64 = wintypes.BOOL()
+    if not kernel32.IsWow64Process(handle, ctypes.byref(is_wow64)):
+        return None
+    if is_wow64.value:
+        # A 32-bit process on a 64-bit OS.
+        return True
+    if ctypes.sizeof(ctypes.c_void_p) == 8:
+        # The 64-bit Python runs only on a 64-bit OS.
+        return False
+    is_python_wow64 = wintypes.BOOL()
+    if not kernel32.IsWow64Process(kernel32.GetCurrentProcess(), ctypes.byref(is_python_wow64)):
+        return None
+    # If the 32-bit Python is not under WOW64, the OS is 32-bit.
+    return not is_python_wow64.value
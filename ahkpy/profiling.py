@@ -0,0 +1,332 @@
+import atexit
+import collections
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from typing import List, NamedTuple, Tuple
+
+from . import flow
+
+__all__ = [
+    "CommandStats",
+    "disable",
+    "enable",
+    "get_stats",
+    "is_enabled",
+    "report",
+    "reset",
+    "write_trace",
+]
+
+
+class CommandStats(NamedTuple):
+    """The statistics of the calls of a single AHK command returned by
+    :func:`get_stats`.
+
+    The time values are in seconds.
+    """
+
+    #: The name of the AHK command.
+    command: str
+
+    #: The number of calls.
+    count: int
+
+    #: The total time spent in AHK.
+    total: float
+
+    #: The median call time.
+    p50: float
+
+    #: The 99th percentile of the call time.
+    p99: float
+
+    #: The total time spent waiting for the global AHK lock.
+    lock_wait: float
+
+    #: The list of ``((filename, lineno), count)`` tuples of the Python lines
+    #: that called the command, most common first.
+    call_sites: List[Tuple[Tuple[str, int], int]]
+
+
+def enable(*, trace_file=None, report_file=None, max_samples=10000, max_trace_events=100000):
+    """Start profiling the calls to AHK.
+
+    The profiler records the number of calls of every AHK command, the time
+    spent in AHK, the time spent waiting for the global AHK lock, and the Python
+    lines that called AHK.
+
+    If profiling is enabled at exit, the text report is written to
+    *report_file* which defaults to :data:`sys.stderr`. If *trace_file* is
+    given, the calls are also written to this file in the `Chrome trace event
+    format
+    <https://docs.google.com/document/d/1CvAClvFfyA5R-PhYUmn5OOQtYMH4h6I0nSsKchNAySU>`_
+    that can be opened in ``chrome://tracing`` or `Perfetto
+    <https://ui.perfetto.dev>`_.
+
+    The *max_samples* argument limits the number of call times kept per
+    command to compute the percentiles. The *max_trace_events* argument limits
+    the number of calls written to the trace file.
+
+    This function can also be enabled with the ``--profile-bridge`` command
+    line option.
+    """
+    global _profiler, _atexit_registered
+    if max_samples < 1:
+        raise ValueError("max_samples must be positive")
+    if max_trace_events < 0:
+        raise ValueError("max_trace_events must be non-negative")
+
+    with _profiler_lock:
+        if _profiler is None:
+            _profiler = _Profiler()
+        _profiler.max_samples = max_samples
+        _profiler.max_trace_events = max_trace_events
+        _profiler.trace_file = trace_file
+        _profiler.report_file = report_file
+        flow._profiler = _profiler
+        if not _atexit_registered:
+            atexit.register(_write_at_exit)
+            _atexit_registered = True
+
+
+def disable():
+    """Stop profiling the calls to AHK.
+
+    The collected statistics are kept until :func:`reset` is called.
+    """
+    flow._profiler = None
+
+
+def is_enabled() -> bool:
+    """Return ``True`` if the calls to AHK are being profiled."""
+    return flow._profiler is not None
+
+
+def reset():
+    """Clear the collected statistics."""
+    if _profiler is not None:
+        _profiler.reset()
+
+
+def get_stats() -> List[CommandStats]:
+    """Get the statistics of the profiled AHK commands.
+
+    Returns the list of :class:`CommandStats` sorted by the total time in
+    descending order.
+    """
+    if _profiler is None:
+        return []
+    return _profiler.get_stats()
+
+
+def report(file=None, *, top_sites=3):
+    """Write the text report of the profiled AHK commands to *file* which
+    defaults to :data:`sys.stderr`.
+
+    The *top_sites* argument is the number of the most common call sites shown
+    for each command.
+    """
+    if file is None:
+        file = sys.stderr
+    if file is None:
+        # The console is not available.
+        return
+
+    stats = get_stats()
+    total_count = sum(s.count for s in stats)
+    total_time = sum(s.total for s in stats)
+    total_wait = sum(s.lock_wait for s in stats)
+    print(
+        f"AHK bridge profile: {total_count} calls, {total_time * 1000:.3f} ms in AHK, "
+        f"{total_wait * 1000:.3f} ms waiting for the lock",
+        file=file,
+    )
+    if not stats:
+        return
+    print(
+        f"{'command':<24} {'count':>8} {'total, ms':>12} {'p50, us':>10} {'p99, us':>10} {'lock wait, ms':>14}",
+        file=file,
+    )
+    for s in stats:
+        print(
+            f"{s.command:<24} {s.count:>8} {s.total * 1000:>12.3f} {s.p50 * 1e6:>10.1f} "
+            f"{s.p99 * 1e6:>10.1f} {s.lock_wait * 1000:>14.3f}",
+            file=file,
+        )
+        for (filename, lineno), count in s.call_sites[:top_sites]:
+            print(f"    {filename}:{lineno} ({count} calls)", file=file)
+
+
+def write_trace(file):
+    """Write the profiled calls to *file* in the Chrome trace event format.
+
+    The *file* argument is either a path or a text file object.
+    """
+    events = _profiler.get_trace_events() if _profiler is not None else []
+    trace = {"traceEvents": events, "displayTimeUnit": "ms"}
+    if hasattr(file, "write"):
+        json.dump(trace, file)
+    else:
+        with open(file, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+
+
+class _Profiler:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.max_samples = 10000
+        self.max_trace_events = 100000
+        self.trace_file = None
+        self.report_file = None
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.commands = {}
+            self.trace_events = []
+            self.dropped_trace_events = 0
+            self.start = time.perf_counter_ns()
+
+    def ahk_call(self, func, cmd, args):
+        site = _call_site()
+        start = time.perf_counter_ns()
+        flow._acquire_ahk_lock()
+        try:
+            acquired = time.perf_counter_ns()
+            try:
+                return func(cmd, args)
+            finally:
+                self.record(str(cmd), site, start, acquired, time.perf_counter_ns())
+        finally:
+            flow.global_ahk_lock.release()
+
+    def record(self, cmd, site, start, acquired, end):
+        with self.lock:
+            stats = self.commands.get(cmd)
+            if stats is None:
+                stats = self.commands[cmd] = _CommandRecord()
+            duration = end - acquired
+            stats.count += 1
+            stats.total += duration
+            stats.lock_wait += acquired - start
+            stats.sites[site] += 1
+            if len(stats.samples) < self.max_samples:
+                stats.samples.append(duration)
+            else:
+                # Reservoir sampling keeps a uniform sample of all calls.
+                i = random.randrange(stats.count)
+                if i < self.max_samples:
+                    stats.samples[i] = duration
+
+            if len(self.trace_events) < self.max_trace_events:
+                self.trace_events.append((cmd, site, threading.get_ident(), start, acquired, end))
+            else:
+                self.dropped_trace_events += 1
+
+    def get_stats(self):
+        with self.lock:
+            result = [
+                CommandStats(
+                    command=cmd,
+                    count=record.count,
+                    total=record.total / 1e9,
+                    p50=_percentile(record.samples, 50) / 1e9,
+                    p99=_percentile(record.samples, 99) / 1e9,
+                    lock_wait=record.lock_wait / 1e9,
+                    call_sites=record.sites.most_common(),
+                )
+                for cmd, record in self.commands.items()
+            ]
+        result.sort(key=lambda s: s.total, reverse=True)
+        return result
+
+    def get_trace_events(self):
+        pid = os.getpid()
+        with self.lock:
+            events = []
+            for cmd, (filename, lineno), tid, start, acquired, end in self.trace_events:
+                if acquired > start:
+                    events.append({
+                        "name": "lock wait",
+                        "cat": "lock",
+                        "ph": "X",
+                        "ts": (start - self.start) / 1000,
+                        "dur": (acquired - start) / 1000,
+                        "pid": pid,
+                        "tid": tid,
+                    })
+                events.append({
+                    "name": cmd,
+                    "cat": "ahk_call",
+                    "ph": "X",
+                    "ts": (acquired - self.start) / 1000,
+                    "dur": (end - acquired) / 1000,
+                    "pid": pid,
+                    "tid": tid,
+                    "args": {"site": f"{filename}:{lineno}"},
+                })
+            if self.dropped_trace_events:
+                events.append({
+                    "name": f"{self.dropped_trace_events} calls not traced",
+                    "ph": "i",
+                    "s": "g",
+                    "ts": (time.perf_counter_ns() - self.start) / 1000,
+                    "pid": pid,
+                    "tid": threading.get_ident(),
+                })
+        return events
+
+
+class _CommandRecord:
+    __slots__ = ("count", "total", "lock_wait", "samples", "sites")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.lock_wait = 0
+        self.samples = []
+        self.sites = collections.Counter()
+
+
+def _percentile(samples, percent):
+    if not samples:
+        return 0
+    ordered = sorted(samples)
+    # Nearest-rank method.
+    rank = math.ceil(percent / 100 * len(ordered))
+    return ordered[max(rank, 1) - 1]
+
+
+def _call_site():
+    # Find the first frame outside of the ahkpy package.
+    frame = sys._getframe(2)
+    while frame is not None and frame.f_code.co_filename.startswith(_PACKAGE_DIR):
+        frame = frame.f_back
+    if frame is None:
+        return ("<unknown>", 0)
+    return (frame.f_code.co_filename, frame.f_lineno)
+
+
+def _write_at_exit():
+    profiler = flow._profiler
+    if profiler is None:
+        # Profiling was disabled.
+        return
+    if profiler.trace_file is not None:
+        try:
+            write_trace(profiler.trace_file)
+        except OSError as err:
+            print(f"Cannot write the AHK bridge trace: {err}", file=sys.stderr)
+    report(profiler.report_file)
+
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__)) + os.sep
+
+_profiler = None
+_profiler_lock = threading.Lock()
+_atexit_registered = False
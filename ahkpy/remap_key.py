@@ -1,8 +1,10 @@
 import dataclasses as dc
 
+from .flow import ahk_call
 from .hotkey import Hotkey
 from .key_state import is_key_pressed
-from .sending import send
+from .sending import _get_send_mode, send
+from .settings import get_settings, optional_ms
 
 __all__ = [
     "RemappedKey",
@@ -17,14 +19,54 @@ def remap_key(ctx, origin_key, destination_key, *, mode=None, level=None):
     For valid keys refer to `List of Keys
     <https://www.autohotkey.com/docs/KeyList.htm>`_.
 
-    The optional keyword-only *mode* and *level* arguments are passed to the
-    :func:`send` function that will send the *destination_key* when the user
-    presses the *origin_key*.
+    The optional keyword-only *mode* and *level* arguments set the mode and
+    level of sending the *destination_key* when the user presses the
+    *origin_key*. For their values refer to the :func:`send` function. They
+    default to :attr:`Settings.send_mode` and :attr:`Settings.send_level`
+    current at the time of the call.
+
+    The remapping is installed as AHK hotkeys that send the *destination_key*
+    without calling Python, like the ``origin_key::destination_key`` remapping
+    in AHK does. If the context has the *active_when* callable, it's still
+    called in Python to check if the remapping is active.
 
     For more information refer to `Remapping Keys
     <https://www.autohotkey.com/docs/misc/Remap.htm>`_.
     """
+    mode = _get_send_mode(mode)
+    if mode not in {"input", "event", "play"}:
+        raise ValueError(f"{mode!r} is not a valid send mode")
+    settings = get_settings()
+    if level is None:
+        level = settings.send_level
+    elif not 0 <= level <= 100:
+        raise ValueError("level must be between 0 and 100")
+    key_duration = settings.key_duration_play if mode == "play" else settings.key_duration
+
     mouse = destination_key.lower() in {"lbutton", "rbutton", "mbutton", "xbutton1", "xbutton2"}
+    ctrl_to_alt = (
+        not mouse and
+        origin_key.lower() in {"ctrl", "lctrl", "rctrl"} and
+        destination_key.lower() in {"alt", "lalt", "ralt"}
+    )
+    with ctx._manager():
+        installed = ahk_call(
+            "RemapKey",
+            origin_key,
+            destination_key,
+            mode,
+            int(level),
+            optional_ms(key_duration),
+            int(mouse),
+            origin_key if ctrl_to_alt else "",
+        )
+    if installed:
+        return RemappedKey(Hotkey(f"*{origin_key}", ctx), Hotkey(f"*{origin_key} Up", ctx))
+    # AHK doesn't know the destination key, fall back to sending it from Python.
+    return _remap_key_in_python(ctx, origin_key, destination_key, mode, level, mouse, ctrl_to_alt)
+
+
+def _remap_key_in_python(ctx, origin_key, destination_key, mode, level, mouse, ctrl_to_alt):
     if mouse:
         def origin_hotkey():
             if not is_key_pressed(destination_key):
@@ -33,10 +75,6 @@ def remap_key(ctx, origin_key, destination_key, *, mode=None, level=None):
         def origin_up_hotkey():
             send("{Blind}{%s Up}" % destination_key, mode=mode, level=level, mouse_delay=-1)
     else:
-        ctrl_to_alt = (
-            origin_key.lower() in {"ctrl", "lctrl", "rctrl"} and
-            destination_key.lower() in {"alt", "lalt", "ralt"}
-        )
         if ctrl_to_alt:
             def origin_hotkey():
                 send(
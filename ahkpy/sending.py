@@ -1,8 +1,16 @@
+import contextvars
+
+from . import flow
 from .flow import ahk_call, global_ahk_lock
+from .keys import CompiledKeys, compile as compile_keys
 from .settings import get_settings, optional_ms
+from .timer import Timer
 from .unset import UNSET
 
 __all__ = [
+    "SendBuffer",
+    "coalesced_send",
+    "send_buffer",
     "send_event",
     "send_input",
     "send_play",
@@ -17,6 +25,7 @@ def send(keys: str, *, mode=None, level=None, key_delay=None, key_duration=None,
 
     The *keys* argument is an encoded sequence of keys. For valid *keys* refer
     to `Send <https://www.autohotkey.com/docs/commands/Send.htm#Parameters>`__.
+    The keys parsed with :func:`ahkpy.keys.compile` are also accepted.
 
     :param str mode: the mode that is used to send keys and clicks. Takes one of
        the following values: ``"input"``, ``"event"``, ``"play"``. Defaults to
@@ -82,33 +91,238 @@ def _get_send_mode(mode=None, key_delay=None, key_duration=None, mouse_delay=Non
 
 def send_input(keys, *, level=None, **rest):
     """Send simulated keystrokes and mouse clicks using the Input mode."""
-    with global_ahk_lock:
-        _send_level(level)
-        ahk_call("SendInput", keys)
+    level = _get_send_level(level)
+    if not _buffer_send(_send_input, keys, level):
+        _send_input(keys, level)
 
 
 def send_event(keys, *, level=None, key_delay=None, key_duration=None, mouse_delay=None):
     """Send simulated keystrokes and mouse clicks using the Event mode."""
+    level = _get_send_level(level)
+    delays = _get_delays(key_delay, key_duration, mouse_delay)
+    if not _buffer_send(_send_event, keys, level, *delays):
+        _send_event(keys, level, *delays)
+
+
+def send_play(keys, *, key_delay=None, key_duration=None, mouse_delay=None, **rest):
+    """Send simulated keystrokes and mouse clicks using the Play mode."""
+    delays = _get_delays(key_delay, key_duration, mouse_delay, play=True)
+    if not _buffer_send(_send_play, keys, *delays):
+        _send_play(keys, *delays)
+
+
+def _send_input(keys, level):
+    with global_ahk_lock:
+        _send_level(level)
+        ahk_call("SendInput", _keys_str(keys))
+
+
+def _send_event(keys, level, key_delay, key_duration, mouse_delay):
     with global_ahk_lock:
         _send_level(level)
         _set_delay(key_delay, key_duration, mouse_delay)
-        ahk_call("SendEvent", keys)
+        ahk_call("SendEvent", _keys_str(keys))
 
 
-def send_play(keys, *, key_delay=None, key_duration=None, mouse_delay=None, **rest):
-    """Send simulated keystrokes and mouse clicks using the Play mode."""
+def _send_play(keys, key_delay, key_duration, mouse_delay):
     with global_ahk_lock:
         # SendPlay is not affected by SendLevel.
         _set_delay(key_delay, key_duration, mouse_delay, play=True)
-        ahk_call("SendPlay", keys)
+        ahk_call("SendPlay", _keys_str(keys))
 
 
-def _send_level(level):
+def send_buffer(flush_after=0.005) -> "SendBuffer":
+    """send_buffer(flush_after=0.005) -> ahkpy.SendBuffer
+
+    Return a :class:`SendBuffer` that merges the consecutive sends into one
+    call to AHK.
+
+    Sending keys one by one, e.g. the characters generated by a timer, calls
+    ``SendInput`` every time. The user keystrokes can get in between the
+    calls, and every call sets ``SendLevel`` and the delays again. While the
+    buffer is active, the keys of :func:`send`, :func:`send_input`,
+    :func:`send_event`, and :func:`send_play` are collected and sent
+    together::
+
+        @ahkpy.hotkey("F1")
+        def type_greeting():
+            ahkpy.send_buffer().activate()
+            for word in ("Hello", ", ", "world"):
+                ahkpy.send(word)
+
+    The keys that are collected are sent at the flush points:
+
+    - before any other call to AHK, e.g. a window function, :func:`sleep`, or
+      :func:`get_key_state`, so the order of actions is kept;
+    - before the keys of the different send mode, level, or delays are
+      collected;
+    - *flush_after* seconds after the first collected key;
+    - on :meth:`SendBuffer.flush` and on exit from the with-statement.
+
+    The buffer can be activated with the with-statement or, like
+    :func:`local_settings`, with :meth:`SendBuffer.activate` in a callback.
+    If the collected keys are not flushed when the callback returns, they
+    are merged with the keys of the next callback that uses the buffer,
+    until *flush_after* seconds pass.
+    """
+    return SendBuffer(flush_after)
+
+
+def coalesced_send() -> "SendBuffer":
+    """coalesced_send() -> ahkpy.SendBuffer
+
+    Return a :class:`SendBuffer` that merges the consecutive sends in the
+    with-statement and sends them at the flush points only::
+
+        with ahkpy.coalesced_send():
+            for char in text:
+                ahkpy.send(char)
+
+    This is the same as ``send_buffer(flush_after=None)``.
+    """
+    return SendBuffer(None)
+
+
+class SendBuffer:
+    """The buffer that merges the consecutive sends created by
+    :func:`send_buffer` and :func:`coalesced_send`.
+
+    The consecutive keys are merged if they are sent in the same mode with the
+    same level and delays. Sending the merged keys is the same as a single
+    :func:`send` of the concatenated keys. The keys that start with
+    ``{Blind}`` are not merged with the other keys, and no keys are appended
+    after ``{Text}``.
+
+    The keys are parsed with :func:`ahkpy.keys.compile`. If the keys cannot be
+    parsed, the collected keys are flushed and the keys are sent as is.
+
+    The errors of the collected sends are raised at the flush point.
+    """
+
+    def __init__(self, flush_after=0.005):
+        if flush_after is not None and flush_after <= 0:
+            raise ValueError("flush_after must be positive")
+        #: The number of seconds after which the collected keys are sent, or
+        #: ``None`` to send them only at the flush points.
+        self.flush_after = flush_after
+        self._timer = None
+        # The tokens of the nested with-statements that use the buffer.
+        self._tokens = []
+
+    def activate(self) -> "SendBuffer":
+        """Start collecting the sends of the current thread."""
+        _current_send_buffer.set(self)
+        return self
+
+    def __enter__(self):
+        self._tokens.append(_current_send_buffer.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        _current_send_buffer.reset(self._tokens.pop())
+        # The keys are sent even on error, as if they were not buffered.
+        self.flush()
+
+    def flush(self):
+        """Send the collected keys now."""
+        pending = flow._pending_send
+        if pending is not None:
+            pending.flush()
+
+    def _add(self, func, keys, args):
+        try:
+            keys = compile_keys(keys)
+        except (TypeError, ValueError):
+            # Let AHK handle the keys. The collected keys are flushed before
+            # the call.
+            return False
+        with global_ahk_lock:
+            pending = flow._pending_send
+            if pending is not None and not pending.add(func, keys, args):
+                pending.flush()
+                pending = None
+            if pending is None:
+                if self.flush_after is not None:
+                    # Start the timer before the keys are pending, otherwise
+                    # the SetTimer call would flush them.
+                    if self._timer is None:
+                        self._timer = Timer(self.flush_after, self.flush, periodic=False)
+                    self._timer.start(self.flush_after)
+                flow._pending_send = _PendingSend(func, keys, args)
+        return True
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} flush_after={self.flush_after!r}>"
+
+
+class _PendingSend:
+    # The keys collected by SendBuffer that are waiting to be sent. The
+    # instance is stored in flow._pending_send, so that the other AHK calls
+    # flush it first.
+
+    __slots__ = ("func", "args", "blind", "events")
+
+    def __init__(self, func, keys, args):
+        self.func = func
+        self.args = args
+        self.blind = keys.blind
+        self.events = list(keys.events)
+
+    def add(self, func, keys, args):
+        if func is not self.func or args != self.args or keys.blind != self.blind:
+            return False
+        if keys.events and self.events and self.events[-1].kind == "text":
+            return False
+        self.events.extend(keys.events)
+        return True
+
+    def flush(self):
+        with global_ahk_lock:
+            if flow._pending_send is not self:
+                # Already flushed by another thread.
+                return
+            flow._pending_send = None
+            self.func(CompiledKeys(tuple(self.events), self.blind), *self.args)
+
+
+_current_send_buffer = contextvars.ContextVar("ahk_send_buffer")
+
+
+def _buffer_send(func, keys, *args):
+    buffer = _current_send_buffer.get(None)
+    if buffer is None:
+        return False
+    return buffer._add(func, keys, args)
+
+
+def _keys_str(keys):
+    if isinstance(keys, CompiledKeys):
+        return str(keys)
+    return keys
+
+
+def _get_send_level(level):
     if level is None:
-        level = get_settings().send_level
+        return get_settings().send_level
     elif not 0 <= level <= 100:
         raise ValueError("level must be between 0 and 100")
-    ahk_call("SendLevel", int(level))
+    return level
+
+
+def _send_level(level):
+    ahk_call("SendLevel", int(_get_send_level(level)))
+
+
+def _get_delays(key_delay=None, key_duration=None, mouse_delay=None, play=False):
+    settings = get_settings()
+    if play:
+        defaults = (settings.key_delay_play, settings.key_duration_play, settings.mouse_delay_play)
+    else:
+        defaults = (settings.key_delay, settings.key_duration, settings.mouse_delay)
+    return tuple(
+        value if value is not None else default
+        for value, default in zip((key_delay, key_duration, mouse_delay), defaults)
+    )
 
 
 def _set_delay(key_delay=None, key_duration=None, mouse_delay=None, play=False):
@@ -0,0 +1,132 @@
+import dataclasses as dc
+import re
+import threading
+import time
+
+from .clipboard import set_clipboard
+from .exceptions import Error
+from .flow import ahk_call, sleep
+from .sending import send_input
+from .window import Control, windows
+
+__all__ = [
+    "TextInsertion",
+    "insert_text",
+]
+
+
+@dc.dataclass(frozen=True)
+class TextInsertion:
+    """The immutable result of :func:`insert_text`."""
+
+    #: The strategy that inserted the text: ``"clipboard"``, ``"control"``, or
+    #: ``"send"``.
+    strategy: str
+
+    #: The number of seconds the insertion took, including the choice of the
+    #: strategy.
+    elapsed: float
+
+
+_STRATEGIES = ("auto", "clipboard", "control", "send")
+# Edit, RichEdit20W, RICHEDIT50W, WindowsForms10.EDIT.app.0.1234.
+_EDIT_CLASS_RE = re.compile(r"(?:edit|richedit\w*|windowsforms\d*\.edit\..*)", re.IGNORECASE)
+
+# Held while insert_text() uses the clipboard. AHK keeps a single saved
+# clipboard, so another thread or a callback that interrupts the insertion
+# cannot use it.
+_clipboard_lock = threading.Lock()
+
+
+def insert_text(text: str, strategy="auto", *, max_send_length=64, paste_keys="^v", restore_delay=0.25,
+                timeout=1) -> TextInsertion:
+    """Insert the *text* into the active window.
+
+    Sending a long text with :func:`send` types it keystroke by keystroke,
+    which takes time and can be interleaved with the user input. The
+    *strategy* argument chooses a faster way:
+
+    - ``"clipboard"`` – put the *text* into the clipboard, press *paste_keys*,
+      wait *restore_delay* seconds for the window to read the clipboard, and
+      restore the previous clipboard contents in all formats.
+    - ``"control"`` – paste the *text* into the focused Edit control of the
+      active window with :meth:`Control.paste`. The clipboard is not used.
+    - ``"send"`` – send the *text* with :func:`send_input` in the ``{Text}``
+      mode.
+    - ``"auto"`` – send the text that is not longer than *max_send_length*.
+      Paste the longer text into the focused Edit control, or via the
+      clipboard if no Edit control is focused. If the clipboard cannot be
+      set in *timeout* seconds or is in use by another :func:`insert_text`
+      call, send the text.
+
+    Returns a :class:`TextInsertion` with the used strategy and the time it
+    took::
+
+        result = ahkpy.insert_text(snippet)
+        print(result.strategy, result.elapsed)
+
+    :raises Error: if the focused control is not an Edit control for the
+       ``"control"`` strategy, or the clipboard cannot be set or is in use by
+       another :func:`insert_text` call for the ``"clipboard"`` strategy.
+    """
+    if strategy not in _STRATEGIES:
+        raise ValueError(f"{strategy!r} is not a valid strategy")
+    text = str(text)
+    start = time.perf_counter()
+
+    auto = strategy == "auto"
+    control = None
+    if auto:
+        if len(text) <= max_send_length:
+            strategy = "send"
+        else:
+            control = _get_focused_edit()
+            strategy = "control" if control else "clipboard"
+    elif strategy == "control":
+        control = _get_focused_edit()
+        if not control:
+            raise Error("the focused control is not an Edit control")
+
+    if strategy == "clipboard":
+        if not _clipboard_lock.acquire(blocking=False):
+            if not auto:
+                raise Error("clipboard is in use by another insert_text() call")
+            strategy = "send"
+        else:
+            try:
+                pasted = _paste_from_clipboard(text, paste_keys, restore_delay, timeout)
+            finally:
+                _clipboard_lock.release()
+            if not pasted:
+                if not auto:
+                    raise Error("cannot set the clipboard")
+                strategy = "send"
+    if strategy == "control":
+        control.paste(text)
+    elif strategy == "send":
+        send_input("{Text}" + text)
+    return TextInsertion(strategy, time.perf_counter() - start)
+
+
+def _get_focused_edit() -> Control:
+    control = windows.get_active().get_focused_control()
+    if control and _EDIT_CLASS_RE.fullmatch(control.class_name or ""):
+        return control
+    return Control(None)
+
+
+def _paste_from_clipboard(text, paste_keys, restore_delay, timeout):
+    ahk_call("ClipboardSave")
+    try:
+        # Empty the clipboard first, so ClipWait doesn't return the old text
+        # if the clipboard cannot be opened.
+        set_clipboard("")
+        set_clipboard(text)
+        if not ahk_call("ClipWait", timeout):
+            return False
+        send_input(paste_keys)
+        # The window reads the clipboard when it handles the keys.
+        sleep(restore_delay)
+    finally:
+        ahk_call("ClipboardRestore")
+    return True
@@ -0,0 +1,186 @@
+import dataclasses as dc
+from typing import Dict, Iterator, List, Optional
+
+from .flow import sleep
+from .window import Control
+
+__all__ = [
+    "TextDiff",
+    "TextWatcher",
+]
+
+
+@dc.dataclass(frozen=True)
+class TextDiff:
+    """The immutable object that describes the changed lines of an Edit control
+    returned by :meth:`TextWatcher.poll`.
+    """
+
+    #: The number of lines before the change.
+    old_line_count: int
+
+    #: The number of lines after the change.
+    line_count: int
+
+    #: The dict mapping the line numbers to the new text of the changed and
+    #: appended lines.
+    changed: Dict[int, str]
+
+    @property
+    def appended(self) -> List[str]:
+        """The lines added to the end of the control.
+
+        :type: List[str]
+        """
+        return [self.changed[i] for i in range(self.old_line_count, self.line_count)]
+
+    @property
+    def removed(self) -> range:
+        """The numbers of the lines removed from the end of the control.
+
+        :type: range
+        """
+        return range(self.line_count, self.old_line_count)
+
+    def apply(self, lines: List[str]) -> List[str]:
+        """Get the copy of the old *lines* with the changes applied."""
+        lines = list(lines[:self.line_count])
+        lines.extend([""] * (self.line_count - len(lines)))
+        for lineno, text in self.changed.items():
+            lines[lineno] = text
+        return lines
+
+
+class TextWatcher:
+    """The object that detects the changed lines of an Edit control created
+    by :meth:`Control.text_watcher`.
+
+    Reading :attr:`Control.text` of a large Edit control, e.g. a log window,
+    on every tick sends all its text from AHK to Python. The watcher asks AHK
+    only for the checksums of the blocks of *block_size* lines and reads the
+    lines of the changed blocks. AHK reads the text of the control with a
+    single message and hashes it in place. Then the watcher compares the
+    hashes of the read lines with the previous ones and reports only the
+    changed lines::
+
+        watcher = log_control.text_watcher()
+        for diff in watcher.watch(interval=0.5):
+            for line in diff.appended:
+                print(line)
+
+    The first :meth:`poll` reports all lines as appended.
+
+    The lines are separated by newlines. A line wrapped by the control is
+    reported as a single line.
+    """
+
+    def __init__(self, control: Control, *, block_size=64):
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+        self.control = control
+        self.block_size = block_size
+        self._line_hashes = []
+        self._block_hashes = []
+
+    @property
+    def line_count(self) -> int:
+        """The number of lines known to the watcher.
+
+        :type: int
+        """
+        return len(self._line_hashes)
+
+    def poll(self) -> Optional[TextDiff]:
+        """Check the control for the changed lines.
+
+        Returns a :class:`TextDiff` if the lines have changed since the last
+        call. Returns ``None`` if nothing has changed or the control doesn't
+        exist.
+
+        :command: `ControlGetText
+           <https://www.autohotkey.com/docs/commands/ControlGetText.htm>`_
+        """
+        diff = self._poll()
+        if diff is _MISSING:
+            return None
+        return diff
+
+    def watch(self, interval=0.5) -> Iterator[TextDiff]:
+        """Poll the control every *interval* seconds and yield the changes.
+
+        The iteration stops when the control doesn't exist anymore.
+        """
+        while True:
+            diff = self._poll()
+            if diff is _MISSING:
+                return
+            if diff is not None:
+                yield diff
+            sleep(interval)
+
+    def reset(self):
+        """Forget the known lines, so the next :meth:`poll` reports all lines
+        as appended.
+        """
+        self._line_hashes = []
+        self._block_hashes = []
+
+    def _poll(self):
+        control = self.control
+        result = control._call("ControlHashEditLines", control.id or 0, self.block_size)
+        if not result:
+            return _MISSING
+        line_count = int(result["count"])
+        hashes = str(result["hashes"])[1:]
+        block_hashes = [int(h) for h in hashes.split(",")] if hashes else []
+
+        old_line_count = len(self._line_hashes)
+        changed_blocks = [
+            i for i, block_hash in enumerate(block_hashes)
+            if i >= len(self._block_hashes) or self._block_hashes[i] != block_hash
+        ]
+        if not changed_blocks and line_count == old_line_count:
+            return None
+
+        ranges = []
+        for i in changed_blocks:
+            start = i * self.block_size
+            stop = start + self.block_size
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], stop)
+            else:
+                ranges.append((start, stop))
+        lines = []
+        if ranges:
+            fetched = control._get_edit_lines(ranges)
+            if fetched is None:
+                return _MISSING
+            fetched_line_count, lines = fetched
+            if fetched_line_count != line_count:
+                # The text has changed between the calls. Keep the known lines
+                # and compare them on the next poll.
+                return None
+
+        line_hashes = self._line_hashes[:line_count]
+        line_hashes.extend([None] * (line_count - len(line_hashes)))
+        changed = {}
+        lines_iter = iter(lines)
+        for start, stop in ranges:
+            for lineno in range(start, min(stop, line_count)):
+                text = next(lines_iter)
+                line_hash = hash(text)
+                if lineno >= old_line_count or line_hashes[lineno] != line_hash:
+                    changed[lineno] = text
+                line_hashes[lineno] = line_hash
+
+        self._line_hashes = line_hashes
+        self._block_hashes = block_hashes
+        if not changed and line_count == old_line_count:
+            return None
+        return TextDiff(old_line_count, line_count, changed)
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} control={self.control!r} line_count={self.line_count}>"
+
+
+_MISSING = object()
@@ -1,24 +1,36 @@
 from __future__ import annotations
 
+import array
+import collections
 import ctypes
 import dataclasses as dc
 import enum
 import struct
-from typing import Iterator, List, Optional, Tuple, Union
+import threading
+import time
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
 
 from . import colors
 from . import sending
 from .exceptions import Error
 from .flow import ahk_call, global_ahk_lock, _wait_for
 from .hotkey_context import HotkeyContext
+from .process_info import get_process_info
 from .settings import get_settings, optional_ms
 from .unset import UNSET, UnsetType
+from .window_message import HSHELL_WINDOWDESTROYED, _shell_hook
 
 __all__ = [
     "Control",
+    "ControlSnapshot",
     "ExWindowStyle",
     "Window",
+    "WindowCache",
+    "WindowCacheInfo",
+    "WindowGeometry",
+    "WindowRect",
     "Windows",
+    "WindowSnapshot",
     "WindowStyle",
     "all_windows",
     "visible_windows",
@@ -128,9 +140,10 @@ class Windows:
 
         :param str match: sets the matching behavior. For more information refer
            to :meth:`filter`.
+
+        To exclude windows by *class_name*, *id*, *pid*, or *exe*, use
+        :meth:`WindowQuery.exclude`.
         """
-        # TODO: Consider implementing class_name, id, pid, and exe exclusion in
-        # Python.
         if title is UNSET and text is UNSET and match is None:
             return self
 
@@ -280,7 +293,7 @@ class Windows:
            <https://www.autohotkey.com/docs/commands/WinWait.htm>`_
         """
         self = self._filter(title, class_name, id, pid, exe, text, match)
-        return _wait_for(timeout, self.exist) or Window(None)
+        return _wait_for(timeout, self.exist, key=("exist", self)) or Window(None)
 
     def wait_active(self, title=UNSET, *, class_name=UNSET, id=UNSET, pid=UNSET, exe=UNSET, text=UNSET, match=None,
                     timeout=None):
@@ -297,7 +310,7 @@ class Windows:
         query = self._query()
         if query == ("", "", "", ""):
             self = dc.replace(self, title="A")
-        return _wait_for(timeout, self.get_active) or Window(None)
+        return _wait_for(timeout, self.get_active, key=("get_active", self)) or Window(None)
 
     def wait_inactive(self, title=UNSET, *, class_name=UNSET, id=UNSET, pid=UNSET, exe=UNSET, text=UNSET, match=None,
                       timeout=None) -> bool:
@@ -316,7 +329,7 @@ class Windows:
            <https://www.autohotkey.com/docs/commands/WinWaitActive.htm>`_
         """
         self = self._filter(title, class_name, id, pid, exe, text, match)
-        return _wait_for(timeout, lambda: not self.get_active()) or False
+        return _wait_for(timeout, self.get_active, key=("get_active", self), negate=True) or False
 
     def wait_close(self, title=UNSET, *, class_name=UNSET, id=UNSET, pid=UNSET, exe=UNSET, text=UNSET, match=None,
                    timeout=None):
@@ -337,7 +350,7 @@ class Windows:
         self = self._filter(title, class_name, id, pid, exe, text, match)
         # WinWaitClose doesn't set Last Found Window, return False if the wait
         # was timed out.
-        return _wait_for(timeout, lambda: not self.exist()) or False
+        return _wait_for(timeout, self.exist, key=("exist", self), negate=True) or False
 
     def close_all(self, title=UNSET, *, class_name=UNSET, id=UNSET, pid=UNSET, exe=UNSET, text=UNSET, match=None,
                   timeout=None):
@@ -451,14 +464,34 @@ class Windows:
             self._call("WinMinimizeAll", set_delay=True)
             return
 
-        query_hash = hash(self)
-        query_hash_str = str(query_hash).replace("-", "m")  # AHK doesn't allow "-" in group names
-        label = ""
-        self._call("GroupAdd", query_hash_str, *self._include(), label, *self._exclude())
-        self._call(cmd, f"ahk_group {query_hash_str}", "", "", set_delay=True)
+        group_name = self.window_group()
+        self._call(cmd, f"ahk_group {group_name}", "", "", set_delay=True)
         if timeout is not UNSET:
             return self.wait_close(timeout=timeout)
 
+    def window_group(self) -> str:
+        """Get the name of the AHK window group that matches the windows.
+
+        The group is added with the `GroupAdd
+        <https://www.autohotkey.com/docs/commands/GroupAdd.htm>`_ command the
+        first time it's requested for the criteria, and then it's reused. AHK
+        can't delete the window groups, so the group lives until the script
+        exits. The name can be used in the AHK code as ``ahk_group <name>``.
+
+        The bulk actions like :meth:`close_all` and :meth:`minimize_all` use
+        this group.
+        """
+        key = (*self._include(), *self._exclude())
+        with global_ahk_lock:
+            group_name = _window_groups.get(key)
+            if group_name is not None:
+                return group_name
+            group_name = f"ahkpy_group_{len(_window_groups) + 1}"
+            label = ""
+            self._call("GroupAdd", group_name, *self._include(), label, *self._exclude())
+            _window_groups[key] = group_name
+            return group_name
+
     def window_context(self, title=UNSET, *, class_name=UNSET, id=UNSET, pid=UNSET, exe=UNSET, text=UNSET, match=None):
         """window_context(title: str = UNSET, **criteria) -> ahkpy.HotkeyContext
 
@@ -554,6 +587,57 @@ class Windows:
         """
         return self._call("WinGet", "Count", *self._query()) or 0
 
+    def query(self):
+        """query() -> ahkpy.WindowQuery
+
+        Compile the criteria into a :class:`WindowQuery` that is evaluated in
+        Python over a shared snapshot of the windows.
+        """
+        from .window_query import WindowQuery
+        return WindowQuery(self)
+
+    def snapshot(
+            self, fields=("title", "class_name", "pid", "process_name", "style", "ex_style", "rect"),
+    ) -> WindowSnapshot:
+        """Get the attributes of all matching windows in a single call to AHK.
+
+        Getting an attribute of every window one by one takes a call to AHK per
+        attribute. This method gets all *fields* of all matching windows at
+        once and returns them as a :class:`WindowSnapshot` table::
+
+            snapshot = ahk.all_windows.snapshot(fields=("title", "pid"))
+            for win, title in zip(snapshot, snapshot.column("title")):
+                print(win.id, title)
+
+        The windows are ordered from top to bottom. The window ids are always
+        included. The supported fields are :attr:`~Window.title`,
+        :attr:`~Window.class_name`, :attr:`~Window.pid`,
+        :attr:`~Window.process_name`, :attr:`~Window.process_path`,
+        :attr:`~Window.style`, :attr:`~Window.ex_style`, ``min_max`` which is
+        -1 if the window is minimized, 1 if it's maximized, and 0 otherwise,
+        ``x``, ``y``, ``width``, ``height``, and ``rect`` which is a shortcut
+        for the last four.
+
+        :command: `WinGet, $, List
+           <https://www.autohotkey.com/docs/commands/WinGet.htm#List>`_
+        """
+        field_list = _snapshot_field_list(fields, _SNAPSHOT_FIELDS)
+
+        result = self._call("WinSnapshot", ",".join(field_list), *self._query())
+        return WindowSnapshot._from_ahk(field_list, result)
+
+    def spatial_index(self, *, cell_size=256):
+        """spatial_index(*, cell_size=256) -> ahkpy.WindowSpatialIndex
+
+        Get the :class:`WindowSpatialIndex` of the matching windows to find
+        them by point, rectangle, or direction without calling AHK.
+
+        The index is built from a single :meth:`snapshot`. The minimized
+        windows are not indexed.
+        """
+        from .window_spatial import WindowSpatialIndex
+        return WindowSpatialIndex.from_snapshot(self.snapshot(fields=("rect", "min_max")), cell_size=cell_size)
+
     def __repr__(self):
         field_strs = []
         for field in dc.fields(self):
@@ -592,6 +676,9 @@ class Windows:
 
             if set_delay:
                 ahk_call("SetWinDelay", optional_ms(get_settings().win_delay))
+                if _window_cache is not None:
+                    # The command changes an unknown set of windows.
+                    _window_cache._invalidate_mutable()
 
             return ahk_call(cmd, *args)
 
@@ -626,6 +713,258 @@ class Windows:
 windows = visible_windows = Windows()
 all_windows = windows.include_hidden_windows()
 
+# Maps the GroupAdd criteria to the group name. AHK groups only grow, so every
+# criteria must be added to a group only once.
+_window_groups = {}
+
+# The enabled WindowCache instance.
+_window_cache = None
+
+
+_INT_SNAPSHOT_FIELDS = {"id", "pid", "style", "ex_style", "min_max", "x", "y", "width", "height"}
+_STR_SNAPSHOT_FIELDS = {"title", "class_name", "process_name", "process_path"}
+_SNAPSHOT_FIELDS = _INT_SNAPSHOT_FIELDS | _STR_SNAPSHOT_FIELDS
+_RECT_FIELDS = ("x", "y", "width", "height")
+
+_BOOL_CONTROL_SNAPSHOT_FIELDS = {"is_visible", "is_enabled", "is_checked"}
+_INT_CONTROL_SNAPSHOT_FIELDS = {"id", "style", "ex_style", "x", "y", "width", "height"} | _BOOL_CONTROL_SNAPSHOT_FIELDS
+_STR_CONTROL_SNAPSHOT_FIELDS = {"class_nn", "class_name", "text"}
+_CONTROL_SNAPSHOT_FIELDS = _INT_CONTROL_SNAPSHOT_FIELDS | _STR_CONTROL_SNAPSHOT_FIELDS
+
+
+def _snapshot_field_list(fields, valid_fields):
+    # Expand "rect" and put "id" first.
+    if isinstance(fields, str):
+        fields = (fields,)
+    field_list = ["id"]
+    for field in fields:
+        if field == "rect":
+            expanded = _RECT_FIELDS
+        elif field in valid_fields:
+            expanded = (field,)
+        else:
+            raise ValueError(f"{field!r} is not a valid snapshot field")
+        for f in expanded:
+            if f not in field_list:
+                field_list.append(f)
+    return field_list
+
+
+def _split_by_lengths(data, lengths):
+    # Split the concatenated strings by their comma-separated lengths. Strip
+    # the "s" prefix that prevents AHK from converting the strings to numbers.
+    data = str(data)[1:]
+    lengths = str(lengths)
+    if not lengths:
+        return []
+    if data.isascii():
+        values = []
+        pos = 0
+        for length in map(int, lengths.split(",")):
+            values.append(data[pos:pos + length])
+            pos += length
+        return values
+    # AHK StrLen counts the UTF-16 code units, so a non-BMP character, e.g. an
+    # emoji, takes two units.
+    encoded = data.encode("utf-16-le", "surrogatepass")
+    values = []
+    pos = 0
+    for length in map(int, lengths.split(",")):
+        values.append(encoded[pos:pos + 2 * length].decode("utf-16-le", "surrogatepass"))
+        pos += 2 * length
+    return values
+
+
+class WindowSnapshot:
+    """The column-oriented table of window attributes returned by
+    :meth:`Windows.snapshot`.
+
+    The integer columns are stored in :class:`array.array` and the string
+    columns in lists. Indexing and iterating over the snapshot gives the
+    :class:`Window` instances; the values of a single window are returned by
+    :meth:`row`.
+
+    The snapshot is not updated when the windows change.
+    """
+
+    __slots__ = ("_columns", "_ids")
+
+    _int_fields = _INT_SNAPSHOT_FIELDS
+    _fields = _SNAPSHOT_FIELDS
+
+    @staticmethod
+    def _item_class(win_id):
+        return Window(win_id)
+
+    def __init__(self, columns):
+        if "id" not in columns:
+            raise ValueError("the snapshot must have the 'id' column")
+        self._ids = self._column_values("id", columns["id"])
+        # Keep "id" the first column.
+        self._columns = {"id": self._ids}
+        for field, values in columns.items():
+            if field == "id":
+                continue
+            if field not in self._fields:
+                raise ValueError(f"{field!r} is not a valid snapshot field")
+            values = self._column_values(field, values)
+            if len(values) != len(self._ids):
+                raise ValueError(f"the length of the {field!r} column doesn't match the 'id' column")
+            self._columns[field] = values
+
+    @classmethod
+    def _from_ahk(cls, fields, result):
+        if result is None:
+            # The window query matches nothing.
+            return cls({field: [] for field in fields})
+        columns = {}
+        for field in fields:
+            data = str(result[field])
+            if field in cls._int_fields:
+                columns[field] = array.array("q", map(int, data.split(","))) if data else array.array("q")
+                continue
+            columns[field] = _split_by_lengths(data, result[f"{field}_len"])
+        return cls(columns)
+
+    @classmethod
+    def _column_values(cls, field, values):
+        if field in cls._int_fields:
+            if isinstance(values, array.array) and values.typecode == "q":
+                return values
+            return array.array("q", values)
+        return list(values)
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """The names of the columns.
+
+        :type: Tuple[str, ...]
+        """
+        return tuple(self._columns)
+
+    def column(self, field):
+        """Get all values of the *field* column.
+
+        Returns an :class:`array.array` for the integer fields and a list for
+        the string fields. The returned object is shared with the snapshot and
+        must not be modified.
+        """
+        try:
+            return self._columns[field]
+        except KeyError:
+            raise KeyError(f"the snapshot doesn't have the {field!r} column") from None
+
+    def row(self, index) -> dict:
+        """Get the values of the window at *index* as a dict mapping the field
+        names to the values.
+
+        The :attr:`~Window.style` and :attr:`~Window.ex_style` values are
+        converted to :class:`WindowStyle` and :class:`ExWindowStyle`. If the
+        snapshot has all ``x``, ``y``, ``width``, and ``height`` columns, the
+        row also has the ``rect`` tuple.
+        """
+        row = {field: values[index] for field, values in self._columns.items()}
+        if "style" in row:
+            row["style"] = WindowStyle(row["style"])
+        if "ex_style" in row:
+            row["ex_style"] = ExWindowStyle(row["ex_style"])
+        if all(f in row for f in _RECT_FIELDS):
+            row["rect"] = tuple(row[f] for f in _RECT_FIELDS)
+        return row
+
+    def rows(self) -> Iterator[dict]:
+        """Iterate over the rows of the snapshot, see :meth:`row`."""
+        for i in range(len(self._ids)):
+            yield self.row(i)
+
+    def index(self, win) -> int:
+        """Get the index of the window *win* which is either a :class:`Window`
+        instance or a window id.
+
+        Raises :exc:`ValueError` if the window is not in the snapshot.
+        """
+        win_id = win.id if isinstance(win, WindowHandle) else win
+        return self._ids.index(win_id)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._item_class(win_id) for win_id in self._ids[index]]
+        return self._item_class(self._ids[index])
+
+    def __iter__(self) -> Iterator[Window]:
+        for win_id in self._ids:
+            yield self._item_class(win_id)
+
+    def __contains__(self, win):
+        win_id = win.id if isinstance(win, WindowHandle) else win
+        return win_id in self._ids
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} fields={self.fields!r} len={len(self)}>"
+
+
+class ControlSnapshot(WindowSnapshot):
+    """The column-oriented table of control attributes returned by
+    :meth:`Window.control_snapshot`.
+
+    Works like :class:`WindowSnapshot`, but indexing and iterating over the
+    snapshot gives the :class:`Control` instances. The controls can also be
+    looked up by their ClassNN if the snapshot has the ``class_nn`` column::
+
+        snapshot = win.control_snapshot()
+        ok_button = snapshot["Button1"]
+        print(snapshot.row(snapshot.index("Edit1"))["text"])
+    """
+
+    __slots__ = ()
+
+    _int_fields = _INT_CONTROL_SNAPSHOT_FIELDS
+    _fields = _CONTROL_SNAPSHOT_FIELDS
+
+    @staticmethod
+    def _item_class(control_id):
+        return Control(control_id)
+
+    def row(self, index) -> dict:
+        """Get the values of the control at *index* as a dict mapping the field
+        names to the values.
+
+        The ``is_visible``, ``is_enabled``, and ``is_checked`` values are
+        converted to :class:`bool`. For the other conversions see
+        :meth:`WindowSnapshot.row`.
+        """
+        row = super().row(index)
+        for field in _BOOL_CONTROL_SNAPSHOT_FIELDS:
+            if field in row:
+                row[field] = bool(row[field])
+        return row
+
+    def index(self, control) -> int:
+        """Get the index of the *control* which is either a :class:`Control`
+        instance, a control id, or a ClassNN string like ``"Button1"``.
+
+        Raises :exc:`ValueError` if the control is not in the snapshot.
+        """
+        if isinstance(control, str):
+            try:
+                return self.column("class_nn").index(control)
+            except ValueError:
+                raise ValueError(f"{control!r} is not in the snapshot") from None
+        return super().index(control)
+
+    def __getitem__(self, index):
+        if isinstance(index, str):
+            return Control(self._ids[self.index(index)])
+        return super().__getitem__(index)
+
+    def __contains__(self, control):
+        if isinstance(control, str):
+            return control in self.column("class_nn")
+        return super().__contains__(control)
+
 
 @dc.dataclass(frozen=True)
 class WindowHandle:
@@ -678,9 +1017,16 @@ class WindowHandle:
 
             if set_delay:
                 self._set_delay()
+                # The commands that change the window/control are called with
+                # the delay.
+                self._invalidate_cache()
 
             return ahk_call(cmd, *args)
 
+    def _invalidate_cache(self):
+        if _window_cache is not None and self.id:
+            _window_cache._invalidate_mutable(self.id)
+
     def _set_delay(self):
         raise NotImplementedError
 
@@ -725,7 +1071,7 @@ class BaseWindow(WindowHandle):
            `Control, $, Style
            <https://www.autohotkey.com/docs/commands/Control.htm#Style>`_
         """
-        style = self._get("Style")
+        style = self._cached("style", lambda: self._get("Style"))
         if style is None:
             return None
         return WindowStyle(style)
@@ -751,7 +1097,7 @@ class BaseWindow(WindowHandle):
            `Control, $, ExStyle
            <https://www.autohotkey.com/docs/commands/Control.htm#ExStyle>`_
         """
-        ex_style = self._get("ExStyle")
+        ex_style = self._cached("ex_style", lambda: self._get("ExStyle"))
         if ex_style is None:
             return None
         return ExWindowStyle(ex_style)
@@ -771,6 +1117,9 @@ class BaseWindow(WindowHandle):
         :command: `WinGetClass
            <https://www.autohotkey.com/docs/commands/WinGetClass.htm>`_
         """
+        return self._cached("class_name", self._get_class_name)
+
+    def _get_class_name(self):
         class_name = self._call("WinGetClass", *self._include())
         if class_name == "":
             # Windows API doesn't allow the class name to be an empty string. If
@@ -791,7 +1140,7 @@ class BaseWindow(WindowHandle):
         :command: `WinGet, PID
            <https://www.autohotkey.com/docs/commands/WinGet.htm#PID>`_
         """
-        return Window._get(self, "PID")
+        return self._cached("pid", lambda: Window._get(self, "PID"))
 
     @property
     def process_name(self) -> Optional[str]:
@@ -807,7 +1156,7 @@ class BaseWindow(WindowHandle):
         :command: `WinGet, ProcessName
            <https://www.autohotkey.com/docs/commands/WinGet.htm#ProcessName>`_
         """
-        return Window._get(self, "ProcessName")
+        return self._cached("process_name", lambda: self._get_process_attr("name", "ProcessName"))
 
     exe = process_name
 
@@ -823,7 +1172,17 @@ class BaseWindow(WindowHandle):
         :command: `WinGet, ProcessPath
            <https://www.autohotkey.com/docs/commands/WinGet.htm#ProcessPath>`_
         """
-        return Window._get(self, "ProcessPath")
+        return self._cached("process_path", lambda: self._get_process_attr("path", "ProcessPath"))
+
+    def _get_process_attr(self, attr, subcmd):
+        pid = self.pid
+        if pid is None:
+            return None
+        info = get_process_info(pid)
+        if info is None:
+            # The process cannot be opened, e.g. it's elevated. Let AHK try.
+            return Window._get(self, subcmd)
+        return getattr(info, attr)
 
     @property
     def rect(self) -> Optional[Tuple[int, int, int, int]]:
@@ -842,6 +1201,9 @@ class BaseWindow(WindowHandle):
            `ControlMove
            <https://www.autohotkey.com/docs/commands/ControlMove.htm>`_
         """
+        return self._cached("rect", self._get_rect)
+
+    def _get_rect(self):
         result = self._get_pos()
         if result is None:
             return None
@@ -963,7 +1325,7 @@ class BaseWindow(WindowHandle):
     @size.setter
     def size(self, new_size):
         width, height = new_size
-        self.move(width, height)
+        self.move(width=width, height=height)
 
     @property
     def width(self):
@@ -1034,6 +1396,58 @@ class BaseWindow(WindowHandle):
             int(height) if height is not None else "",
         )
 
+    @property
+    def rect_snapshot(self) -> Optional[WindowRect]:
+        """The position and size of the window/control as a
+        :class:`WindowRect` named tuple (read-only).
+
+        Unlike the :attr:`x`, :attr:`y`, :attr:`width`, and :attr:`height`
+        properties that get the position on each access, the returned tuple
+        holds all four values read at once::
+
+            rect = win.rect_snapshot
+            center = (rect.x + rect.width // 2, rect.y + rect.height // 2)
+
+        Returns ``None`` unless the window exists.
+
+        :type: WindowRect
+
+        :command: `WinGetPos
+           <https://www.autohotkey.com/docs/commands/WinGetPos.htm>`_,
+           `ControlGetPos
+           <https://www.autohotkey.com/docs/commands/ControlGetPos.htm>`_
+        """
+        rect = self.rect
+        if rect is None or None in rect:
+            return None
+        return WindowRect(*rect)
+
+    def geometry(self) -> WindowGeometry:
+        """Get the view of the window/control position and size that reads
+        them once and applies the changes in a single move.
+
+        Changing the :attr:`x` and :attr:`y` properties one by one gets the
+        position and moves the window twice. Use the geometry view to do it at
+        once::
+
+            with win.geometry() as g:
+                g.x += dx
+                g.y += dy
+
+        The position is read when entering the ``with`` block, and the window
+        is moved when leaving it unless an exception was raised. The window is
+        not moved if the values have not changed.
+
+        :command: `WinGetPos
+           <https://www.autohotkey.com/docs/commands/WinGetPos.htm>`_,
+           `ControlGetPos
+           <https://www.autohotkey.com/docs/commands/ControlGetPos.htm>`_,
+           `WinMove <https://www.autohotkey.com/docs/commands/WinMove.htm>`_,
+           `ControlMove
+           <https://www.autohotkey.com/docs/commands/ControlMove.htm>`_
+        """
+        return WindowGeometry(self)
+
     @property
     def is_enabled(self) -> Optional[bool]:
         """The enabled state of the window/control.
@@ -1220,32 +1634,12 @@ class BaseWindow(WindowHandle):
             # Using a 32-bit version of AutoHotkey, result is a 32-bit int.
             return True
 
-        kernel32 = ctypes.windll.kernel32
-        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
-        proc_handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, True, self.pid)
-        if not proc_handle:
-            # Couldn't get the process handle.
-            return False
-
-        try:
-            from ctypes import wintypes
-            process_machine = wintypes.USHORT()
-            native_machine = wintypes.USHORT()
-            ok = kernel32.IsWow64Process2(proc_handle, ctypes.byref(process_machine), ctypes.byref(native_machine))
-            if not ok:
-                # IsWow64Process2 failed.
-                return False
-
-            IMAGE_FILE_MACHINE_I386 = 0x014c
-            if native_machine.value == IMAGE_FILE_MACHINE_I386:
-                # OS is 32-bit.
-                return True
-            elif process_machine.value == IMAGE_FILE_MACHINE_I386:
-                # Target window is 32-bit.
-                return True
+        pid = self.pid
+        info = get_process_info(pid) if pid is not None else None
+        if info is None or info.is_32bit is None:
+            # Couldn't get the process information.
             return False
-        finally:
-            kernel32.CloseHandle(proc_handle)
+        return info.is_32bit
 
     def post_message(self, msg: int, w_param: int = 0, l_param: int = 0) -> Optional[bool]:
         """Post a message to the window/control.
@@ -1274,6 +1668,12 @@ class BaseWindow(WindowHandle):
                 err.message = "there was a problem posting message"
             raise
 
+    def _cached(self, attr, load):
+        cache = _window_cache
+        if cache is None or not self.id:
+            return load()
+        return cache._get(self.id, attr, load)
+
     def _get_pos(self):
         raise NotImplementedError
 
@@ -1288,6 +1688,7 @@ class BaseWindow(WindowHandle):
         # properties. It's OK to use 'WinSet' for controls because control delay
         # has no effect on the 'Control, Style' command and they essentially do
         # the same.
+        self._invalidate_cache()
         try:
             super()._call("WinSet", subcmd, value, *self._include())
         except Error as err:
@@ -1296,6 +1697,370 @@ class BaseWindow(WindowHandle):
             raise
 
 
+class WindowRect(NamedTuple):
+    """The position and size of a window/control returned by
+    :attr:`BaseWindow.rect_snapshot`.
+    """
+
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+_RECT_INDEX = {"x": 0, "y": 1, "width": 2, "height": 3}
+
+
+class WindowGeometry:
+    """The view of the window/control position and size returned by
+    :meth:`BaseWindow.geometry`.
+
+    The properties return the values read by :meth:`reload` with the pending
+    changes applied. The changes are sent to AHK with :meth:`apply`. If the
+    window doesn't exist, the properties return ``None`` and the changes are
+    discarded.
+    """
+
+    __slots__ = ("window", "_rect", "_changes")
+
+    def __init__(self, window: BaseWindow):
+        self.window = window
+        self._rect = None
+        self._changes = {}
+
+    def __enter__(self):
+        self.reload()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.apply()
+        else:
+            self._changes = {}
+
+    def reload(self):
+        """Read the position and size of the window and discard the pending
+        changes.
+        """
+        rect = self.window.rect
+        if rect is not None and None in rect:
+            # AHK returns empty values if the window doesn't exist.
+            rect = None
+        self._rect = rect
+        self._changes = {}
+
+    def apply(self):
+        """Move the window if any value has changed."""
+        rect, changes = self._rect, self._changes
+        self._changes = {}
+        if rect is None:
+            return
+        changes = {
+            name: value
+            for name, value in changes.items()
+            if value != rect[_RECT_INDEX[name]]
+        }
+        if not changes:
+            return
+        self.window.move(**changes)
+        new_rect = list(rect)
+        for name, value in changes.items():
+            new_rect[_RECT_INDEX[name]] = value
+        self._rect = tuple(new_rect)
+
+    def _get(self, name):
+        if self._rect is None:
+            return None
+        try:
+            return self._changes[name]
+        except KeyError:
+            return self._rect[_RECT_INDEX[name]]
+
+    def _set(self, name, value):
+        self._changes[name] = int(value)
+
+    @property
+    def x(self) -> Optional[int]:
+        """The *x* coordinate of the window/control.
+
+        :type: int
+        """
+        return self._get("x")
+
+    @x.setter
+    def x(self, value):
+        self._set("x", value)
+
+    @property
+    def y(self) -> Optional[int]:
+        """The *y* coordinate of the window/control.
+
+        :type: int
+        """
+        return self._get("y")
+
+    @y.setter
+    def y(self, value):
+        self._set("y", value)
+
+    @property
+    def width(self) -> Optional[int]:
+        """The window/control width.
+
+        :type: int
+        """
+        return self._get("width")
+
+    @width.setter
+    def width(self, value):
+        self._set("width", value)
+
+    @property
+    def height(self) -> Optional[int]:
+        """The window/control height.
+
+        :type: int
+        """
+        return self._get("height")
+
+    @height.setter
+    def height(self, value):
+        self._set("height", value)
+
+    @property
+    def position(self) -> Optional[Tuple[int, int]]:
+        """The window/control position as a ``(x, y)`` tuple.
+
+        :type: Tuple[int, int]
+        """
+        if self._rect is None:
+            return None
+        return self.x, self.y
+
+    @position.setter
+    def position(self, value):
+        self.x, self.y = value
+
+    @property
+    def size(self) -> Optional[Tuple[int, int]]:
+        """The window/control size as a ``(width, height)`` tuple.
+
+        :type: Tuple[int, int]
+        """
+        if self._rect is None:
+            return None
+        return self.width, self.height
+
+    @size.setter
+    def size(self, value):
+        self.width, self.height = value
+
+    @property
+    def rect(self) -> Optional[WindowRect]:
+        """The position and size of the window/control.
+
+        :type: WindowRect
+        """
+        if self._rect is None:
+            return None
+        return WindowRect(self.x, self.y, self.width, self.height)
+
+    @rect.setter
+    def rect(self, value):
+        self.x, self.y, self.width, self.height = value
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} window={self.window!r} rect={self.rect!r}>"
+
+
+class WindowCacheInfo(NamedTuple):
+    """The statistics of the window attribute cache returned by
+    :meth:`WindowCache.cache_info`.
+    """
+
+    #: The number of attribute reads that were served from the cache.
+    hits: int
+
+    #: The number of attribute reads that called AHK.
+    misses: int
+
+    #: The maximum number of windows/controls in the cache.
+    maxsize: int
+
+    #: The current number of windows/controls in the cache.
+    currsize: int
+
+
+class WindowCache:
+    """The opt-in cache of the window/control attributes.
+
+    Reading an attribute like :attr:`Window.class_name` calls AHK every time.
+    When the cache is enabled, the attributes of :class:`Window` and
+    :class:`Control` instances are read from AHK only once::
+
+        with ahkpy.WindowCache(ttl=0.5):
+            win = ahkpy.windows.get_active()
+            if win.class_name == "Notepad" and win.process_name == "notepad.exe":
+                ...
+
+    The attributes that don't change during the window lifetime
+    (:attr:`~BaseWindow.class_name`, :attr:`~BaseWindow.pid`,
+    :attr:`~BaseWindow.process_name`, :attr:`~BaseWindow.process_path`) are
+    cached until the window is destroyed. The other attributes
+    (:attr:`Window.title`, :attr:`~BaseWindow.style`,
+    :attr:`~BaseWindow.ex_style`, :attr:`~BaseWindow.rect`, and the minimized
+    and maximized state) are cached for *ttl* seconds. Changing the window with
+    AutoHotkey.py, e.g. moving or minimizing it, drops its cached attributes
+    that can change.
+
+    The cache holds the attributes of up to *maxsize* windows/controls, and
+    drops the least recently used ones. If *track_destroyed* is true, the
+    windows are dropped from the cache when the shell reports they are
+    destroyed, so the attributes are not reused if Windows reuses the window
+    handle. Controls are not reported by the shell; call :meth:`invalidate`
+    if a control is recreated.
+
+    Only one cache can be enabled at a time.
+    """
+
+    #: The attributes that are cached until the window is destroyed.
+    IMMUTABLE_ATTRIBUTES = frozenset({"class_name", "pid", "process_name", "process_path"})
+
+    #: The attributes that are cached for *ttl* seconds.
+    MUTABLE_ATTRIBUTES = frozenset({"title", "style", "ex_style", "rect", "min_max"})
+
+    def __init__(self, *, ttl=0.1, maxsize=256, track_destroyed=True):
+        if ttl < 0:
+            raise ValueError("ttl must not be negative")
+        if maxsize < 1:
+            raise ValueError("maxsize must be positive")
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.track_destroyed = track_destroyed
+        self._lock = threading.Lock()
+        # Maps the window id to the dict of attribute names to the (value,
+        # expiration time) pairs. The least recently used windows come first.
+        self._windows = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def is_enabled(self) -> bool:
+        """Whether the cache is enabled.
+
+        :type: bool
+        """
+        return _window_cache is self
+
+    def enable(self) -> 'WindowCache':
+        """Start caching the window attributes.
+
+        Returns the cache itself.
+
+        :raises RuntimeError: if another cache is enabled.
+        """
+        global _window_cache
+        with global_ahk_lock:
+            if _window_cache is self:
+                return self
+            if _window_cache is not None:
+                raise RuntimeError("another window cache is already enabled")
+            if self.track_destroyed:
+                _shell_hook.subscribe(self._handle_shell_event)
+            _window_cache = self
+        return self
+
+    def disable(self):
+        """Stop caching the window attributes and clear the cache."""
+        global _window_cache
+        with global_ahk_lock:
+            if _window_cache is not self:
+                return
+            _window_cache = None
+            if self.track_destroyed:
+                _shell_hook.unsubscribe(self._handle_shell_event)
+        self.invalidate()
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def invalidate(self, win: Optional[BaseWindow] = None, attr: Optional[str] = None):
+        """Drop the cached attributes.
+
+        If *win* is given, drops only the attributes of the given
+        window/control. If *attr* is given, drops only the given attribute,
+        e.g. ``"title"``.
+        """
+        if attr is not None and attr not in self.IMMUTABLE_ATTRIBUTES | self.MUTABLE_ATTRIBUTES:
+            raise ValueError(f"{attr!r} is not a cached attribute")
+        with self._lock:
+            if win is None:
+                win_ids = list(self._windows)
+            else:
+                win_ids = [win.id] if win.id in self._windows else []
+            for win_id in win_ids:
+                if attr is None:
+                    del self._windows[win_id]
+                else:
+                    self._windows[win_id].pop(attr, None)
+
+    def cache_info(self) -> WindowCacheInfo:
+        """Get the statistics of the cache."""
+        with self._lock:
+            return WindowCacheInfo(self._hits, self._misses, self.maxsize, len(self._windows))
+
+    def _get(self, win_id, attr, load):
+        now = time.monotonic()
+        with self._lock:
+            attrs = self._windows.get(win_id)
+            if attrs is not None:
+                self._windows.move_to_end(win_id)
+                entry = attrs.get(attr)
+                if entry is not None and (entry[1] is None or now < entry[1]):
+                    self._hits += 1
+                    return entry[0]
+            self._misses += 1
+
+        value = load()
+
+        with self._lock:
+            if value is None or isinstance(value, tuple) and None in value:
+                # The window doesn't exist.
+                self._windows.pop(win_id, None)
+                return value
+            attrs = self._windows.get(win_id)
+            if attrs is None:
+                attrs = self._windows[win_id] = {}
+                while len(self._windows) > self.maxsize:
+                    self._windows.popitem(last=False)
+            expires = None if attr in self.IMMUTABLE_ATTRIBUTES else now + self.ttl
+            attrs[attr] = (value, expires)
+        return value
+
+    def _invalidate_mutable(self, win_id=None):
+        with self._lock:
+            if win_id is None:
+                attr_dicts = list(self._windows.values())
+            elif win_id in self._windows:
+                attr_dicts = [self._windows[win_id]]
+            else:
+                return
+            for attrs in attr_dicts:
+                for attr in self.MUTABLE_ATTRIBUTES:
+                    attrs.pop(attr, None)
+
+    def _handle_shell_event(self, code, l_param):
+        if code == HSHELL_WINDOWDESTROYED:
+            with self._lock:
+                self._windows.pop(l_param, None)
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} ttl={self.ttl!r} maxsize={self.maxsize!r} len={len(self._windows)}>"
+
+
 class Window(BaseWindow):
     """The object representing a window."""
 
@@ -1351,6 +2116,9 @@ class Window(BaseWindow):
            `WinSetTitle
            <https://www.autohotkey.com/docs/commands/WinSetTitle.htm>`_
         """
+        return self._cached("title", self._get_title)
+
+    def _get_title(self):
         title = self._call("WinGetTitle", *self._include())
         # If the window doesn't exist, AHK returns an empty string. Check that
         # the window exists.
@@ -1360,6 +2128,7 @@ class Window(BaseWindow):
 
     @title.setter
     def title(self, new_title):
+        self._invalidate_cache()
         return self._call("WinSetTitle", *self._include(), str(new_title))
 
     @property
@@ -1380,7 +2149,7 @@ class Window(BaseWindow):
            `WinRestore
            <https://www.autohotkey.com/docs/commands/WinRestore.htm>`_
         """
-        min_max = self._get("MinMax")
+        min_max = self._cached("min_max", lambda: self._get("MinMax"))
         if min_max is None:
             return None
         return min_max == -1
@@ -1432,7 +2201,7 @@ class Window(BaseWindow):
         :command: `WinGet, MinMax
            <https://www.autohotkey.com/docs/commands/WinGet.htm#MinMax>`_
         """
-        min_max = self._get("MinMax")
+        min_max = self._cached("min_max", lambda: self._get("MinMax"))
         if min_max is None:
             return None
         return min_max == 0
@@ -1465,7 +2234,7 @@ class Window(BaseWindow):
            `WinRestore
            <https://www.autohotkey.com/docs/commands/WinRestore.htm>`_
         """
-        min_max = self._get("MinMax")
+        min_max = self._cached("min_max", lambda: self._get("MinMax"))
         if min_max is None:
             return None
         return min_max == 1
@@ -1542,6 +2311,39 @@ class Window(BaseWindow):
             for hwnd in hwnds
         ]
 
+    def control_snapshot(
+            self, fields=("class_nn", "class_name", "text", "is_visible", "is_enabled", "rect"),
+    ) -> Optional[ControlSnapshot]:
+        """Get the attributes of all window controls in a single call to AHK.
+
+        Getting an attribute of every control in :attr:`controls` one by one
+        takes a call to AHK per attribute. This method gets all *fields* of all
+        controls at once and returns them as a :class:`ControlSnapshot` table::
+
+            snapshot = win.control_snapshot(fields=("class_nn", "text"))
+            for row in snapshot.rows():
+                print(row["class_nn"], row["text"])
+
+        The control ids are always included. The supported fields are
+        ``class_nn``, :attr:`~Control.class_name`, :attr:`~Control.text`,
+        :attr:`~Control.is_visible`, :attr:`~Control.is_enabled`,
+        :attr:`~Control.is_checked`, :attr:`~Control.style`,
+        :attr:`~Control.ex_style`, ``x``, ``y``, ``width``, ``height``, and
+        ``rect`` which is a shortcut for the last four. The position is
+        relative to the window, like in :attr:`Control.rect`.
+
+        Returns ``None`` unless the window exists.
+
+        :command: `WinGet, ControlListHwnd
+           <https://www.autohotkey.com/docs/commands/WinGet.htm#ControlListHwnd>`_
+        """
+        field_list = _snapshot_field_list(fields, _CONTROL_SNAPSHOT_FIELDS)
+
+        result = self._call("WinControlSnapshot", ",".join(field_list), *self._include())
+        if not result:
+            return None
+        return ControlSnapshot._from_ahk(field_list, result)
+
     def get_control(self, class_or_text, match="startswith") -> Control:
         """get_control(class_or_text, match="startswith") -> ahkpy.Control
 
@@ -2265,6 +3067,47 @@ class Control(BaseWindow):
                 err.message = out_of_range_err
             raise
 
+    def get_lines(self, start=0, stop=None) -> Optional[List[str]]:
+        """Retrieve the text of the lines from *start* to *stop* (exclusive) in
+        an Edit control in a single call to AHK.
+
+        Line 0 is the first line. If *stop* is ``None`` or is greater than the
+        number of lines, the lines are retrieved until the end. Returns
+        ``None`` if the control doesn't exist.
+
+        The text is read once and split by newlines. Unlike :meth:`get_line`,
+        a line wrapped by the control is returned as a single line.
+
+        :command: `ControlGetText
+           <https://www.autohotkey.com/docs/commands/ControlGetText.htm>`_
+        """
+        result = self._get_edit_lines([(start, stop)])
+        if result is None:
+            return None
+        _, lines = result
+        return lines
+
+    def _get_edit_lines(self, ranges):
+        # Get the line count and the lines in the (start, stop) ranges.
+        range_strs = []
+        for start, stop in ranges:
+            if start < 0 or stop is not None and stop < 0:
+                raise ValueError("line numbers must not be negative")
+            range_strs.append(f"{start}:{stop if stop is not None else 0x7FFFFFFF}")
+        result = self._call("ControlGetEditLines", self.id or 0, ",".join(range_strs))
+        if not result:
+            return None
+        return int(result["count"]), _split_by_lengths(result["text"], result["lengths"])
+
+    def text_watcher(self, *, block_size=64):
+        """text_watcher(*, block_size=64) -> ahkpy.TextWatcher
+
+        Create a :class:`TextWatcher` that detects the changed lines of an
+        Edit control without reading all its text every time.
+        """
+        from .text_watcher import TextWatcher
+        return TextWatcher(self, block_size=block_size)
+
     @property
     def current_line(self) -> Optional[str]:
         """The text of the line in an Edit control where the caret resides
@@ -2554,6 +3397,62 @@ class Control(BaseWindow):
                     err.message = "there was a problem getting list items"
             raise err
 
+    def iter_list_items(self, start=0, stop=None, *, columns=None, chunk=1000) -> Iterator[List[str]]:
+        """Iterate over the rows of a ListView control.
+
+        Unlike :attr:`list_items` and :meth:`get_list_items` that get all rows
+        at once, the rows are read from the control in chunks of *chunk* rows
+        and yielded one by one, so reading a part of a large ListView is
+        cheap::
+
+            for name, size in control.iter_list_items(columns=[0, 2]):
+                if name == "setup.exe":
+                    break
+
+        The *start* and *stop* arguments are the zero-based indexes of the
+        first row and the row after the last one. If *stop* is ``None``, the
+        rows are read until the end of the list. The *columns* argument is a
+        list of the zero-based column indexes to read; all columns are read if
+        it's ``None``. Each row is a list of strings. The values containing
+        tabs and newlines are returned intact.
+
+        Yields nothing if the control doesn't exist or isn't a ListView.
+        Raises an :exc:`Error` if there was a problem getting list items, or
+        the 32-bit AutoHotkey reads the ListView of a 64-bit process.
+        """
+        if start < 0 or stop is not None and stop < 0:
+            raise ValueError("start and stop must not be negative")
+        if chunk < 1:
+            raise ValueError("chunk must be positive")
+        if columns is not None:
+            columns = [int(column) for column in columns]
+            if not columns:
+                raise ValueError("columns must not be empty")
+            if any(column < 0 for column in columns):
+                raise ValueError("column indexes must not be negative")
+            columns_str = ",".join(map(str, columns))
+        else:
+            columns_str = ""
+
+        index = start
+        while stop is None or index < stop:
+            count = chunk if stop is None else min(chunk, stop - index)
+            result = self._call("ControlGetListViewRows", self.id or 0, index, count, columns_str)
+            if not result:
+                # The control doesn't exist or isn't a ListView.
+                return
+            row_count = int(result["rows"])
+            if row_count == 0:
+                return
+            values = _split_by_lengths(result["text"], result["lengths"])
+            width = len(values) // row_count
+            for i in range(0, len(values), width):
+                yield values[i:i + width]
+            index += row_count
+            if row_count < count:
+                # The end of the list.
+                return
+
     def _split_list_items(self, string):
         if string == "":
             return []
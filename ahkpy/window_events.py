@@ -0,0 +1,352 @@
+import asyncio
+import collections
+import ctypes
+import dataclasses as dc
+import enum
+import threading
+from typing import Optional, Union
+
+from . import flow
+from .window import Window, Windows, WindowSnapshot, all_windows
+from .window_message import (
+    HSHELL_GETMINRECT,
+    HSHELL_REDRAW,
+    HSHELL_RUDEAPPACTIVATED,
+    HSHELL_WINDOWACTIVATED,
+    HSHELL_WINDOWCREATED,
+    HSHELL_WINDOWDESTROYED,
+    _shell_hook,
+)
+from .window_query import WindowQuery
+
+__all__ = [
+    "WindowEvent",
+    "WindowEventSubscription",
+    "WindowEventType",
+    "window_events",
+]
+
+
+class WindowEventType(enum.Enum):
+    """The type of a :class:`WindowEvent`."""
+
+    CREATED = "created"
+    DESTROYED = "destroyed"
+    ACTIVATED = "activated"
+    TITLE_CHANGED = "title_changed"
+    MINIMIZED = "minimized"
+    RESTORED = "restored"
+
+    #: The subscriber didn't keep up with the events and some of them were
+    #: dropped.
+    OVERFLOW = "overflow"
+
+
+@dc.dataclass(frozen=True)
+class WindowEvent:
+    """The immutable object that describes a change of a window."""
+
+    #: The type of the event.
+    type: WindowEventType
+
+    #: The window that has changed. For the :attr:`~WindowEventType.OVERFLOW`
+    #: events it's ``Window(None)``.
+    window: Window
+
+    #: The window title at the time of the event. For the
+    #: :attr:`~WindowEventType.DESTROYED` events it's the last known title.
+    title: Optional[str] = None
+
+    #: The number of events that were dropped. Set only for the
+    #: :attr:`~WindowEventType.OVERFLOW` events.
+    dropped: int = 0
+
+
+def window_events(windows: Union[Windows, WindowQuery] = all_windows, callback=None, *, max_queue=1000):
+    """Subscribe to the events of the windows matching the *windows* criteria.
+
+    The events are produced from the shell hook messages, so the windows are
+    not polled. A single shell hook is shared by all subscribers, and every
+    subscriber gets only the events of the windows matching its criteria.
+
+    If *callback* is given, it's called with the :class:`WindowEvent` in the
+    AHK thread that receives the shell message::
+
+        def on_event(event):
+            print(event.type, event.title)
+
+        subscription = ahkpy.window_events(ahkpy.windows.filter(exe="notepad.exe"), on_event)
+
+    Otherwise, the events are put in a queue of *max_queue* events, and the
+    returned :class:`WindowEventSubscription` works as an iterator and an
+    asynchronous iterator::
+
+        for event in ahkpy.window_events():
+            if event.type is ahkpy.WindowEventType.CREATED:
+                print("created", event.window)
+
+    Call :meth:`WindowEventSubscription.unsubscribe` to stop receiving the
+    events.
+    """
+    if max_queue < 1:
+        raise ValueError("max_queue must be positive")
+    if callback is not None and not callable(callback):
+        raise TypeError("callback must be callable")
+    if isinstance(windows, Windows):
+        windows = windows.query()
+    subscription = WindowEventSubscription(windows, callback, max_queue)
+    _event_source.subscribe(subscription)
+    return subscription
+
+
+class WindowEventSubscription:
+    """The subscription to the window events created by
+    :func:`window_events`.
+
+    Iterating over the subscription waits for the events while letting AHK
+    process its messages. The iteration stops when the subscription is
+    cancelled with :meth:`unsubscribe` and the queued events are consumed.
+
+    If the subscriber falls behind and the queue is full, the new events are
+    dropped until all queued events are consumed. Then the subscriber gets the
+    :attr:`~WindowEventType.OVERFLOW` event with the number of dropped events.
+    """
+
+    def __init__(self, query, callback, max_queue):
+        self.query = query
+        self.callback = callback
+        self.max_queue = max_queue
+        self._lock = threading.Lock()
+        self._queue = collections.deque()
+        self._dropped = 0
+        self._waiters = []
+        self._active = True
+        # The ids of the windows that matched the query the last time.
+        self._matched = set()
+
+    @property
+    def is_active(self) -> bool:
+        """Whether the subscription receives the events.
+
+        :type: bool
+        """
+        return self._active
+
+    def unsubscribe(self):
+        """Stop receiving the events."""
+        self._active = False
+        _event_source.unsubscribe(self)
+        self._wake_waiters()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.unsubscribe()
+
+    def get(self, timeout=None) -> Optional[WindowEvent]:
+        """Get the next event.
+
+        Waits for *timeout* seconds until an event arrives. If *timeout* is
+        ``None``, waits until an event arrives or the subscription is
+        cancelled. Returns ``None`` if there are no events.
+        """
+        event = self._pop()
+        if event is not None or timeout == 0:
+            return event
+        if timeout is not None:
+            flow._wait_for(timeout, lambda: self._queue or self._dropped or not self._active)
+        else:
+            while not (self._queue or self._dropped or not self._active):
+                flow.sleep(flow._poll_interval)
+        return self._pop()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> WindowEvent:
+        event = self.get()
+        if event is None:
+            raise StopIteration
+        return event
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> WindowEvent:
+        while True:
+            event = self._pop()
+            if event is not None:
+                return event
+            if not self._active:
+                raise StopAsyncIteration
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+            with self._lock:
+                if self._queue or self._dropped:
+                    continue
+                self._waiters.append((loop, waiter))
+            await waiter
+
+    def _pop(self):
+        with self._lock:
+            if self._queue:
+                return self._queue.popleft()
+            if self._dropped:
+                event = WindowEvent(WindowEventType.OVERFLOW, Window(None), dropped=self._dropped)
+                self._dropped = 0
+                return event
+        return None
+
+    def _put(self, event):
+        if self.callback is not None:
+            self.callback(event)
+            return
+        with self._lock:
+            if self._dropped or len(self._queue) >= self.max_queue:
+                self._dropped += 1
+                return
+            self._queue.append(event)
+        self._wake_waiters()
+
+    def _wake_waiters(self):
+        with self._lock:
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} query={self.query!r} queued={len(self._queue)}>"
+
+
+def _wake(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class _SHELLHOOKINFO(ctypes.Structure):
+    _fields_ = [
+        ("hwnd", ctypes.c_void_p),
+        ("rc", ctypes.c_long * 4),
+    ]
+
+
+class _WindowEventSource:
+    # Turns the shell hook messages into the window events and dispatches them
+    # to the subscribers.
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.subscriptions = []
+        # The last known attributes of the windows.
+        self.rows = {}
+
+    def subscribe(self, subscription):
+        with self.lock:
+            first = not self.subscriptions
+            self.subscriptions.append(subscription)
+            fields = self._fields()
+        snapshot = all_windows.snapshot(fields=fields)
+        with self.lock:
+            if first:
+                self.rows = {snapshot.column("id")[i]: snapshot.row(i) for i in range(len(snapshot))}
+            ids = snapshot.column("id")
+            subscription._matched = {ids[i] for i in subscription.query.select(snapshot)}
+        if first:
+            try:
+                _shell_hook.subscribe(self.handle_shell_event)
+            except BaseException:
+                self.unsubscribe(subscription)
+                raise
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            try:
+                self.subscriptions.remove(subscription)
+            except ValueError:
+                return
+            last = not self.subscriptions
+            if last:
+                self.rows = {}
+        if last:
+            _shell_hook.unsubscribe(self.handle_shell_event)
+
+    def _fields(self):
+        fields = {"title", "min_max", "style"}
+        for subscription in self.subscriptions:
+            fields.update(subscription.query.fields)
+        fields.discard("id")
+        return sorted(fields)
+
+    def handle_shell_event(self, code, l_param):
+        if code == HSHELL_WINDOWDESTROYED:
+            self._destroyed(l_param)
+            return
+        if code == HSHELL_GETMINRECT:
+            # lParam points to the SHELLHOOKINFO structure.
+            win_id = _SHELLHOOKINFO.from_address(l_param).hwnd or 0
+        else:
+            win_id = l_param
+        if not win_id:
+            return
+
+        with self.lock:
+            fields = self._fields()
+        snapshot = all_windows.filter(id=win_id).snapshot(fields=fields)
+        if len(snapshot) == 0:
+            # The window is already gone.
+            return
+        row = snapshot.row(0)
+        with self.lock:
+            prev_row = self.rows.get(win_id)
+            self.rows[win_id] = row
+
+        if code == HSHELL_WINDOWCREATED:
+            event_type = WindowEventType.CREATED
+        elif code in (HSHELL_WINDOWACTIVATED, HSHELL_RUDEAPPACTIVATED):
+            event_type = WindowEventType.ACTIVATED
+        elif code == HSHELL_REDRAW:
+            if prev_row is None or prev_row["title"] == row["title"]:
+                event_type = None
+            else:
+                event_type = WindowEventType.TITLE_CHANGED
+        elif code == HSHELL_GETMINRECT:
+            was_minimized = prev_row is not None and prev_row["min_max"] == -1
+            if row["min_max"] == -1 and not was_minimized:
+                event_type = WindowEventType.MINIMIZED
+            elif row["min_max"] != -1 and was_minimized:
+                event_type = WindowEventType.RESTORED
+            else:
+                event_type = None
+        else:
+            return
+
+        event = None
+        if event_type is not None:
+            event = WindowEvent(event_type, Window(win_id), row["title"])
+        self._dispatch(snapshot, event)
+
+    def _destroyed(self, win_id):
+        with self.lock:
+            row = self.rows.pop(win_id, None)
+            subscriptions = list(self.subscriptions)
+        event = WindowEvent(WindowEventType.DESTROYED, Window(win_id), row["title"] if row is not None else None)
+        for subscription in subscriptions:
+            if win_id in subscription._matched:
+                subscription._matched.discard(win_id)
+                subscription._put(event)
+
+    def _dispatch(self, snapshot: WindowSnapshot, event: Optional[WindowEvent]):
+        win_id = snapshot.column("id")[0]
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+        for subscription in subscriptions:
+            if subscription.query.select(snapshot):
+                subscription._matched.add(win_id)
+                if event is not None:
+                    subscription._put(event)
+            else:
+                subscription._matched.discard(win_id)
+
+
+_event_source = _WindowEventSource()
@@ -0,0 +1,251 @@
+import threading
+from typing import Iterator, List, Optional
+
+from .flow import ahk_call
+from .timer import set_timer
+from .unset import UNSET
+from .window import Window, Windows, windows
+from .window_message import (
+    HSHELL_REDRAW,
+    HSHELL_RUDEAPPACTIVATED,
+    HSHELL_WINDOWACTIVATED,
+    HSHELL_WINDOWCREATED,
+    HSHELL_WINDOWDESTROYED,
+    _shell_hook,
+)
+
+__all__ = [
+    "WindowIndex",
+]
+
+
+_INDEX_FIELDS = ("title", "class_name", "pid", "process_name")
+
+
+class WindowIndex:
+    """The index of the windows that is kept up to date by the shell hook
+    messages.
+
+    The index takes a single snapshot of the windows matching the *windows*
+    criteria when it's started. Then it updates only the windows that the
+    shell reports as created, destroyed, activated, or redrawn, so looking up
+    the windows by id, process, executable, or class doesn't call AHK::
+
+        index = ahkpy.WindowIndex().start()
+        notepads = index.by_exe("notepad.exe")
+        active_win = index.active
+
+    The shell doesn't report all changes, e.g. the windows that become
+    visible or change the class. The index is reconciled with a full snapshot
+    every *reconcile_interval* seconds to catch them. If *reconcile_interval*
+    is ``None``, the index is reconciled only when :meth:`reconcile` is called.
+
+    The index is opt-in because the shell hook makes AHK process every window
+    event. Call :meth:`stop` when the index is no longer needed.
+    """
+
+    def __init__(self, windows: Windows = windows, *, reconcile_interval=5.0):
+        if reconcile_interval is not None and reconcile_interval <= 0:
+            raise ValueError("reconcile_interval must be positive")
+        self.windows = windows
+        self.reconcile_interval = reconcile_interval
+        self._lock = threading.RLock()
+        self._rows = {}
+        self._by_pid = {}
+        self._by_exe = {}
+        self._by_class = {}
+        self._active = None
+        self._timer = None
+        self._started = False
+
+    def start(self) -> 'WindowIndex':
+        """Take the snapshot of the windows, and start listening to the shell
+        hook messages and reconciling the index periodically.
+
+        Returns the index itself.
+        """
+        if self._started:
+            return self
+        _shell_hook.subscribe(self.handle_shell_event)
+        self._started = True
+        try:
+            self.reconcile()
+            if self.reconcile_interval is not None:
+                self._timer = set_timer(self.reconcile_interval, self.reconcile)
+        except BaseException:
+            self.stop()
+            raise
+        return self
+
+    def stop(self):
+        """Stop updating the index."""
+        if not self._started:
+            return
+        self._started = False
+        _shell_hook.unsubscribe(self.handle_shell_event)
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def reconcile(self) -> int:
+        """Take a full snapshot of the windows and update the index.
+
+        Returns the number of windows that were added, removed, or updated
+        because their events were missed.
+        """
+        snapshot = self.windows.snapshot(fields=_INDEX_FIELDS)
+        active_id = ahk_call("WinExist", "A") or None
+        changes = 0
+        with self._lock:
+            seen = set()
+            for i in range(len(snapshot)):
+                row = snapshot.row(i)
+                seen.add(row["id"])
+                if self._rows.get(row["id"]) != row:
+                    self._put(row)
+                    changes += 1
+            for win_id in list(self._rows):
+                if win_id not in seen:
+                    self._remove(win_id)
+                    changes += 1
+            self._active = active_id
+        return changes
+
+    def handle_shell_event(self, code, win_id):
+        """Update the index on the shell hook message with the HSHELL_* *code*
+        concerning the window *win_id*.
+
+        It's called by the shell hook. Call it directly to feed the index with
+        the synthetic events.
+        """
+        if code == HSHELL_WINDOWDESTROYED:
+            with self._lock:
+                self._remove(win_id)
+                if self._active == win_id:
+                    self._active = None
+        elif code in (HSHELL_WINDOWACTIVATED, HSHELL_RUDEAPPACTIVATED):
+            with self._lock:
+                # lParam is 0 when the desktop or a window not managed by the
+                # shell gets activated.
+                self._active = win_id or None
+                known = win_id in self._rows
+            if win_id and not known:
+                self._refresh(win_id)
+        elif code in (HSHELL_WINDOWCREATED, HSHELL_REDRAW):
+            self._refresh(win_id)
+
+    def _refresh(self, win_id):
+        snapshot = self.windows.filter(id=win_id).snapshot(fields=_INDEX_FIELDS)
+        with self._lock:
+            if len(snapshot) == 0:
+                self._remove(win_id)
+            else:
+                self._put(snapshot.row(0))
+
+    def _put(self, row):
+        win_id = row["id"]
+        self._remove(win_id)
+        self._rows[win_id] = row
+        self._by_pid.setdefault(row["pid"], {})[win_id] = None
+        self._by_exe.setdefault(row["process_name"].lower(), {})[win_id] = None
+        self._by_class.setdefault(row["class_name"], {})[win_id] = None
+
+    def _remove(self, win_id):
+        row = self._rows.pop(win_id, None)
+        if row is None:
+            return
+        _discard(self._by_pid, row["pid"], win_id)
+        _discard(self._by_exe, row["process_name"].lower(), win_id)
+        _discard(self._by_class, row["class_name"], win_id)
+
+    def get(self, win) -> Optional[dict]:
+        """Get the indexed attributes of the window *win* which is either a
+        :class:`Window` instance or a window id.
+
+        Returns a dict with the ``id``, ``title``, ``class_name``, ``pid``, and
+        ``process_name`` keys, or ``None`` if the window is not in the index.
+        """
+        win_id = win.id if isinstance(win, Window) else win
+        with self._lock:
+            row = self._rows.get(win_id)
+            return dict(row) if row is not None else None
+
+    def by_pid(self, pid) -> List[Window]:
+        """Get the windows of the process with the given *pid*."""
+        return self._lookup(self._by_pid, pid)
+
+    def by_exe(self, exe) -> List[Window]:
+        """Get the windows of the process with the given executable name. The
+        name is case-insensitive.
+        """
+        return self._lookup(self._by_exe, exe.lower())
+
+    def by_class(self, class_name) -> List[Window]:
+        """Get the windows of the given class."""
+        return self._lookup(self._by_class, class_name)
+
+    def _lookup(self, index, key):
+        with self._lock:
+            return [Window(win_id) for win_id in index.get(key, ())]
+
+    def first(self, *, class_name=UNSET, pid=UNSET, exe=UNSET) -> Window:
+        """Return an indexed window that matches all given criteria.
+
+        If there are no matching windows, returns ``Window(None)``.
+        """
+        candidates = []
+        with self._lock:
+            if class_name is not UNSET:
+                candidates.append(self._by_class.get(class_name, {}))
+            if pid is not UNSET:
+                candidates.append(self._by_pid.get(pid, {}))
+            if exe is not UNSET:
+                candidates.append(self._by_exe.get(exe.lower(), {}))
+            if not candidates:
+                candidates.append(self._rows)
+            smallest = min(candidates, key=len)
+            for win_id in smallest:
+                if all(win_id in c for c in candidates):
+                    return Window(win_id)
+        return Window(None)
+
+    @property
+    def active(self) -> Window:
+        """The active window as last reported by the shell.
+
+        If the active window is unknown, returns ``Window(None)``.
+
+        :type: Window
+        """
+        return Window(self._active)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[Window]:
+        with self._lock:
+            win_ids = list(self._rows)
+        for win_id in win_ids:
+            yield Window(win_id)
+
+    def __contains__(self, win):
+        win_id = win.id if isinstance(win, Window) else win
+        return win_id in self._rows
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} windows={self.windows!r} len={len(self)}>"
+
+
+def _discard(index, key, win_id):
+    win_ids = index.get(key)
+    if win_ids is None:
+        return
+    win_ids.pop(win_id, None)
+    if not win_ids:
+        del index[key]
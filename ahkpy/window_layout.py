@@ -0,0 +1,121 @@
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+from .flow import ahk_call
+from .settings import get_settings, optional_ms
+from .window import Control, Window, WindowRect
+
+__all__ = [
+    "apply_layout",
+]
+
+
+def apply_layout(
+    layout: Mapping[Union[Window, int], Sequence[Optional[int]]],
+    *,
+    skip_unchanged=True,
+) -> List[Window]:
+    """Move and resize many windows at once.
+
+    The *layout* maps the :class:`Window` instances or window ids to the
+    ``(x, y, width, height)`` tuples. The ``None`` values keep the current
+    position or size of the window::
+
+        ahkpy.apply_layout({
+            left_win: (0, 0, 960, 1080),
+            right_win: (960, 0, 960, 1080),
+            bottom_win: (None, 800, None, None),
+        })
+
+    Unlike calling :meth:`Window.move` for every window, the windows are moved
+    in a single call to AHK as a deferred window position batch, so the
+    desktop is repainted once. The :attr:`~Settings.win_delay` is applied once
+    after all windows are moved.
+
+    If *skip_unchanged* is true, the windows that already have the requested
+    position and size are not moved. The windows that don't exist are
+    skipped.
+
+    Returns the list of the windows that were moved.
+    """
+    targets = _validate_layout(layout)
+    if not targets:
+        return []
+    current = None
+    if skip_unchanged or any(None in rect for rect in targets.values()):
+        current = _get_rects(targets)
+    moves = _plan_layout(targets, current, skip_unchanged)
+    if not moves:
+        return []
+    # AHK skips the windows that don't exist, even if the current rects
+    # weren't read.
+    moved = ahk_call(
+        "WinApplyLayout",
+        ",".join(str(value) for move in moves for value in move),
+        optional_ms(get_settings().win_delay),
+    )
+    moved = str(moved)[1:]
+    if not moved:
+        return []
+    return [Window(int(win_id)) for win_id in moved.split(",")]
+
+
+def _validate_layout(layout) -> Dict[int, Tuple[Optional[int], ...]]:
+    if not isinstance(layout, Mapping):
+        raise TypeError(f"layout must be a mapping, not {type(layout).__name__}")
+    targets = {}
+    for win, rect in layout.items():
+        if isinstance(win, Control):
+            raise TypeError("controls cannot be moved with apply_layout(), use Control.move() instead")
+        if isinstance(win, Window):
+            win_id = win.id
+        elif isinstance(win, int) and not isinstance(win, bool):
+            win_id = win
+        else:
+            raise TypeError(f"layout keys must be windows or window ids, not {type(win).__name__}")
+        if not win_id:
+            # Window(None) doesn't exist, so there's nothing to move.
+            continue
+
+        try:
+            values = tuple(rect)
+        except TypeError:
+            raise TypeError(f"rect of {win!r} must be a (x, y, width, height) tuple") from None
+        if len(values) != 4:
+            raise ValueError(f"rect of {win!r} must have 4 values, got {len(values)}")
+        values = tuple(int(value) if value is not None else None for value in values)
+        _, _, width, height = values
+        if width is not None and width < 0 or height is not None and height < 0:
+            raise ValueError(f"size of {win!r} must not be negative")
+        targets[win_id] = values
+    return targets
+
+
+def _get_rects(win_ids) -> Dict[int, WindowRect]:
+    result = ahk_call("WinGetRects", ",".join(str(win_id) for win_id in win_ids))
+    if not result:
+        return {}
+    values = [int(value) for value in str(result).split(",")]
+    return {
+        values[i]: WindowRect(*values[i+1:i+5])
+        for i in range(0, len(values), 5)
+    }
+
+
+def _plan_layout(targets, current, skip_unchanged) -> List[Tuple[int, int, int, int, int]]:
+    # Fill in the missing values from the current rects and drop the no-op
+    # moves. If current is None, the current rects are not known.
+    moves = []
+    for win_id, rect in targets.items():
+        if current is not None:
+            current_rect = current.get(win_id)
+            if current_rect is None:
+                # The window doesn't exist.
+                continue
+            rect = tuple(
+                value if value is not None else current_value
+                for value, current_value in zip(rect, current_rect)
+            )
+            if skip_unchanged and rect == tuple(current_rect):
+                continue
+        moves.append((win_id, *rect))
+    return moves
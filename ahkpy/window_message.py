@@ -1,5 +1,7 @@
+import ctypes
 import dataclasses as dc
 import functools
+import threading
 from typing import Callable
 
 from .flow import ahk_call, _wrap_callback
@@ -98,3 +100,72 @@ class MessageHandler:
     def unregister(self):
         """Unregister the message handler."""
         ahk_call("OnMessage", self.msg_number, self.func, 0)
+
+
+HSHELL_WINDOWCREATED = 0x0001
+HSHELL_WINDOWDESTROYED = 0x0002
+HSHELL_WINDOWACTIVATED = 0x0004
+HSHELL_GETMINRECT = 0x0005
+HSHELL_REDRAW = 0x0006
+HSHELL_RUDEAPPACTIVATED = 0x8004
+HSHELL_FLASH = 0x8006
+
+
+class _ShellHook:
+    # A single shell hook registration shared by all subscribers. The
+    # subscribers are called with the HSHELL_* code and the lParam value which
+    # is the window handle for most codes.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = []
+        self.handler = None
+        self.hwnd = None
+
+    def subscribe(self, func):
+        with self.lock:
+            self.subscribers.append(func)
+            if self.handler is None:
+                self._register()
+
+    def unsubscribe(self, func):
+        with self.lock:
+            try:
+                self.subscribers.remove(func)
+            except ValueError:
+                return
+            if not self.subscribers and self.handler is not None:
+                self._unregister()
+
+    def dispatch(self, code, l_param):
+        error = None
+        for func in list(self.subscribers):
+            try:
+                func(code, l_param)
+            except Exception as exc:
+                # Let the other subscribers handle the message.
+                if error is None:
+                    error = exc
+        if error is not None:
+            raise error
+
+    def _register(self):
+        user32 = ctypes.windll.user32
+        self.hwnd = ahk_call("GetVar", "A_ScriptHwnd")
+        msg_number = user32.RegisterWindowMessageW("SHELLHOOK")
+        self.handler = on_message(msg_number, self._handle_message, max_threads=10)
+        if not user32.RegisterShellHookWindow(self.hwnd):
+            self.handler.unregister()
+            self.handler = None
+            raise ctypes.WinError()
+
+    def _unregister(self):
+        ctypes.windll.user32.DeregisterShellHookWindow(self.hwnd)
+        self.handler.unregister()
+        self.handler = None
+
+    def _handle_message(self, w_param, l_param, **_):
+        self.dispatch(w_param, l_param)
+
+
+_shell_hook = _ShellHook()
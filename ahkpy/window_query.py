@@ -0,0 +1,392 @@
+import dataclasses as dc
+import functools
+import re
+import threading
+import time
+from typing import Callable, Iterator, List, Tuple
+
+from .flow import ahk_call
+from .unset import UNSET
+from .window import TITLE_MATCH_MODES, Window, Windows, WindowSnapshot, WindowStyle, all_windows, windows
+
+__all__ = [
+    "WindowQuery",
+]
+
+
+@dc.dataclass(frozen=True)
+class WindowQuery:
+    """WindowQuery(windows: ahkpy.Windows = ahkpy.windows)
+
+    The immutable window query that is evaluated in Python over a shared
+    :class:`WindowSnapshot`.
+
+    The query is compiled from the :class:`Windows` criteria. It extends them
+    with the exclusion of windows by any attribute, the criteria given as
+    callables, and the arbitrary predicates. In the ``"regex"`` match mode the
+    patterns are compiled with the :mod:`re` module once per query::
+
+        query = (
+            ahk.windows.query()
+            .filter(exe="notepad.exe")
+            .exclude(title=lambda title: title.startswith("*"))
+            .where(lambda row: row["pid"] != os.getpid())
+        )
+        for win in query:
+            ...
+
+    All queries share a single snapshot of all windows which is reused for
+    *max_age* seconds. So the queries evaluated in the same tick enumerate the
+    windows only once.
+
+    The *text* and *exclude_text* criteria are checked with AHK for the windows
+    that match the rest of the criteria.
+    """
+
+    windows: Windows = windows
+    exclusions: Tuple[Windows, ...] = ()
+    predicates: Tuple[Callable[[dict], bool], ...] = ()
+    max_age: float = 0.05
+
+    def filter(self, title=UNSET, *, class_name=UNSET, id=UNSET, pid=UNSET, exe=UNSET, text=UNSET, match=None):
+        """filter(title: str = UNSET, **criteria) -> ahkpy.WindowQuery
+
+        Match specific windows using the given criteria.
+
+        Besides the values accepted by :meth:`Windows.filter`, the *title*,
+        *class_name*, *id*, *pid*, and *exe* arguments can be callables that
+        take the window attribute value and return ``True`` if the window
+        matches.
+        """
+        return dc.replace(self, windows=self.windows._filter(title, class_name, id, pid, exe, text, match))
+
+    def exclude(self, title=UNSET, *, class_name=UNSET, id=UNSET, pid=UNSET, exe=UNSET, text=UNSET, match=None):
+        """exclude(title: str = UNSET, **exclude_criteria) -> ahkpy.WindowQuery
+
+        Exclude the windows that match all given criteria.
+
+        Unlike :meth:`Windows.exclude`, the windows can be excluded by any
+        criterion accepted by :meth:`filter`. Every call adds a separate
+        exclusion, so the window is excluded if it matches any of them.
+        """
+        if (
+            title is UNSET and class_name is UNSET and id is UNSET and pid is UNSET and exe is UNSET and
+            text is UNSET
+        ):
+            return self
+        if text is not UNSET and (
+            title is not UNSET or class_name is not UNSET or id is not UNSET or pid is not UNSET or exe is not UNSET
+        ):
+            raise ValueError("text cannot be combined with other exclude criteria")
+        if text is not UNSET:
+            return dc.replace(self, windows=self.windows.exclude(text=text))
+
+        if match is not None and match not in TITLE_MATCH_MODES:
+            raise ValueError(f"{match!r} is not a valid title match mode")
+        exclusion = Windows(
+            title=title,
+            class_name=class_name,
+            id=id,
+            pid=pid,
+            exe=exe,
+            title_mode=match if match is not None else self.windows.title_mode,
+        )
+        return dc.replace(self, exclusions=(*self.exclusions, exclusion))
+
+    def where(self, predicate: Callable[[dict], bool]) -> 'WindowQuery':
+        """Match only the windows for which *predicate* returns ``True``.
+
+        The predicate is called with the window row returned by
+        :meth:`WindowSnapshot.row`.
+        """
+        return dc.replace(self, predicates=(*self.predicates, predicate))
+
+    def include_hidden_windows(self, include=True) -> 'WindowQuery':
+        """Change the window-matching behavior based on window visibility.
+
+        Refer to :meth:`Windows.include_hidden_windows`.
+        """
+        return dc.replace(self, windows=self.windows.include_hidden_windows(include))
+
+    def select(self, snapshot: WindowSnapshot) -> List[int]:
+        """Return the indices of the *snapshot* rows that match the query.
+
+        The *snapshot* must have all the fields in :attr:`fields`.
+        """
+        compiled = _compile_query(self)
+        missing = set(compiled.fields) - set(snapshot.fields)
+        if missing:
+            raise ValueError(f"the snapshot doesn't have the fields: {', '.join(sorted(missing))}")
+
+        active_id = None
+        if compiled.needs_active:
+            active_id = ahk_call("WinExist", "A") or 0
+
+        tests = compiled.tests
+        if active_id is not None:
+            tests = [*tests, ("id", active_id.__eq__)]
+        columns = [(snapshot.column(field), test) for field, test in tests]
+        exclusions = [
+            [(snapshot.column(field), test) for field, test in exclusion]
+            for exclusion in compiled.exclusions
+        ]
+
+        result = []
+        for i in range(len(snapshot)):
+            if not all(test(values[i]) for values, test in columns):
+                continue
+            if any(all(test(values[i]) for values, test in exclusion) for exclusion in exclusions):
+                continue
+            if self.predicates:
+                row = snapshot.row(i)
+                if not all(predicate(row) for predicate in self.predicates):
+                    continue
+            result.append(i)
+
+        if compiled.text_windows is not None:
+            ids = snapshot.column("id")
+            # Window.__bool__ checks the window again, so compare the ids.
+            result = [i for i in result if compiled.text_windows.filter(id=ids[i]).exist().id is not None]
+        return result
+
+    @property
+    def fields(self) -> Tuple[str, ...]:
+        """The snapshot fields needed to evaluate the query.
+
+        :type: Tuple[str, ...]
+        """
+        return _compile_query(self).fields
+
+    def snapshot(self) -> WindowSnapshot:
+        """Get the shared snapshot the query is evaluated over."""
+        return _get_shared_snapshot(self.fields, self.max_age)
+
+    def __iter__(self) -> Iterator[Window]:
+        """__iter__() -> typing.Iterator[ahkpy.Window]
+
+        Return matching windows ordered from top to bottom.
+        """
+        snapshot = self.snapshot()
+        for i in self.select(snapshot):
+            yield snapshot[i]
+
+    def __len__(self):
+        """Return the number of matching windows."""
+        return len(self.select(self.snapshot()))
+
+    def first(self) -> Window:
+        """Return the first (top) matching window.
+
+        If there are no matching windows, returns ``Window(None)``.
+
+        :alias: :meth:`exist`
+        """
+        snapshot = self.snapshot()
+        indices = self.select(snapshot)
+        if not indices:
+            return Window(None)
+        return snapshot[indices[0]]
+
+    exist = first
+
+    def last(self) -> Window:
+        """Return the last (bottom) matching window.
+
+        If there are no matching windows, returns ``Window(None)``.
+        """
+        snapshot = self.snapshot()
+        indices = self.select(snapshot)
+        if not indices:
+            return Window(None)
+        return snapshot[indices[-1]]
+
+    @staticmethod
+    def clear_cache():
+        """Discard the shared snapshot so the next query enumerates the windows
+        again.
+        """
+        with _shared_lock:
+            _shared_snapshots.clear()
+
+
+_SHARED_FIELDS = ("title", "class_name", "pid", "process_name", "style")
+
+
+def _get_shared_snapshot(fields, max_age):
+    now = time.monotonic()
+    with _shared_lock:
+        for taken, snapshot in _shared_snapshots:
+            if now - taken <= max_age and set(fields).issubset(snapshot.fields):
+                return snapshot
+
+    # Get the commonly used fields even if this query doesn't need them so the
+    # next queries can reuse the snapshot.
+    all_fields = list(_SHARED_FIELDS)
+    all_fields.extend(f for f in fields if f not in all_fields)
+    snapshot = all_windows.snapshot(fields=all_fields)
+    with _shared_lock:
+        _shared_snapshots[:] = [
+            (taken, s)
+            for taken, s in _shared_snapshots
+            # Drop the outdated snapshots and the ones with fewer fields.
+            if now - taken <= max_age and not set(s.fields).issubset(snapshot.fields)
+        ]
+        _shared_snapshots.append((time.monotonic(), snapshot))
+    return snapshot
+
+
+_shared_snapshots = []
+_shared_lock = threading.Lock()
+
+
+@dc.dataclass(frozen=True)
+class _CompiledQuery:
+    fields: Tuple[str, ...]
+    tests: list
+    exclusions: list
+    needs_active: bool
+    text_windows: Windows
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_query(query):
+    query_windows = query.windows
+    fields = {"id", "style"}
+    needs_active = False
+
+    tests = _compile_criteria(query_windows, fields, allow_active=True)
+    if ("title", "A") in tests:
+        tests.remove(("title", "A"))
+        needs_active = True
+    if not query_windows.hidden_windows:
+        tests.append(("style", _is_visible))
+
+    exclusions = []
+    if query_windows.exclude_title is not UNSET:
+        exclusions.append(_compile_criteria(Windows(
+            title=query_windows.exclude_title,
+            title_mode=query_windows.title_mode,
+        ), fields))
+    for exclusion in query.exclusions:
+        exclusions.append(_compile_criteria(exclusion, fields))
+
+    text_windows = None
+    if query_windows.text is not UNSET or query_windows.exclude_text is not UNSET:
+        text_windows = dc.replace(
+            all_windows,
+            text=query_windows.text,
+            exclude_text=query_windows.exclude_text,
+            hidden_text=query_windows.hidden_text,
+            text_mode=query_windows.text_mode,
+        )
+
+    return _CompiledQuery(
+        fields=tuple(sorted(fields)),
+        tests=tests,
+        exclusions=exclusions,
+        needs_active=needs_active,
+        text_windows=text_windows,
+    )
+
+
+def _compile_criteria(criteria, fields, allow_active=False):
+    tests = []
+    mode = criteria.title_mode
+    if criteria.title is not UNSET:
+        if allow_active and criteria.title == "A":
+            # Leave the active window marker for the caller.
+            tests.append(("title", "A"))
+        else:
+            tests.append(("title", _compile_title(criteria.title, mode)))
+    if criteria.class_name is not UNSET:
+        tests.append(("class_name", _compile_exact(criteria.class_name, mode)))
+    if criteria.id is not UNSET:
+        tests.append(("id", _compile_number(criteria.id)))
+    if criteria.pid is not UNSET:
+        tests.append(("pid", _compile_number(criteria.pid)))
+    if criteria.exe is not UNSET:
+        tests.append(_compile_exe(criteria.exe, mode))
+    for field, _ in tests:
+        fields.add(field)
+    return tests
+
+
+def _compile_title(title, mode):
+    if callable(title):
+        return title
+    title = str(title)
+    if "ahk_" in title:
+        raise ValueError(f"{title!r}: use the keyword arguments instead of the ahk_ criteria in the title")
+    if mode == "startswith":
+        return lambda value: value.startswith(title)
+    if mode == "contains":
+        return lambda value: title in value
+    if mode == "exact":
+        return title.__eq__
+    if mode == "regex":
+        return _compile_regex(title).search
+    raise ValueError(f"{mode!r} is not a valid title match mode")
+
+
+def _compile_exact(value, mode):
+    if callable(value):
+        return value
+    if mode == "regex":
+        return _compile_regex(str(value)).search
+    return str(value).__eq__
+
+
+def _compile_number(value):
+    if callable(value):
+        return value
+    if value is None:
+        # Window(None) doesn't match anything.
+        return lambda _: False
+    return int(value).__eq__
+
+
+def _compile_exe(exe, mode):
+    if callable(exe):
+        return ("process_name", exe)
+    exe = str(exe)
+    if mode == "regex":
+        # The regex matches the full path of the process like in AHK.
+        return ("process_path", _compile_regex(exe).search)
+    # AHK matches the name or the full path case-insensitively.
+    field = "process_path" if "\\" in exe or "/" in exe else "process_name"
+    exe = exe.lower()
+    return (field, lambda value: value.lower() == exe)
+
+
+# The options of AHK regular expressions that have counterparts in Python.
+_REGEX_FLAGS = {
+    "i": re.IGNORECASE,
+    "m": re.MULTILINE,
+    "s": re.DOTALL,
+    "x": re.VERBOSE,
+}
+_REGEX_OPTIONS_RE = re.compile(r"([imsxADJUXPSC`nra ]*)\)")
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_regex(pattern):
+    flags = 0
+    options = _REGEX_OPTIONS_RE.match(pattern)
+    if options:
+        for option in options.group(1).replace("`n", "").replace("`r", "").replace("`a", "").replace(" ", ""):
+            flag = _REGEX_FLAGS.get(option)
+            if flag is None:
+                raise ValueError(f"regex option {option!r} is not supported by the window query")
+            flags |= flag
+        pattern = pattern[options.end():]
+    try:
+        return re.compile(pattern, flags)
+    except re.error as err:
+        raise ValueError(f"invalid regex {pattern!r}: {err}") from None
+
+
+_WS_VISIBLE = int(WindowStyle.VISIBLE)
+
+
+def _is_visible(style):
+    return style & _WS_VISIBLE != 0
@@ -0,0 +1,336 @@
+import itertools
+import threading
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .window import Window, WindowHandle, WindowRect, WindowSnapshot, windows
+
+__all__ = [
+    "WindowSpatialIndex",
+]
+
+
+_DIRECTIONS = ("left", "right", "up", "down")
+
+
+class WindowSpatialIndex:
+    """The index of the window rectangles for the point and rectangle queries
+    created by :meth:`Windows.spatial_index`.
+
+    The index is built from a single snapshot of the windows. The queries
+    don't call AHK::
+
+        index = ahkpy.windows.spatial_index()
+        top_win = index.at_point(100, 200)[0]
+        on_monitor = index.intersecting((1920, 0, 1920, 1080))
+
+    The *items* are the ``(window, rect)`` pairs ordered from top to bottom,
+    where the window is a :class:`Window` or a window id, and the rect is an
+    ``(x, y, width, height)`` tuple. The rectangles are put into a grid of
+    *cell_size* pixel cells, so a query checks only the windows in the cells
+    it touches.
+
+    The index is not updated when the windows change. Update it with
+    :meth:`update`, :meth:`refresh`, :meth:`raise_window`, and
+    :meth:`remove` when the window positions and the z-order are known to
+    change, e.g. after :func:`apply_layout` or on :func:`window_events`.
+    """
+
+    def __init__(self, items: Iterable[Tuple[Union[Window, int], Tuple[int, int, int, int]]] = (), *,
+                 cell_size=256):
+        if cell_size < 1:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = cell_size
+        self._lock = threading.RLock()
+        self._rects = {}
+        self._z = {}
+        self._cells = {}
+        self._z_counter = itertools.count(1)
+        # The items are ordered from top to bottom, so add them in reverse to
+        # give the top window the highest z.
+        for win, rect in reversed(list(items)):
+            self.update(win, rect)
+
+    @classmethod
+    def from_snapshot(cls, snapshot: WindowSnapshot, *, cell_size=256) -> 'WindowSpatialIndex':
+        """Create the index from a :class:`WindowSnapshot` with the ``rect``
+        fields.
+
+        If the snapshot has the ``min_max`` field, the minimized windows are
+        skipped.
+        """
+        x, y, width, height = (snapshot.column(field) for field in ("x", "y", "width", "height"))
+        min_max = snapshot.column("min_max") if "min_max" in snapshot.fields else None
+        items = [
+            (win_id, (x[i], y[i], width[i], height[i]))
+            for i, win_id in enumerate(snapshot.column("id"))
+            if min_max is None or min_max[i] != -1
+        ]
+        return cls(items, cell_size=cell_size)
+
+    def rect(self, win) -> Optional[WindowRect]:
+        """Get the indexed rectangle of the *win* window or window id.
+
+        Returns ``None`` if the window is not in the index.
+        """
+        return self._rects.get(_win_id(win))
+
+    def at_point(self, x, y) -> List[Window]:
+        """Get the windows that contain the point, ordered from top to bottom.
+        """
+        with self._lock:
+            candidates = self._cells.get((x // self.cell_size, y // self.cell_size), ())
+            found = [
+                win_id for win_id in candidates
+                if _contains_point(self._rects[win_id], x, y)
+            ]
+            return self._by_z(found)
+
+    def intersecting(self, rect) -> List[Window]:
+        """Get the windows that overlap the ``(x, y, width, height)`` *rect*,
+        ordered from top to bottom.
+        """
+        rect = _validate_rect(rect)
+        with self._lock:
+            found = [
+                win_id for win_id in self._candidates(rect)
+                if _intersects(self._rects[win_id], rect)
+            ]
+            return self._by_z(found)
+
+    def contained_in(self, rect) -> List[Window]:
+        """Get the windows that are entirely inside the ``(x, y, width,
+        height)`` *rect*, ordered from top to bottom.
+        """
+        rect = _validate_rect(rect)
+        with self._lock:
+            found = [
+                win_id for win_id in self._candidates(rect)
+                if _contains_rect(rect, self._rects[win_id])
+            ]
+            return self._by_z(found)
+
+    def nearest(self, direction, origin=None) -> Window:
+        """Get the window next to the *origin* in the *direction* which is one
+        of ``"left"``, ``"right"``, ``"up"``, or ``"down"``.
+
+        The *origin* is a :class:`Window`, a window id, or an ``(x, y,
+        width, height)`` rect. If it's ``None``, the active window is used,
+        which takes a call to AHK.
+
+        The windows whose centers lie in the *direction* from the origin center
+        are candidates. The nearest candidate along the direction wins, and the
+        offset across the direction counts double, so the windows in line with
+        the origin are preferred. The ties are broken by the z-order.
+
+        Returns ``Window(None)`` if there's no window in the *direction*.
+        """
+        if direction not in _DIRECTIONS:
+            raise ValueError(f"{direction!r} is not a valid direction")
+        if origin is None:
+            origin = windows.get_active()
+
+        with self._lock:
+            origin_id = None
+            if isinstance(origin, (WindowHandle, int)) and not isinstance(origin, bool):
+                origin_id = _win_id(origin)
+                if not origin_id:
+                    return Window(None)
+                origin_rect = self._rects.get(origin_id)
+                if origin_rect is None:
+                    # The origin is not indexed, e.g. it's minimized.
+                    origin_rect = Window(origin_id).rect
+                    if origin_rect is None:
+                        return Window(None)
+            else:
+                origin_rect = _validate_rect(origin)
+
+            ox, oy = _center(origin_rect)
+            best = None
+            for win_id, rect in self._rects.items():
+                if win_id == origin_id:
+                    continue
+                cx, cy = _center(rect)
+                if direction == "left":
+                    along, across = ox - cx, cy - oy
+                elif direction == "right":
+                    along, across = cx - ox, cy - oy
+                elif direction == "up":
+                    along, across = oy - cy, cx - ox
+                else:
+                    along, across = cy - oy, cx - ox
+                if along <= 0:
+                    continue
+                key = (along + 2 * abs(across), -self._z[win_id])
+                if best is None or key < best[0]:
+                    best = key, win_id
+            if best is None:
+                return Window(None)
+            return Window(best[1])
+
+    def update(self, win, rect):
+        """Set the ``(x, y, width, height)`` *rect* of the *win* window or
+        window id.
+
+        The window that is not in the index yet is added on top of the
+        z-order.
+        """
+        win_id = _win_id(win)
+        if not win_id:
+            raise ValueError("cannot index a nonexistent window")
+        rect = _validate_rect(rect)
+        with self._lock:
+            old_rect = self._rects.get(win_id)
+            if old_rect == rect:
+                return
+            if old_rect is not None:
+                self._unlink(win_id, old_rect)
+            else:
+                self._z[win_id] = next(self._z_counter)
+            self._rects[win_id] = rect
+            for cell in self._cells_of(rect):
+                self._cells.setdefault(cell, set()).add(win_id)
+
+    def refresh(self, *wins) -> int:
+        """Read the current rectangles of the given windows from AHK in a
+        single call and update the index.
+
+        If no windows are given, all indexed windows are refreshed. The
+        windows that don't exist are removed. The z-order is not changed.
+
+        Returns the number of the windows that have changed.
+        """
+        from .window_layout import _get_rects
+
+        win_ids = [_win_id(win) for win in wins] if wins else list(self._rects)
+        win_ids = [win_id for win_id in win_ids if win_id]
+        if not win_ids:
+            return 0
+        rects = _get_rects(win_ids)
+        changes = 0
+        with self._lock:
+            for win_id in win_ids:
+                rect = rects.get(win_id)
+                if rect is None:
+                    if win_id in self._rects:
+                        self.remove(win_id)
+                        changes += 1
+                elif self._rects.get(win_id) != rect:
+                    self.update(win_id, rect)
+                    changes += 1
+        return changes
+
+    def raise_window(self, win):
+        """Move the *win* window or window id on top of the z-order, e.g. when
+        it's activated.
+
+        Does nothing if the window is not in the index.
+        """
+        win_id = _win_id(win)
+        with self._lock:
+            if win_id in self._z:
+                self._z[win_id] = next(self._z_counter)
+
+    def remove(self, win):
+        """Remove the *win* window or window id from the index.
+
+        Does nothing if the window is not in the index.
+        """
+        win_id = _win_id(win)
+        with self._lock:
+            rect = self._rects.pop(win_id, None)
+            if rect is None:
+                return
+            del self._z[win_id]
+            self._unlink(win_id, rect)
+
+    def __len__(self):
+        return len(self._rects)
+
+    def __iter__(self) -> Iterator[Window]:
+        """Iterate over the indexed windows from top to bottom."""
+        with self._lock:
+            win_ids = self._by_z(self._rects)
+        return iter(win_ids)
+
+    def __contains__(self, win):
+        return _win_id(win) in self._rects
+
+    def __repr__(self):
+        return f"<{self.__class__.__qualname__} len={len(self)} cell_size={self.cell_size}>"
+
+    def _cells_of(self, rect):
+        x, y, width, height = rect
+        if width <= 0 or height <= 0:
+            # An empty rect contains no points and intersects nothing, but it
+            # can be contained in a rect.
+            width = height = 1
+        size = self.cell_size
+        return itertools.product(
+            range(x // size, (x + width - 1) // size + 1),
+            range(y // size, (y + height - 1) // size + 1),
+        )
+
+    def _candidates(self, rect):
+        x, y, width, height = rect
+        size = self.cell_size
+        cell_count = ((x + width - 1) // size - x // size + 1) * ((y + height - 1) // size - y // size + 1)
+        if cell_count > len(self._rects):
+            # Checking every window is cheaper than visiting the cells.
+            return list(self._rects)
+        candidates = set()
+        for cell in self._cells_of(rect):
+            candidates.update(self._cells.get(cell, ()))
+        return candidates
+
+    def _unlink(self, win_id, rect):
+        for cell in self._cells_of(rect):
+            cell_ids = self._cells.get(cell)
+            if cell_ids is None:
+                continue
+            cell_ids.discard(win_id)
+            if not cell_ids:
+                del self._cells[cell]
+
+    def _by_z(self, win_ids):
+        z = self._z
+        return [Window(win_id) for win_id in sorted(win_ids, key=lambda win_id: -z[win_id])]
+
+
+def _win_id(win):
+    if isinstance(win, WindowHandle):
+        return win.id
+    return win
+
+
+def _validate_rect(rect) -> WindowRect:
+    try:
+        values = tuple(rect)
+    except TypeError:
+        raise TypeError(f"rect must be a (x, y, width, height) tuple, not {type(rect).__name__}") from None
+    if len(values) != 4:
+        raise ValueError(f"rect must have 4 values, got {len(values)}")
+    return WindowRect(*map(int, values))
+
+
+def _contains_point(rect, x, y):
+    rx, ry, width, height = rect
+    return rx <= x < rx + width and ry <= y < ry + height
+
+
+def _intersects(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    if aw <= 0 or ah <= 0 or bw <= 0 or bh <= 0:
+        return False
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+def _contains_rect(outer, inner):
+    ox, oy, ow, oh = outer
+    ix, iy, iw, ih = inner
+    return ox <= ix and oy <= iy and ix + iw <= ox + ow and iy + ih <= oy + oh
+
+
+def _center(rect):
+    x, y, width, height = rect
+    return x + width / 2, y + height / 2
@@ -12,10 +12,11 @@ def kde_move():
     win = ahk.get_window_under_mouse()
     if win.is_maximized:
         win.restore()
-        win.x = x1
-        win.y = y1
+        win.move(x1, y1)
     while ahk.is_key_pressed("LButton") and win:
         x2, y2 = ahk.get_mouse_pos(relative_to="screen")
-        win.x += x2 - x1
-        win.y += y2 - y1
+        # Get the position once and move the window once.
+        with win.geometry() as g:
+            g.x += x2 - x1
+            g.y += y2 - y1
         x1, y1 = x2, y2
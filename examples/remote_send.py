@@ -12,6 +12,7 @@ import asyncio
 import sys
 
 import ahkpy as ahk
+from ahkpy.asyncio import AHKEventLoopPolicy
 
 
 def main():
@@ -20,6 +21,9 @@ def main():
     parser.add_argument("PORT", nargs="?", default=3033, type=int)
     args = parser.parse_args()
 
+    # Let AHK process its message queue while the event loop is waiting for
+    # I/O.
+    asyncio.set_event_loop_policy(AHKEventLoopPolicy())
     try:
         asyncio.run(serve(args.HOST, args.PORT))
     except KeyboardInterrupt:
@@ -29,11 +33,6 @@ def main():
 async def serve(host, port):
     srv = await asyncio.start_server(handle, host, port)
     print("Listening on", host, port)
-
-    # Schedule a function that will check AHK message queue repeatedly.
-    loop = asyncio.get_running_loop()
-    loop.call_soon(sleeper, loop)
-
     await srv.serve_forever()
 
 
@@ -48,10 +47,5 @@ async def handle(reader, writer):
         writer.close()
 
 
-def sleeper(loop):
-    ahk.sleep(0.01)
-    loop.call_soon(sleeper, loop)
-
-
 if __name__ == "__main__":
     main()
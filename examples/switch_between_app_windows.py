@@ -22,11 +22,13 @@ def switch_between_app_windows():
         return
 
     process_name = active_win.process_name
+    # Filter all windows to find windows on all virtual desktops. Get all
+    # needed attributes at once instead of querying them window by window.
+    snapshot = ahk.all_windows.filter(exe=process_name).snapshot(fields=("title", "class_name", "style", "ex_style"))
     app_windows = [
         win
-        # Filter all windows to find windows on all virtual desktops.
-        for win in ahk.all_windows.filter(exe=process_name)
-        if is_alt_tab_window(win)
+        for win, row in zip(snapshot, snapshot.rows())
+        if is_alt_tab_window(row)
     ]
     if len(app_windows) < 2:
         return
@@ -42,16 +44,14 @@ def reset_app_win_index():
     app_win_index = 0
 
 
-def is_alt_tab_window(win):
-    if not win.is_visible:
+def is_alt_tab_window(row):
+    style = row["style"]
+    ex_style = row["ex_style"]
+    if ahk.WindowStyle.VISIBLE not in style:
         return False
-    if not win.title:
+    if not row["title"]:
         return False
 
-    style = win.style
-    ex_style = win.ex_style
-    if style is None or ex_style is None:
-        return False
     if ahk.ExWindowStyle.APPWINDOW in ex_style:
         return True
     if ahk.ExWindowStyle.TOOLWINDOW in ex_style:
@@ -59,16 +59,16 @@ def is_alt_tab_window(win):
     if ahk.ExWindowStyle.NOACTIVATE in ex_style:
         return False
 
-    if win.class_name == "Windows.UI.Core.CoreWindow":
+    if row["class_name"] == "Windows.UI.Core.CoreWindow":
         return False
-    if is_uwp_app_cloaked(win):
+    if is_uwp_app_cloaked(row):
         return False
 
     return True
 
 
-def is_uwp_app_cloaked(win):
-    if win.class_name != "ApplicationFrameWindow":
+def is_uwp_app_cloaked(row):
+    if row["class_name"] != "ApplicationFrameWindow":
         return False
-    cloak_type = windll.user32.GetPropW(win.id, "ApplicationViewCloakType")
+    cloak_type = windll.user32.GetPropW(row["id"], "ApplicationViewCloakType")
     return cloak_type == 1
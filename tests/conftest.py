@@ -109,6 +109,89 @@ def notepad():
         notepad_proc.terminate()
 
 
+@pytest.fixture()
+def fake_ahk(monkeypatch):
+    fake = FakeAHK()
+    monkeypatch.setattr(ahk.flow, "_ahk", fake)
+    monkeypatch.setattr(ahk.flow, "_thread_settings", {})
+    monkeypatch.setattr(ahk.flow, "_pending_send", None)
+    monkeypatch.setattr(ahk.flow, "_commands", {})
+    return fake
+
+
+class FakeAHK:
+    """The stand-in for the _ahk module that counts the calls to AHK."""
+
+    def __init__(self):
+        self.crossings = 0
+        self.calls = []
+        self.handlers = {}
+        self.command_ids = {}
+
+    def call(self, cmd, *args):
+        self.crossings += 1
+        if isinstance(cmd, int):
+            cmd = next(name for name, command_id in self.command_ids.items() if command_id == cmd)
+        return self._dispatch(cmd, args)
+
+    def resolve(self, name):
+        self.crossings += 1
+        return self.command_ids.setdefault(name, len(self.command_ids) + 1)
+
+    def call_many(self, calls):
+        assert isinstance(calls, tuple)
+        self.crossings += 1
+        return tuple(self._dispatch(cmd, args) for cmd, *args in calls)
+
+    def _dispatch(self, cmd, args):
+        self.calls.append((cmd, *args))
+        handler = self.handlers.get(cmd)
+        if handler is None:
+            return ""
+        return handler(*args)
+
+
+def win_snapshot_result(fields, rows):
+    """Encode *rows* like the AHK _WinSnapshot and _WinControlSnapshot
+    functions do.
+    """
+    result = {}
+    for field in fields.split(","):
+        values = [row[field] for row in rows]
+        if field in ("title", "class_name", "process_name", "process_path", "class_nn", "text"):
+            result[field] = "s" + "".join(values)
+            # AHK StrLen counts the UTF-16 code units.
+            result[f"{field}_len"] = ",".join(str(len(v.encode("utf-16-le")) // 2) for v in values)
+        else:
+            result[field] = ",".join(str(v) for v in values)
+    return result
+
+
+class FakeDesktop:
+    """The windows returned by the fake WinSnapshot and WinExist calls."""
+
+    def __init__(self, fake_ahk):
+        self.windows = {}
+        self.active = 0
+        self.snapshots = []
+        fake_ahk.handlers["WinSnapshot"] = self.win_snapshot
+        fake_ahk.handlers["WinExist"] = lambda title, *args: self.active if title == "A" else 0
+
+    def add(self, win_id, title, class_name="Notepad", pid=100, exe="notepad.exe"):
+        self.windows[win_id] = {
+            "id": win_id, "title": title, "class_name": class_name, "pid": pid, "process_name": exe,
+            "style": int(ahk.WindowStyle.VISIBLE), "min_max": 0,
+        }
+
+    def win_snapshot(self, fields, title, *query):
+        self.snapshots.append(title)
+        rows = list(self.windows.values())
+        if title.startswith("ahk_id "):
+            win_id = int(title[len("ahk_id "):])
+            rows = [row for row in rows if row["id"] == win_id]
+        return win_snapshot_result(fields, rows)
+
+
 def assert_equals_eventually(func, expected, timeout=1):
     stop = time.perf_counter() + timeout
     while time.perf_counter() < stop:
@@ -0,0 +1,114 @@
+import pytest
+
+import ahkpy as ahk
+from ahkpy import actions
+from ahkpy.actions import _encode
+
+
+def decode(data, lengths):
+    # Mirrors _ParseAction in Commands.ahk.
+    data = data.encode("utf-16-le")
+    values = [int(v) for v in lengths.split(",")] if lengths else []
+    steps = []
+    pos = 0
+    i = 0
+    while i < len(values):
+        count = values[i]
+        step = []
+        for length in values[i + 1:i + 1 + count]:
+            step.append(data[pos * 2:(pos + length) * 2].decode("utf-16-le"))
+            pos += length
+        i += count + 1
+        steps.append(tuple(step))
+    return tuple(steps)
+
+
+def test_send():
+    assert actions.Send("^c").compile() == (("Send", "input", "0", "10", "-1", "10", "^c"),)
+    # Delays switch the default Input mode to Event like in send().
+    assert actions.Send("abc", key_delay=0.05, level=3).compile() == (
+        ("Send", "event", "3", "50", "-1", "10", "abc"),
+    )
+    assert actions.Send("x", mode="play").compile() == (("Send", "play", "0", "-1", "-1", "-1", "x"),)
+    with ahk.local_settings() as settings:
+        settings.send_mode = "event"
+        settings.key_delay = 0.02
+        assert actions.Send("x").compile() == (("Send", "event", "0", "20", "-1", "10", "x"),)
+
+    with pytest.raises(ValueError, match="not a valid send mode"):
+        actions.Send("x", mode="fast").compile()
+    with pytest.raises(ValueError, match="level must be between 0 and 100"):
+        actions.Send("x", level=200).compile()
+    with pytest.raises(TypeError):
+        actions.Send("x", "event")
+
+
+def test_activate_window():
+    action = actions.ActivateWindow(ahk.windows.filter("Notepad", exe="notepad.exe").exclude("Settings"))
+    assert action.compile() == (
+        ("WinActivate", "Off", "On", "1", "fast", "100", "Notepad ahk_exe notepad.exe", "", "Settings", ""),
+    )
+    action = actions.ActivateWindow(ahk.all_windows.filter(r"\d+", match="regex").match_text_slow())
+    assert action.compile()[0][1:5] == ("On", "On", "RegEx", "slow")
+    assert actions.ActivateWindow(ahk.Window(0x10)).compile()[0][1:7] == ("On", "On", "1", "fast", "100", "ahk_id 16")
+
+    with pytest.raises(ValueError, match="nonexistent window"):
+        actions.ActivateWindow(ahk.Window(None)).compile()
+    with pytest.raises(ValueError, match="match no windows"):
+        actions.ActivateWindow(ahk.windows.filter(title=None)).compile()
+    with pytest.raises(TypeError, match="must be a Windows or Window"):
+        actions.ActivateWindow("Notepad").compile()
+
+
+def test_sequence():
+    seq = actions.Sequence(
+        actions.Run("notepad.exe"),
+        actions.Sequence(actions.Send("héllo, 😀"), actions.Run("https://example.com", "C:\\")),
+    )
+    steps = seq.compile()
+    assert steps == (
+        ("Run", "notepad.exe", ""),
+        ("Send", "input", "0", "10", "-1", "10", "héllo, 😀"),
+        ("Run", "https://example.com", "C:\\"),
+    )
+    assert decode(*_encode(steps)) == steps
+    assert decode(*_encode(actions.Sequence().compile())) == ()
+    assert seq == actions.Sequence(
+        actions.Run("notepad.exe"),
+        actions.Sequence(actions.Send("héllo, 😀"), actions.Run("https://example.com", "C:\\")),
+    )
+
+    with pytest.raises(TypeError, match="is not an action"):
+        actions.Sequence(actions.Send("x"), print)
+    with pytest.raises(ValueError, match="target must not be blank"):
+        actions.Run("").compile()
+
+
+def test_hotkey_and_hotstring(fake_ahk):
+    action = actions.Send("{Media_Play_Pause}")
+    data, lengths = _encode(action.compile())
+
+    hk = ahk.hotkey("F13", action)
+    assert ("HotkeyAction", "F13", data, lengths, "B0P0T1I0") in fake_ahk.calls
+    assert not any(call[0] == "Hotkey" for call in fake_ahk.calls)
+
+    fake_ahk.calls.clear()
+    hk.update(func=actions.Run("calc.exe"), priority=5)
+    assert fake_ahk.calls == [("HotkeyAction", "F13", *_encode((("Run", "calc.exe", ""),)), "P5")]
+
+    fake_ahk.calls.clear()
+    ahk.hotstring("btw", actions.Send("by the way"))
+    assert [call[:2] for call in fake_ahk.calls if call[0] == "HotstringAction"] == [
+        ("HotstringAction", ":C0?0*0O0BP0T0SIZ0:btw"),
+    ]
+
+    # The action is compiled before the hotkey is touched.
+    fake_ahk.calls.clear()
+    with pytest.raises(ValueError):
+        hk.update(func=actions.Send("x", mode="fast"))
+    assert fake_ahk.calls == []
+
+
+def test_call(fake_ahk):
+    actions.Send("x", mode="event")()
+    assert fake_ahk.calls == [("RunAction", *_encode((("Send", "event", "0", "10", "-1", "10", "x"),)))]
@@ -0,0 +1,119 @@
+import asyncio
+import socket
+import threading
+import time
+
+import pytest
+
+import ahkpy as ahk
+import ahkpy.asyncio as ahk_asyncio
+
+
+@pytest.fixture()
+def loop():
+    loop = ahk_asyncio.AHKEventLoopPolicy().new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_idle_loop_polls_ahk(fake_ahk, loop):
+    loop.run_until_complete(asyncio.sleep(0.1))
+    polls = fake_ahk.calls.count(("Sleep", -1))
+    assert 5 <= polls <= 15
+
+
+def test_busy_loop_polls_ahk(fake_ahk, loop):
+    async def busy():
+        stop = time.monotonic() + 0.1
+        while time.monotonic() < stop:
+            await asyncio.sleep(0)
+
+    loop.run_until_complete(busy())
+    assert 5 <= fake_ahk.calls.count(("Sleep", -1)) <= 15
+
+
+def test_callback_wakes_loop(fake_ahk, loop):
+    fut = loop.create_future()
+
+    def hotkey_handler(*args):
+        # AHK callbacks run while the loop polls AHK.
+        if not fut.done():
+            loop.call_soon(fut.set_result, "pressed")
+        return ""
+
+    fake_ahk.handlers["Sleep"] = hotkey_handler
+    start = time.monotonic()
+    assert loop.run_until_complete(asyncio.wait_for(fut, 10)) == "pressed"
+    assert time.monotonic() - start < 1
+
+
+def test_io_wakes_loop(fake_ahk, loop):
+    rsock, wsock = socket.socketpair()
+    rsock.setblocking(False)
+    with rsock, wsock:
+        threading.Timer(0.05, wsock.send, [b"#r"]).start()
+        data = loop.run_until_complete(asyncio.wait_for(loop.sock_recv(rsock, 10), 10))
+    assert data == b"#r"
+
+
+def test_ready_callbacks(loop):
+    # The loop wakes up for the callbacks scheduled by AHK only if it can see
+    # them in the private BaseEventLoop._ready deque.
+    assert hasattr(loop, "_ready"), "asyncio no longer has BaseEventLoop._ready"
+    assert ahk_asyncio._may_have_ready_callbacks(loop) is False
+    loop.call_soon(lambda: None)
+    assert ahk_asyncio._may_have_ready_callbacks(loop) is True
+    # Without _ready, the selector returns after each slice.
+    assert ahk_asyncio._may_have_ready_callbacks(object()) is True
+
+
+def test_wait_key_pressed(fake_ahk, loop):
+    states = iter([0, 0, 1])
+    fake_ahk.handlers["GetKeyState"] = lambda key, mode: next(states)
+    assert loop.run_until_complete(ahk_asyncio.wait_key_pressed("F1", timeout=1)) is True
+    assert fake_ahk.calls.count(("GetKeyState", "F1", "P")) == 3
+
+    fake_ahk.handlers["GetKeyState"] = lambda key, mode: 1
+    assert loop.run_until_complete(ahk_asyncio.wait_key_released("F1", timeout=0.05)) is False
+
+    async def wait_both():
+        return await asyncio.gather(
+            ahk_asyncio.wait_key_pressed("F1", timeout=1),
+            ahk_asyncio.wait_key_pressed_logical("F1", timeout=1),
+        )
+
+    assert loop.run_until_complete(wait_both()) == [True, True]
+
+
+def test_shared_waits(fake_ahk, loop):
+    checks = 0
+
+    def get_key_state(key, mode):
+        nonlocal checks
+        checks += 1
+        return int(checks >= 3)
+
+    fake_ahk.handlers["GetKeyState"] = get_key_state
+
+    async def wait_all():
+        return await asyncio.gather(*[ahk_asyncio.wait_key_pressed("F1", timeout=1) for _ in range(3)])
+
+    # The concurrent waits share the checks in the wait scheduler.
+    assert loop.run_until_complete(wait_all()) == [True, True, True]
+    assert checks == 3
+    assert ahk.flow._wait_scheduler.entries == {}
+
+    # The cancelled wait leaves the scheduler.
+    fake_ahk.handlers["GetKeyState"] = lambda key, mode: 0
+    with pytest.raises(asyncio.TimeoutError):
+        loop.run_until_complete(asyncio.wait_for(ahk_asyncio.wait_key_pressed("F1"), 0.05))
+    assert ahk.flow._wait_scheduler.entries == {}
+
+
+def test_wait_clipboard(fake_ahk, loop):
+    values = iter(["", "", "hello"])
+    fake_ahk.handlers["GetVar"] = lambda name: next(values)
+    assert loop.run_until_complete(ahk_asyncio.wait_clipboard(timeout=1)) == "hello"
+
+    with pytest.raises(ValueError, match="must be non-negative"):
+        loop.run_until_complete(ahk_asyncio.wait_clipboard(timeout=-1))
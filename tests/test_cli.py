@@ -79,6 +79,18 @@ def test_cmd(child_ahk):
     assert res.returncode == 0
 
 
+def test_profile_bridge(tmpdir, child_ahk):
+    trace = tmpdir / "trace.json"
+    code = "import ahkpy as ahk; ahk.get_mouse_pos()"
+    res = child_ahk.run(["--profile-bridge", "--profile-trace", str(trace), "-c", code])
+    assert res.stdout == ""
+    assert res.stderr.startswith("AHK bridge profile: ")
+    assert "MouseGetPos" in res.stderr
+    assert "<stdin>:1 (1 calls)" in res.stderr
+    assert res.returncode == 0
+    assert '"name": "MouseGetPos"' in trace.read()
+
+
 def test_module(tmpdir, child_ahk):
     script = tmpdir / "script.py"
     script.write("import ahkpy as ahk, sys; print(__name__, __file__, sys.argv)")
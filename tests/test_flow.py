@@ -1,5 +1,7 @@
 import subprocess
 
+import pytest
+
 import ahkpy as ahk
 
 
@@ -168,3 +170,318 @@ def test_tkinter():
     import tkinter
     root = tkinter.Tk()
     root.destroy()
+
+
+def test_ahk_call_many(fake_ahk):
+    fake_ahk.handlers["WinExist"] = lambda *args: 0x1234
+    result = ahk.flow.ahk_call_many([
+        ("SetTitleMatchMode", 2),
+        ("WinExist", "Notepad"),
+    ])
+    assert result == ["", 0x1234]
+    assert fake_ahk.crossings == 1
+    assert fake_ahk.calls == [("SetTitleMatchMode", 2), ("WinExist", "Notepad")]
+
+    assert ahk.flow.ahk_call_many([]) == []
+    assert fake_ahk.crossings == 1
+
+    def fail(*args):
+        raise ahk.Error("boom")
+
+    fake_ahk.handlers["WinGetTitle"] = fail
+    fake_ahk.calls.clear()
+    with pytest.raises(ahk.Error, match="boom"):
+        ahk.flow.ahk_call_many([("WinGetTitle", "A"), ("WinExist", "A")])
+    assert fake_ahk.calls == [("WinGetTitle", "A")]
+
+    with pytest.raises(ValueError, match="must contain the command name"):
+        ahk.flow.ahk_call_many([()])
+    with pytest.raises(TypeError, match="command name must be a string"):
+        ahk.flow.ahk_call_many([(1, 2)])
+
+
+def test_batch(fake_ahk):
+    fake_ahk.handlers["WinExist"] = lambda *args: 0x1234
+    fake_ahk.handlers["WinGetTitle"] = lambda *args: "Untitled - Notepad"
+
+    with ahk.batch() as b:
+        ahk.flow.ahk_call("DetectHiddenWindows", "On")
+        ahk.flow.ahk_call("SetTitleMatchMode", 2)
+        assert fake_ahk.crossings == 0
+        assert ahk.flow.ahk_call("WinExist", "Notepad") == 0x1234
+        assert fake_ahk.crossings == 1
+
+        b.call("WinGetTitle", "ahk_id 4660")
+        b.call("WinExist", "Notepad")
+        assert fake_ahk.crossings == 1
+    assert fake_ahk.crossings == 2
+    assert b.results == ["Untitled - Notepad", 0x1234]
+    assert fake_ahk.calls == [
+        ("DetectHiddenWindows", "On"),
+        ("SetTitleMatchMode", 2),
+        ("WinExist", "Notepad"),
+        ("WinGetTitle", "ahk_id 4660"),
+        ("WinExist", "Notepad"),
+    ]
+
+    fake_ahk.calls.clear()
+    with ahk.batch() as b:
+        b.call("WinExist", "Notepad")
+        assert ahk.flow.ahk_call_many([]) == []
+        assert fake_ahk.calls == []
+    assert b.results == [0x1234]
+
+    fake_ahk.calls.clear()
+    with pytest.raises(ZeroDivisionError):
+        with ahk.batch() as b:
+            b.call("WinGetTitle", "A")
+            1 / 0
+    assert fake_ahk.calls == []
+    assert b.results == []
+
+
+def test_thread_settings_cache(fake_ahk):
+    info = ahk.flow.settings_cache_info()
+
+    ahk.flow.ahk_call("SetTitleMatchMode", 2)
+    ahk.flow.ahk_call("SetTitleMatchMode", "fast")
+    ahk.flow.ahk_call("SetTitleMatchMode", 2)
+    ahk.flow.ahk_call("SetTitleMatchMode", "Fast")
+    ahk.flow.ahk_call("CoordMode", "mouse", "screen")
+    ahk.flow.ahk_call("CoordMode", "tooltip", "screen")
+    ahk.flow.ahk_call("CoordMode", "Mouse", "screen")
+    ahk.flow.ahk_call("SetKeyDelay", 10, -1)
+    ahk.flow.ahk_call("SetKeyDelay", 10, -1, "Play")
+    ahk.flow.ahk_call("SetKeyDelay", 10, -1)
+    assert fake_ahk.calls == [
+        ("SetTitleMatchMode", 2),
+        ("SetTitleMatchMode", "fast"),
+        ("CoordMode", "mouse", "screen"),
+        ("CoordMode", "tooltip", "screen"),
+        ("SetKeyDelay", 10, -1),
+        ("SetKeyDelay", 10, -1, "Play"),
+    ]
+    new_info = ahk.flow.settings_cache_info()
+    assert new_info.applied - info.applied == 6
+    assert new_info.skipped - info.skipped == 4
+
+    fake_ahk.calls.clear()
+    ahk.flow.ahk_call("SetTitleMatchMode", 3)
+    ahk.flow.ahk_call("SetTitleMatchMode", 2)
+    assert fake_ahk.calls == [("SetTitleMatchMode", 3), ("SetTitleMatchMode", 2)]
+
+    # A callback runs in a new AHK thread with the default settings.
+    fake_ahk.calls.clear()
+    callback = ahk.flow._wrap_callback(
+        lambda: ahk.flow.ahk_call("SetTitleMatchMode", 2),
+        (),
+        lambda func: func(),
+        lambda func: func(),
+    )
+    callback()
+    ahk.flow.ahk_call("SetTitleMatchMode", 2)
+    assert fake_ahk.calls == [("SetTitleMatchMode", 2), ("SetTitleMatchMode", 2)]
+
+    fake_ahk.calls.clear()
+    ahk.flow.void(lambda: None)()
+    ahk.flow.ahk_call("SetTitleMatchMode", 2)
+    assert fake_ahk.calls == [("SetTitleMatchMode", 2)]
+
+
+def test_thread_settings_cache_errors(fake_ahk):
+    # The settings discarded with the batch must be applied again.
+    with pytest.raises(ZeroDivisionError):
+        with ahk.batch():
+            ahk.flow.ahk_call("DetectHiddenWindows", "On")
+            1 / 0
+    ahk.flow.ahk_call("DetectHiddenWindows", "On")
+    assert fake_ahk.calls == [("DetectHiddenWindows", "On")]
+
+    def fail(*args):
+        raise ahk.Error("boom")
+
+    fake_ahk.handlers["WinExist"] = fail
+    fake_ahk.calls.clear()
+    with pytest.raises(ahk.Error, match="boom"):
+        with ahk.batch():
+            ahk.flow.ahk_call("DetectHiddenWindows", "Off")
+            ahk.flow.ahk_call("WinExist", "A")
+    ahk.flow.ahk_call("DetectHiddenWindows", "Off")
+    assert fake_ahk.calls == [
+        ("DetectHiddenWindows", "Off"),
+        ("WinExist", "A"),
+        ("DetectHiddenWindows", "Off"),
+    ]
+
+
+def test_command(fake_ahk):
+    fake_ahk.handlers["WinGetPos"] = lambda *args: {"X": 10, "Y": 20}
+    win_get_pos = ahk.flow.command("WinGetPos")
+    assert fake_ahk.crossings == 1
+    assert ahk.flow.command("WinGetPos") is win_get_pos
+    assert fake_ahk.crossings == 1
+    assert win_get_pos == "WinGetPos"
+    assert repr(win_get_pos) == "Command('WinGetPos')"
+    assert win_get_pos.id == fake_ahk.command_ids["WinGetPos"]
+
+    assert win_get_pos("A") == {"X": 10, "Y": 20}
+    assert ahk.flow.ahk_call(win_get_pos, "B") == {"X": 10, "Y": 20}
+    assert fake_ahk.crossings == 3
+    assert fake_ahk.calls == [("WinGetPos", "A"), ("WinGetPos", "B")]
+
+    # Setting commands still go through the settings cache.
+    send_level = ahk.flow.command("SendLevel")
+    send_level(1)
+    send_level(1)
+    assert fake_ahk.calls[-1] == ("SendLevel", 1)
+    assert len(fake_ahk.calls) == 3
+
+    with pytest.raises(TypeError, match="must be a string"):
+        ahk.flow.command(1)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def wait(self, event, timeout):
+        if not event.is_set():
+            self.now += timeout
+        return event.is_set()
+
+
+@pytest.fixture()
+def scheduler():
+    clock = FakeClock()
+    polls = []
+    scheduler = ahk.flow._WaitScheduler(clock=clock, wait=clock.wait, poll=lambda: polls.append(clock.now))
+    scheduler.fake_clock = clock
+    scheduler.polls = polls
+    return scheduler
+
+
+def test_wait_scheduler(scheduler):
+    clock = scheduler.fake_clock
+    checks = []
+
+    def query():
+        checks.append(clock.now)
+        return "ready" if clock.now >= 0.095 else ""
+
+    assert scheduler.wait(1, query, None, False) == "ready"
+    assert clock.now == pytest.approx(0.1)
+    # AHK is polled once per tick.
+    assert len(scheduler.polls) == 11
+    assert scheduler.entries == {}
+
+    clock.now = 0
+    checks.clear()
+    assert scheduler.wait(0.5, query, None, True) is False
+    # The final check is done at the deadline.
+    assert checks[-1] == pytest.approx(0.5)
+
+    clock.now = 0
+    assert scheduler.wait(0.05, None, None, False) is None
+    assert clock.now == pytest.approx(0.05)
+
+
+def test_wait_scheduler_backoff(scheduler):
+    clock = scheduler.fake_clock
+    checks = []
+
+    def query():
+        checks.append(clock.now)
+        return clock.now >= 60
+
+    assert scheduler.wait(float("inf"), query, "key", False) is True
+    # The unchanged query is checked no more often than _max_check_interval
+    # allows.
+    intervals = [b - a for a, b in zip(checks, checks[1:])]
+    assert intervals[0] == pytest.approx(ahk.flow._poll_interval)
+    assert max(intervals) <= ahk.flow._max_check_interval + ahk.flow._poll_interval
+    assert len(checks) < 60 / ahk.flow._max_check_interval * 1.1
+    # AHK is still polled every tick.
+    assert len(scheduler.polls) > 60 / ahk.flow._poll_interval * 0.9
+
+    # Short waits back off less.
+    assert ahk.flow._max_interval(2) == pytest.approx(0.02)
+    assert ahk.flow._max_interval(1) == ahk.flow._poll_interval
+
+
+def test_wait_scheduler_shared_query(scheduler):
+    clock = scheduler.fake_clock
+    checks = []
+
+    def query():
+        checks.append(clock.now)
+        return clock.now >= 0.095
+
+    waiter = ahk.flow._Waiter(float("inf"))
+    with scheduler.lock:
+        scheduler._register(query, "key", waiter)
+    # The second wait with the same key shares the query with the first one.
+    assert scheduler.wait(1, query, "key", False) is True
+    assert len(checks) == 11
+    assert list(scheduler.entries) == ["key"]
+    assert waiter.event.is_set()
+
+    entry = scheduler.entries["key"]
+    with scheduler.lock:
+        scheduler._unregister(entry, waiter)
+    assert scheduler.entries == {}
+
+
+def test_wait_scheduler_fresh_value(scheduler):
+    clock = scheduler.fake_clock
+    state = {"pressed": True}
+    checks = []
+
+    def query():
+        checks.append(clock.now)
+        return state["pressed"]
+
+    waiter = ahk.flow._Waiter(float("inf"))
+    with scheduler.lock:
+        entry = scheduler._register(query, "key", waiter)
+    scheduler._tick(clock.now)
+    assert entry.value is True
+
+    # The state changes after the first waiter has checked it, but before
+    # the next tick. The second waiter doesn't get the cached value.
+    state["pressed"] = False
+    clock.now = 0.005
+    assert scheduler.wait(0.2, query, "key", False) is False
+    assert checks[1] == pytest.approx(0.01)
+
+    state["pressed"] = True
+    clock.now = 1
+    del checks[:]
+    assert scheduler.wait(0.2, query, "key", True) is False
+    assert checks[0] == pytest.approx(1)
+
+    with scheduler.lock:
+        scheduler._unregister(entry, waiter)
+    assert scheduler.entries == {}
+
+
+def test_wait_scheduler_error(scheduler):
+    def query():
+        raise ahk.Error("boom")
+
+    with pytest.raises(ahk.Error, match="boom"):
+        scheduler.wait(1, query, "key", False)
+    assert scheduler.entries == {}
+
+
+def test_wait_for(fake_ahk):
+    states = iter([0, 0, 0, 1])
+    fake_ahk.handlers["GetKeyState"] = lambda key, mode: next(states)
+    assert ahk.wait_key_pressed("F1", timeout=1) is True
+    assert fake_ahk.calls.count(("GetKeyState", "F1", "P")) == 4
+    assert ("Sleep", -1) in fake_ahk.calls
+
+    fake_ahk.handlers["GetKeyState"] = lambda key, mode: 1
+    assert ahk.wait_key_released("F1", timeout=0.05) is False
@@ -0,0 +1,86 @@
+import pytest
+
+import ahkpy as ahk
+from ahkpy.keys import CompiledKeys, KeyEvent
+
+
+def key(value, modifiers="", action="", count=1):
+    return KeyEvent("key", value, modifiers, action, count)
+
+
+def test_compile():
+    keys = ahk.keys.compile("^+{home}{Down 3}a!b")
+    assert keys.events == (
+        key("Home", "^+"),
+        key("Down", count=3),
+        key("a"),
+        key("b", "!"),
+    )
+    assert not keys.blind
+    assert str(keys) == "^+{Home}{Down 3}a!b"
+    assert ahk.keys.compile(keys) is keys
+    assert ahk.keys.compile("^+{home}{Down 3}a!b") is keys  # Cached
+
+    keys = ahk.keys.compile("{Blind}{LCtrl up}{RAlt DownR}{vk41sc01E down}{F24 DownTemp}")
+    assert keys.blind
+    assert [(e.value, e.action) for e in keys.events] == [
+        ("LCtrl", "up"), ("RAlt", "downr"), ("vk41sc01E", "down"), ("F24", "downtemp"),
+    ]
+    assert str(keys) == "{Blind}{LCtrl Up}{RAlt DownR}{vk41sc01E Down}{F24 DownTemp}"
+
+    assert ahk.keys.compile("{u+20ac}{ASC 0065}{{}{}}{!}").events == (
+        key("U+20AC"), key("ASC 0065"), key("{"), key("}"), key("!"),
+    )
+    assert ahk.keys.compile("^{Click 100, 200 Right}").events == (KeyEvent("click", "100 200 Right", "^"),)
+    assert ahk.keys.compile("a{Text}^{b}").events == (key("a"), KeyEvent("text", "^{b}"))
+    assert ahk.keys.compile("{Raw}").events == ()
+    # A trailing modifier symbol is sent as a character.
+    assert ahk.keys.compile("x^!").events == (key("x"), key("!", "^"))
+
+
+@pytest.mark.parametrize("keys, message", [
+    ("ab{Enter", "unclosed '{' at position 2"),
+    ("{}", "unclosed '{'"),
+    ("{ 2}", "missing key name"),
+    ("{Entr}", "unknown key 'Entr'"),
+    ("{Enter 2 3}", "invalid key options '2 3'"),
+    ("{Enter Press}", "invalid key options 'Press'"),
+    ("a{Blind}", "{Blind} must be at the start"),
+    ("^{Text}a", "invalid {Text}"),
+    ("{Click 1 2 3 4}", "too many click coordinates"),
+    ("{Click Twice}", "invalid click option 'Twice'"),
+    ("{ASC}", "{ASC} requires a character code"),
+])
+def test_compile_errors(keys, message):
+    with pytest.raises(ValueError, match=message.replace("{", r"\{").replace("(", r"\(")):
+        ahk.keys.compile(keys)
+
+
+def test_serialize():
+    assert str(ahk.keys.compile("aaaaaaaaaa")) == "{a 10}"
+    assert str(ahk.keys.compile("aaa")) == "aaa"
+    assert str(ahk.keys.compile("\n" * 10 + " " * 10)) == "\n" * 10 + " " * 10
+    assert str(ahk.keys.compile("{Enter}{enter}{Enter 2}")) == "{Enter 4}"
+    assert str(ahk.keys.compile("{a 0}b")) == "b"
+    assert str(ahk.keys.compile("{Raw}^!+#{}")) == "{Raw}^!+#{}"
+    assert str(ahk.keys.compile("{Raw}a^b")) == "a{^}b"
+    assert str(ahk.keys.compile("{Text}a^b")) == "{Text}a^b"
+
+    keys = ahk.keys.compile("{Raw}a^") + ahk.keys.compile("{Tab}")
+    assert str(keys) == "a{^}{Tab}"
+    assert ahk.keys.compile(str(keys)).events == (key("a"), key("^"), key("Tab"))
+
+    with pytest.raises(ValueError, match="cannot append keys after {Text}"):
+        ahk.keys.compile("{Text}a") + ahk.keys.compile("b")
+    with pytest.raises(ValueError, match="blind and non-blind"):
+        ahk.keys.compile("{Blind}a") + ahk.keys.compile("b")
+    assert CompiledKeys(()) + CompiledKeys((key("a"),)) == CompiledKeys((key("a"),))
+
+
+def test_send_compiled(fake_ahk):
+    keys = ahk.keys.compile("{Right}{Right}{Right}{Right}{Right}")
+    ahk.send_input(keys)
+    ahk.send_event(keys)
+    ahk.send_play(keys)
+    sent = [call for call in fake_ahk.calls if call[0].startswith("Send") and call[0] != "SendLevel"]
+    assert sent == [("SendInput", "{Right 5}"), ("SendEvent", "{Right 5}"), ("SendPlay", "{Right 5}")]
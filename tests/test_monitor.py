@@ -0,0 +1,87 @@
+import pytest
+
+import ahkpy as ahk
+from ahkpy import monitor as monitor_module
+from ahkpy.monitor import SPI_SETWORKAREA, WM_DISPLAYCHANGE, WM_SETTINGCHANGE
+
+
+@pytest.fixture()
+def displays(fake_ahk, monkeypatch):
+    monkeypatch.setattr(monitor_module, "_monitors", None)
+    monkeypatch.setattr(monitor_module, "_handlers", None)
+    displays = {
+        "primary": 2,
+        "monitors": [
+            (r"\\.\DISPLAY1", (-1920, 0, 0, 1080), (-1920, 0, 0, 1040)),
+            (r"\\.\DISPLAY2", (0, 0, 2560, 1440), (0, 0, 2560, 1400)),
+        ],
+    }
+
+    def sys_get_monitors():
+        monitors = displays["monitors"]
+        return {
+            "primary": displays["primary"],
+            "rects": ",".join(str(v) for _, rect, work_area in monitors for v in (*rect, *work_area)),
+            "names": "s" + "".join(name for name, *_ in monitors),
+            "lengths": ",".join(str(len(name)) for name, *_ in monitors),
+        }
+
+    fake_ahk.handlers["SysGetMonitors"] = sys_get_monitors
+    return displays
+
+
+def message_handlers(fake_ahk):
+    return {
+        call[1]: call[2]
+        for call in fake_ahk.calls
+        if call[0] == "OnMessage"
+    }
+
+
+def test_monitors(fake_ahk, displays):
+    monitors = ahk.monitors()
+    assert monitors == [
+        ahk.Monitor(1, r"\\.\DISPLAY1", (-1920, 0, 1920, 1080), (-1920, 0, 1920, 1040), False),
+        ahk.Monitor(2, r"\\.\DISPLAY2", (0, 0, 2560, 1440), (0, 0, 2560, 1400), True),
+    ]
+    assert ahk.monitors() == monitors
+    assert fake_ahk.calls.count(("SysGetMonitors",)) == 1
+
+    handlers = message_handlers(fake_ahk)
+    assert set(handlers) == {WM_DISPLAYCHANGE, WM_SETTINGCHANGE}
+
+    # Unrelated setting changes keep the cache.
+    handlers[WM_SETTINGCHANGE](0, 0, WM_SETTINGCHANGE, 0)
+    ahk.monitors()
+    assert fake_ahk.calls.count(("SysGetMonitors",)) == 1
+
+    displays["monitors"][1] = (r"\\.\DISPLAY2", (0, 0, 2560, 1440), (0, 0, 2560, 1380))
+    handlers[WM_SETTINGCHANGE](SPI_SETWORKAREA, 0, WM_SETTINGCHANGE, 0)
+    assert ahk.monitors()[1].work_area == (0, 0, 2560, 1380)
+
+    del displays["monitors"][0]
+    displays["primary"] = 1
+    handlers[WM_DISPLAYCHANGE](32, 0, WM_DISPLAYCHANGE, 0)
+    assert [(m.number, m.is_primary) for m in ahk.monitors()] == [(1, True)]
+    assert fake_ahk.calls.count(("SysGetMonitors",)) == 3
+
+    ahk.clear_monitors_cache()
+    ahk.monitors()
+    assert fake_ahk.calls.count(("SysGetMonitors",)) == 4
+    # The handlers are registered once.
+    assert len([call for call in fake_ahk.calls if call[0] == "OnMessage"]) == 2
+
+
+def test_monitor_of(displays):
+    left, right = ahk.monitors()
+    assert ahk.monitor_of([
+        (100, 100, 800, 600),
+        (-1000, 100, 800, 600),
+        (-200, 0, 400, 300),  # Evenly split, the first monitor wins.
+        (-300, 0, 400, 300),
+        (3000, 100, 100, 100),  # Off screen on the right.
+        (-1800, -500, 100, 100),  # Off screen on the top.
+        None,
+        ahk.WindowRect(0, 0, 1, 1),
+    ]) == [right, left, left, left, right, left, None, right]
+    assert ahk.monitor_of([]) == []
@@ -0,0 +1,146 @@
+import itertools
+
+import pytest
+
+import ahkpy as ahk
+from ahkpy import process_info
+
+
+class FakeProcesses:
+    """The stand-in for the Windows process API."""
+
+    def __init__(self):
+        self.processes = {}
+        self.handles = {}
+        self.queries = 0
+        self._handle_ids = itertools.count(1)
+
+    def start(self, pid, path, start_time, is_32bit=False):
+        self.processes[pid] = {"path": path, "start_time": start_time, "is_32bit": is_32bit, "exited": False}
+
+    def exit(self, pid):
+        self.processes.pop(pid)["exited"] = True
+
+    def open_process(self, pid):
+        process = self.processes.get(pid)
+        if process is None:
+            return None
+        handle = next(self._handle_ids)
+        self.handles[handle] = process
+        return handle
+
+    def has_exited(self, handle):
+        return self.handles[handle]["exited"]
+
+    def close_process(self, handle):
+        del self.handles[handle]
+
+    def query_process(self, handle):
+        self.queries += 1
+        process = self.handles[handle]
+        return process["start_time"], process["path"], process["is_32bit"]
+
+
+@pytest.fixture()
+def processes(monkeypatch):
+    fake = FakeProcesses()
+    monkeypatch.setattr(process_info, "_open_process", fake.open_process)
+    monkeypatch.setattr(process_info, "_has_exited", fake.has_exited)
+    monkeypatch.setattr(process_info, "_close_process", fake.close_process)
+    monkeypatch.setattr(process_info, "_query_process", fake.query_process)
+    monkeypatch.setattr(process_info, "_cache", process_info._cache.__class__())
+    yield fake
+    ahk.clear_process_info_cache()
+    assert fake.handles == {}
+
+
+def test_get_process_info(processes):
+    processes.start(100, r"C:\Windows\System32\notepad.exe", start_time=1)
+    info = ahk.get_process_info(100)
+    assert info == ahk.ProcessInfo(100, 1, r"C:\Windows\System32\notepad.exe", "notepad.exe", False)
+    assert ahk.get_process_info(100) is info
+    assert processes.queries == 1
+
+    assert ahk.get_process_info(200) is None
+    assert ahk.get_process_info(0) is None
+
+    # The PID is reused by a new process.
+    processes.exit(100)
+    processes.start(100, r"C:\Program Files (x86)\App\app.exe", start_time=2, is_32bit=True)
+    info = ahk.get_process_info(100)
+    assert (info.start_time, info.name, info.is_32bit) == (2, "app.exe", True)
+    assert len(processes.handles) == 1
+
+    processes.exit(100)
+    assert ahk.get_process_info(100) is None
+    assert processes.handles == {}
+
+
+def test_cache_size(processes, monkeypatch):
+    monkeypatch.setattr(process_info, "_CACHE_MAXSIZE", 2)
+    for pid in (1, 2, 3):
+        processes.start(pid, f"C:\\app{pid}.exe", start_time=pid)
+        ahk.get_process_info(pid)
+    assert list(process_info._cache) == [2, 3]
+    assert len(processes.handles) == 2
+
+
+def test_window_process(fake_ahk, processes):
+    processes.start(100, r"C:\Windows\SysWOW64\notepad.exe", start_time=1, is_32bit=True)
+    fake_ahk.handlers["WinGet"] = lambda cmd, title, *args: {
+        ("PID", "ahk_id 16"): 100,
+        ("PID", "ahk_id 32"): 200,
+        ("ProcessName", "ahk_id 32"): "elevated.exe",
+    }.get((cmd, title), "")
+    win = ahk.Window(0x10)
+    assert win.process_name == "notepad.exe"
+    assert win.process_path == r"C:\Windows\SysWOW64\notepad.exe"
+    assert win._is_win32()
+    assert win._is_win32()
+    assert processes.queries == 1
+    assert not any(call[1] in ("ProcessName", "ProcessPath") for call in fake_ahk.calls if call[0] == "WinGet")
+
+    # AHK is asked about the processes that cannot be opened.
+    assert ahk.Window(0x20).process_name == "elevated.exe"
+    assert not ahk.Window(0x20)._is_win32()
+    assert ahk.Window(0x30).process_name is None
+
+
+class FakeKernel32:
+    """The stand-in for kernel32 with or without IsWow64Process2."""
+
+    def __init__(self, wow64, has_wow64_process2=True, fail=False):
+        self.wow64 = wow64
+        self.fail = fail
+        if has_wow64_process2:
+            self.IsWow64Process2 = self._is_wow64_process2
+
+    def _is_wow64_process2(self, handle, process_machine, native_machine):
+        process_machine._obj.value = process_info.IMAGE_FILE_MACHINE_I386 if self.wow64 else 0
+        native_machine._obj.value = 0x8664
+        return not self.fail
+
+    def IsWow64Process(self, handle, wow64):
+        wow64._obj.value = self.wow64
+        return not self.fail
+
+    def GetCurrentProcess(self):
+        return -1
+
+
+@pytest.mark.parametrize("has_wow64_process2", [True, False])
+def test_query_is_32bit(has_wow64_process2):
+    def query(**kwargs):
+        return process_info._query_is_32bit(FakeKernel32(has_wow64_process2=has_wow64_process2, **kwargs), 1)
+
+    assert query(wow64=True) is True
+    assert query(wow64=False) is False
+    assert query(wow64=False, fail=True) is None
+
+
+def test_window_process_unknown_bitness(fake_ahk, processes):
+    processes.start(100, r"C:\Windows\notepad.exe", start_time=1, is_32bit=None)
+    fake_ahk.handlers["WinGet"] = lambda cmd, title, *args: 100 if cmd == "PID" else ""
+    win = ahk.Window(0x10)
+    assert win.process_name == "notepad.exe"
+    assert not win._is_win32()
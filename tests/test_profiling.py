@@ -0,0 +1,93 @@
+import io
+import json
+import sys
+
+import pytest
+
+import ahkpy as ahk
+
+
+@pytest.fixture()
+def profiler(fake_ahk, monkeypatch):
+    monkeypatch.setattr(ahk.profiling, "_profiler", None)
+    monkeypatch.setattr(ahk.profiling, "_atexit_registered", True)
+    ahk.profiling.enable()
+    yield fake_ahk
+    ahk.profiling.disable()
+
+
+def test_enable(profiler):
+    assert ahk.profiling.is_enabled()
+    ahk.profiling.disable()
+    assert not ahk.profiling.is_enabled()
+    ahk.flow.ahk_call("WinExist", "A")
+    assert ahk.profiling.get_stats() == []
+
+    ahk.profiling.enable()
+    ahk.flow.ahk_call("WinExist", "A")
+    assert [s.command for s in ahk.profiling.get_stats()] == ["WinExist"]
+    ahk.profiling.reset()
+    assert ahk.profiling.get_stats() == []
+
+    with pytest.raises(ValueError, match="max_samples must be positive"):
+        ahk.profiling.enable(max_samples=0)
+
+
+def test_stats(profiler):
+    profiler.handlers["MouseGetPos"] = lambda: {"X": 0, "Y": 0}
+    site_lineno = sys._getframe().f_lineno + 2
+    for _ in range(10):
+        ahk.flow.ahk_call("WinExist", "A")
+    ahk.flow.ahk_call_many([("WinExist", "A"), ("WinGetTitle", "A")])
+    win_get_title = ahk.flow.command("WinGetTitle")
+    win_get_title("A")
+    ahk.get_mouse_pos()
+
+    stats = {s.command: s for s in ahk.profiling.get_stats()}
+    assert set(stats) == {"WinExist", "ahk_call_many", "WinGetTitle", "CoordMode", "MouseGetPos"}
+    assert stats["WinExist"].count == 10
+    assert stats["WinExist"].call_sites == [((__file__, site_lineno), 10)]
+    assert stats["WinExist"].total >= stats["WinExist"].p99 >= stats["WinExist"].p50 > 0
+    assert stats["WinExist"].lock_wait >= 0
+    assert stats["ahk_call_many"].count == 1
+    assert stats["WinGetTitle"].count == 1
+    # The call site is outside of the ahkpy package.
+    (filename, _), _ = stats["MouseGetPos"].call_sites[0]
+    assert filename == __file__
+
+
+def test_max_samples(profiler):
+    ahk.profiling.enable(max_samples=5, max_trace_events=3)
+    for _ in range(20):
+        ahk.flow.ahk_call("WinExist", "A")
+    assert ahk.profiling.get_stats()[0].count == 20
+    assert len(ahk.profiling._profiler.commands["WinExist"].samples) == 5
+
+    f = io.StringIO()
+    ahk.profiling.write_trace(f)
+    events = json.loads(f.getvalue())["traceEvents"]
+    calls = [e for e in events if e.get("cat") == "ahk_call"]
+    assert len(calls) == 3
+    assert events[-1]["name"] == "17 calls not traced"
+
+
+def test_report_and_trace(profiler, tmpdir):
+    ahk.flow.ahk_call("WinExist", "A")
+    ahk.flow.ahk_call("WinExist", "B")
+
+    f = io.StringIO()
+    ahk.profiling.report(f)
+    lines = f.getvalue().splitlines()
+    assert lines[0].startswith("AHK bridge profile: 2 calls, ")
+    assert lines[1].split() == ["command", "count", "total,", "ms", "p50,", "us", "p99,", "us", "lock", "wait,", "ms"]
+    assert lines[2].split()[:2] == ["WinExist", "2"]
+    assert lines[3].strip().startswith(f"{__file__}:")
+    assert lines[3].endswith("(1 calls)")
+
+    trace_file = tmpdir / "trace.json"
+    ahk.profiling.write_trace(str(trace_file))
+    trace = json.loads(trace_file.read())
+    calls = [e for e in trace["traceEvents"] if e.get("cat") == "ahk_call"]
+    assert [e["name"] for e in calls] == ["WinExist", "WinExist"]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in calls)
+    assert calls[0]["args"]["site"].startswith(f"{__file__}:")
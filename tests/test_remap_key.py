@@ -1,3 +1,5 @@
+import pytest
+
 import ahkpy as ahk
 
 
@@ -37,3 +39,42 @@ def test_remap_key(request, child_ahk):
     assert win_f14.close_all(timeout=1)
 
     ahk.send("{F24}", level=10)
+
+
+def test_native_remap(fake_ahk):
+    fake_ahk.handlers["RemapKey"] = lambda *args: 1
+    remap = ahk.remap_key("CapsLock", "Ctrl", level=5)
+    assert remap == ahk.RemappedKey(
+        ahk.Hotkey("*CapsLock", ahk.default_context),
+        ahk.Hotkey("*CapsLock Up", ahk.default_context),
+    )
+    assert fake_ahk.calls == [("RemapKey", "CapsLock", "Ctrl", "input", 5, -1, 0, "")]
+
+    fake_ahk.calls.clear()
+    ahk.remap_key("RCtrl", "RAlt", mode="event")
+    ahk.remap_key("XButton1", "LButton", mode="play")
+    assert fake_ahk.calls == [
+        ("RemapKey", "RCtrl", "RAlt", "event", 0, -1, 0, "RCtrl"),
+        ("RemapKey", "XButton1", "LButton", "play", 0, -1, 1, ""),
+    ]
+
+    # The keystrokes don't call Python, but the context is kept.
+    fake_ahk.calls.clear()
+    ctx = ahk.HotkeyContext(lambda: True)
+    ctx.remap_key("F13", "F14")
+    assert [call[0] for call in fake_ahk.calls] == ["HotkeyContext", "RemapKey", "HotkeyExitContext"]
+
+    with pytest.raises(ValueError, match="not a valid send mode"):
+        ahk.remap_key("F13", "F14", mode="fast")
+    with pytest.raises(ValueError, match="level must be between 0 and 100"):
+        ahk.remap_key("F13", "F14", level=101)
+
+
+def test_python_remap_fallback(fake_ahk):
+    fake_ahk.handlers["RemapKey"] = lambda *args: 0
+    remap = ahk.remap_key("F13", "ä")
+    assert remap.origin_hotkey.key_name == "*F13"
+    assert [call[:2] for call in fake_ahk.calls if call[0] == "Hotkey"] == [
+        ("Hotkey", "*F13"),
+        ("Hotkey", "*F13 Up"),
+    ]
@@ -1,3 +1,4 @@
+import contextvars
 import time
 
 import pytest
@@ -34,3 +35,115 @@ def test_fallback_to_send_event_on_delay(notepad):
     ahk.send("abcdef", key_delay=0.01)
     end = time.perf_counter()
     assert end - start >= 6 * 0.01
+
+
+def sent_calls(fake_ahk):
+    return [call for call in fake_ahk.calls if call[0] in ("SendInput", "SendEvent", "SendPlay", "SendLevel")]
+
+
+def test_coalesced_send(fake_ahk):
+    with ahk.coalesced_send():
+        ahk.send_input("a")
+        ahk.send_input("{Left}")
+        ahk.send_input("{Left 2}")
+        assert fake_ahk.calls == []
+    assert sent_calls(fake_ahk) == [("SendLevel", 0), ("SendInput", "a{Left 3}")]
+
+    fake_ahk.calls.clear()
+    with ahk.coalesced_send():
+        ahk.send_input("a")
+        ahk.send_input("b", level=10)
+        ahk.send_event("c")
+        ahk.send_event("d")
+    # SendLevel 0 is already applied.
+    assert sent_calls(fake_ahk) == [
+        ("SendInput", "a"),
+        ("SendLevel", 10), ("SendInput", "b"),
+        ("SendLevel", 0), ("SendEvent", "cd"),
+    ]
+
+    fake_ahk.calls.clear()
+    with ahk.coalesced_send():
+        ahk.send_input("{Text}a")
+        ahk.send_input("b")
+        ahk.send_input("{Blind}c")
+        ahk.send_input("{Unknown}")
+    assert [call for call in sent_calls(fake_ahk) if call[0] != "SendLevel"] == [
+        ("SendInput", "{Text}a"), ("SendInput", "b"), ("SendInput", "{Blind}c"), ("SendInput", "{Unknown}"),
+    ]
+
+
+def test_coalesced_send_flush_points(fake_ahk):
+    with ahk.coalesced_send() as buffer:
+        ahk.send_input("a")
+        ahk.send_input("b")
+        ahk.flow.ahk_call("WinExist", "A")
+        ahk.send_input("c")
+        ahk.sleep(0)
+        ahk.send_input("d")
+        buffer.flush()
+        ahk.send_input("e")
+        with pytest.raises(RuntimeError):
+            with ahk.coalesced_send():
+                ahk.send_input("f")
+                raise RuntimeError
+        ahk.send_input("g")
+    assert [call for call in fake_ahk.calls if call[0] != "SendLevel"] == [
+        ("SendInput", "ab"), ("WinExist", "A"),
+        ("SendInput", "c"), ("Sleep", -1),
+        ("SendInput", "d"),
+        ("SendInput", "ef"),
+        ("SendInput", "g"),
+    ]
+
+    fake_ahk.calls.clear()
+    ahk.send_input("h")
+    assert fake_ahk.calls == [("SendInput", "h")]
+
+
+def test_send_buffer_nested(fake_ahk):
+    current = ahk.sending._current_send_buffer
+    outer = ahk.coalesced_send()
+    inner = ahk.coalesced_send()
+    with outer:
+        with inner:
+            with outer:
+                assert current.get() is outer
+            assert current.get() is inner
+            with inner:
+                with inner:
+                    ahk.send_input("a")
+                assert current.get() is inner
+            assert current.get() is inner
+        assert current.get() is outer
+        ahk.send_input("b")
+    assert current.get(None) is None
+    assert [call for call in fake_ahk.calls if call[0] != "SendLevel"] == [
+        ("SendInput", "a"),
+        ("SendInput", "b"),
+    ]
+
+
+def test_send_buffer(fake_ahk):
+    with pytest.raises(ValueError, match="flush_after must be positive"):
+        ahk.send_buffer(0)
+
+    def callback():
+        ahk.send_buffer(0.02).activate()
+        ahk.send("a")
+        ahk.send("b")
+
+    # AHK runs every callback in a copy of the context.
+    contextvars.copy_context().run(callback)
+    # The keys are merged across the callbacks until the timer fires.
+    with ahk.send_buffer(0.02):
+        ahk.send("c")
+        timers = [call for call in fake_ahk.calls if call[0] == "SetTimer"]
+        assert len(timers) == 1
+        assert timers[0][2:] == (-20, 0)
+        assert sent_calls(fake_ahk) == []
+        flush = timers[0][1]
+        flush()
+        assert sent_calls(fake_ahk) == [("SendLevel", 0), ("SendInput", "abc")]
+        flush()
+        assert len(sent_calls(fake_ahk)) == 2
@@ -0,0 +1,116 @@
+import pytest
+
+import ahkpy as ahk
+
+
+@pytest.fixture()
+def desktop(fake_ahk):
+    # The active window 10 with the focused control 20 of the given class.
+    state = {"class_name": "Edit", "clipboard_ok": True}
+
+    def control_get_focus(*args):
+        if state["class_name"] is None:
+            raise ahk.Error(1)
+        return state["class_name"] + "1"
+
+    def win_get_class(title, *args):
+        return state["class_name"] if title == "ahk_id 20" else "Notepad"
+
+    fake_ahk.handlers["WinActive"] = lambda *args: 10
+    fake_ahk.handlers["WinExist"] = lambda title, *args: 20 if title == "ahk_id 20" else 0
+    fake_ahk.handlers["ControlGetFocus"] = control_get_focus
+    fake_ahk.handlers["ControlGet"] = lambda *args: 20
+    fake_ahk.handlers["WinGetClass"] = win_get_class
+    fake_ahk.handlers["ClipWait"] = lambda *args: state["clipboard_ok"]
+    return state
+
+
+def inserted(fake_ahk):
+    names = {
+        "ClipboardSave", "ClipboardRestore", "SetVar", "ClipWait", "SendInput", "Control", "ControlGetFocus",
+    }
+    return [call[:3] for call in fake_ahk.calls if call[0] in names]
+
+
+def test_insert_text_auto(fake_ahk, desktop):
+    result = ahk.insert_text("hi")
+    assert result.strategy == "send"
+    assert result.elapsed >= 0
+    assert inserted(fake_ahk) == [("SendInput", "{Text}hi")]
+
+    fake_ahk.calls.clear()
+    text = "x" * 100
+    assert ahk.insert_text(text).strategy == "control"
+    assert inserted(fake_ahk) == [("ControlGetFocus", "ahk_id 10", ""), ("Control", "EditPaste", text)]
+
+    fake_ahk.calls.clear()
+    desktop["class_name"] = "Chrome_RenderWidgetHostHWND"
+    assert ahk.insert_text(text, restore_delay=0).strategy == "clipboard"
+    assert inserted(fake_ahk)[1:] == [
+        ("ClipboardSave",),
+        ("SetVar", "Clipboard", ""),
+        ("SetVar", "Clipboard", text),
+        ("ClipWait", 1),
+        ("SendInput", "^v"),
+        ("ClipboardRestore",),
+    ]
+
+    fake_ahk.calls.clear()
+    desktop["class_name"] = None
+    desktop["clipboard_ok"] = False
+    assert ahk.insert_text(text, max_send_length=200).strategy == "send"
+    assert ahk.insert_text(text, restore_delay=0).strategy == "send"
+    assert inserted(fake_ahk)[-3:] == [("ClipWait", 1), ("ClipboardRestore",), ("SendInput", "{Text}" + text)]
+
+
+def test_insert_text_strategy(fake_ahk, desktop):
+    with pytest.raises(ValueError, match="'paste' is not a valid strategy"):
+        ahk.insert_text("hi", "paste")
+
+    assert ahk.insert_text("hi", "control").strategy == "control"
+    assert ahk.insert_text("x" * 100, "send").strategy == "send"
+    assert ahk.insert_text("hi", "clipboard", paste_keys="+{Ins}", restore_delay=0).strategy == "clipboard"
+    assert ("SendInput", "+{Ins}") in fake_ahk.calls
+
+    desktop["class_name"] = "Button"
+    with pytest.raises(ahk.Error, match="not an Edit control"):
+        ahk.insert_text("hi", "control")
+
+    fake_ahk.calls.clear()
+    desktop["clipboard_ok"] = False
+    with pytest.raises(ahk.Error, match="cannot set the clipboard"):
+        ahk.insert_text("hi", "clipboard")
+    assert fake_ahk.calls[-1] == ("ClipboardRestore",)
+
+
+def test_insert_text_restores_clipboard(fake_ahk, desktop):
+    def fail(*args):
+        raise RuntimeError("boom")
+
+    fake_ahk.handlers["SendInput"] = fail
+    with pytest.raises(RuntimeError, match="boom"):
+        ahk.insert_text("hi", "clipboard")
+    assert fake_ahk.calls[-1] == ("ClipboardRestore",)
+
+    # The callback that interrupts the insertion cannot take the clipboard.
+    nested = []
+    fake_ahk.handlers["SendInput"] = lambda keys: nested.append(ahk.insert_text("x" * 100)) if keys == "^v" else ""
+    desktop["class_name"] = None
+    assert ahk.insert_text("hi", "clipboard", restore_delay=0).strategy == "clipboard"
+    assert [result.strategy for result in nested] == ["send"]
+    assert fake_ahk.calls.count(("ClipboardSave",)) == 2
+
+    errors = []
+
+    def nested_clipboard(keys):
+        if keys == "^v":
+            with pytest.raises(ahk.Error, match="clipboard is in use by another insert_text\\(\\) call") as exc_info:
+                ahk.insert_text("x", "clipboard")
+            errors.append(exc_info.value)
+        return ""
+
+    fake_ahk.handlers["SendInput"] = nested_clipboard
+    ahk.insert_text("hi", "clipboard", restore_delay=0)
+    assert len(errors) == 1
+    # The lock is released after the insertion.
+    assert ahk.insert_text("hi", "clipboard", restore_delay=0).strategy == "clipboard"
@@ -0,0 +1,117 @@
+import zlib
+
+import pytest
+
+import ahkpy as ahk
+
+
+class FakeEdit:
+    """The Edit control served by the fake ControlHashEditLines and
+    ControlGetEditLines calls.
+    """
+
+    def __init__(self, fake_ahk, hwnd, lines):
+        self.hwnd = hwnd
+        self.lines = lines
+        self.fetched = []
+        fake_ahk.handlers["ControlHashEditLines"] = self.hash_lines
+        fake_ahk.handlers["ControlGetEditLines"] = self.get_lines
+
+    def hash_lines(self, hwnd, block_size):
+        if hwnd != self.hwnd:
+            return ""
+        hashes = []
+        for start in range(0, len(self.lines), block_size):
+            crc = 0
+            for line in self.lines[start:start + block_size]:
+                crc = zlib.crc32((line + "\n").encode("utf-16-le"), crc)
+            hashes.append(str(crc))
+        return {"count": len(self.lines), "hashes": "s" + ",".join(hashes)}
+
+    def get_lines(self, hwnd, ranges):
+        if hwnd != self.hwnd:
+            return ""
+        values = []
+        for range_str in ranges.split(","):
+            start, stop = map(int, range_str.split(":"))
+            values.extend(self.lines[start:stop])
+        self.fetched.extend(values)
+        return {
+            "count": len(self.lines),
+            "text": "s" + "".join(values),
+            "lengths": ",".join(str(len(v)) for v in values),
+        }
+
+
+def test_get_lines(fake_ahk):
+    FakeEdit(fake_ahk, 0x100, ["a", "b\tc", "", "d"])
+    control = ahk.Control(0x100)
+    assert control.get_lines() == ["a", "b\tc", "", "d"]
+    assert control.get_lines(1, 3) == ["b\tc", ""]
+    assert control.get_lines(3, 100) == ["d"]
+    assert ahk.Control(0x200).get_lines() is None
+    with pytest.raises(ValueError, match="must not be negative"):
+        control.get_lines(-1)
+
+
+def test_text_watcher(fake_ahk):
+    edit = FakeEdit(fake_ahk, 0x100, [f"line {i}" for i in range(10)])
+    watcher = ahk.Control(0x100).text_watcher(block_size=4)
+    mirror = []
+
+    diff = watcher.poll()
+    assert (diff.old_line_count, diff.line_count) == (0, 10)
+    assert diff.appended == edit.lines
+    mirror = diff.apply(mirror)
+    assert mirror == edit.lines
+
+    edit.fetched.clear()
+    assert watcher.poll() is None
+    assert edit.fetched == []
+
+    # Appending fetches only the last block and the new lines.
+    edit.lines.extend(["line 10", "line 11"])
+    diff = watcher.poll()
+    assert diff.changed == {10: "line 10", 11: "line 11"}
+    assert diff.appended == ["line 10", "line 11"]
+    assert edit.fetched == ["line 8", "line 9", "line 10", "line 11"]
+    mirror = diff.apply(mirror)
+
+    edit.lines[1] = "changed"
+    edit.lines[9] = "also\nchanged"
+    edit.fetched.clear()
+    diff = watcher.poll()
+    assert diff.changed == {1: "changed", 9: "also\nchanged"}
+    assert diff.appended == []
+    assert len(edit.fetched) == 8
+    mirror = diff.apply(mirror)
+
+    del edit.lines[6:]
+    diff = watcher.poll()
+    assert diff.changed == {}
+    assert diff.removed == range(6, 12)
+    assert diff.apply(mirror) == edit.lines
+    assert watcher.line_count == 6
+
+    watcher.reset()
+    assert watcher.poll().appended == edit.lines
+
+    with pytest.raises(ValueError, match="block_size must be positive"):
+        ahk.Control(0x100).text_watcher(block_size=0)
+
+
+def test_watch(fake_ahk, monkeypatch):
+    edit = FakeEdit(fake_ahk, 0x100, ["first"])
+    ticks = []
+
+    def sleep(interval):
+        ticks.append(interval)
+        if len(ticks) == 1:
+            edit.lines.append("second")
+        elif len(ticks) == 3:
+            edit.hwnd = None
+
+    monkeypatch.setattr(ahk.text_watcher, "sleep", sleep)
+    diffs = list(ahk.Control(0x100).text_watcher().watch(interval=0.1))
+    assert [diff.appended for diff in diffs] == [["first"], ["second"]]
+    assert ticks == [0.1, 0.1, 0.1]
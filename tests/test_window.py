@@ -860,3 +860,343 @@ def test_include_hidden_context(child_ahk, settings):
 
 
 # TODO: Write nonexistent/inactive window context tests.
+
+
+def test_snapshot(fake_ahk):
+    def win_snapshot(fields, *query):
+        assert fields == "id,title,pid,x,y,width,height"
+        assert query == ("ahk_exe notepad.exe", "", "", "")
+        # AHK converts the numeric strings to numbers.
+        return {
+            "id": "4660,22136",
+            "title": "s0x10Untitled - Notepad",
+            "title_len": "4,19",
+            "pid": "12,12",
+            "x": "-8,100",
+            "y": "0,100",
+            "width": "800,640",
+            "height": "600,480",
+        }
+
+    fake_ahk.handlers["WinSnapshot"] = win_snapshot
+    snapshot = ahk.windows.filter(exe="notepad.exe").snapshot(fields=("title", "pid", "rect"))
+    assert fake_ahk.calls[-1][0] == "WinSnapshot"
+    assert snapshot.fields == ("id", "title", "pid", "x", "y", "width", "height")
+    assert len(snapshot) == 2
+    assert list(snapshot) == [ahk.Window(0x1234), ahk.Window(0x5678)]
+    assert snapshot[1] == ahk.Window(0x5678)
+    assert snapshot[-1:] == [ahk.Window(0x5678)]
+    assert ahk.Window(0x1234) in snapshot
+    assert snapshot.index(0x5678) == 1
+    assert snapshot.column("title") == ["0x10", "Untitled - Notepad"]
+    assert snapshot.column("x").tolist() == [-8, 100]
+    assert snapshot.row(0) == {
+        "id": 0x1234,
+        "title": "0x10",
+        "pid": 12,
+        "x": -8,
+        "y": 0,
+        "width": 800,
+        "height": 600,
+        "rect": (-8, 0, 800, 600),
+    }
+    with pytest.raises(KeyError, match="'style'"):
+        snapshot.column("style")
+
+    fake_ahk.handlers["WinSnapshot"] = lambda fields, *query: {"id": 4660, "style": 0x10000000}
+    snapshot = ahk.windows.snapshot(fields="style")
+    assert snapshot.row(0) == {"id": 0x1234, "style": ahk.WindowStyle.VISIBLE}
+
+    fake_ahk.handlers["WinSnapshot"] = lambda fields, *query: {"id": "", "title": "s", "title_len": ""}
+    snapshot = ahk.windows.snapshot(fields=["title"])
+    assert len(snapshot) == 0
+    assert snapshot.column("title") == []
+
+    assert len(ahk.windows.filter(id=None).snapshot()) == 0
+
+    with pytest.raises(ValueError, match="'text' is not a valid snapshot field"):
+        ahk.windows.snapshot(fields=["text"])
+
+
+def test_snapshot_non_bmp_title(fake_ahk):
+    # AHK measures the strings in UTF-16 code units, so the emoji counts twice.
+    fake_ahk.handlers["WinSnapshot"] = lambda fields, *query: {
+        "id": "1,2,3",
+        "title": "sa\U0001F600bc\u00e9d",
+        "title_len": "4,0,3",
+    }
+    snapshot = ahk.windows.snapshot(fields=["title"])
+    assert snapshot.column("title") == ["a\U0001F600b", "", "c\u00e9d"]
+    assert ahk.window._split_by_lengths("sa\U0001F600b", "3,1") == ["a\U0001F600", "b"]
+
+
+def test_window_group_reuse(fake_ahk, monkeypatch):
+    monkeypatch.setattr(ahk.window, "_window_groups", {})
+    notepads = ahk.windows.filter(exe="notepad.exe").exclude("Untitled")
+    notepads.minimize_all()
+    notepads.maximize_all()
+    ahk.windows.filter(exe="notepad.exe").exclude("Untitled").restore_all()
+    ahk.windows.filter(exe="calc.exe").hide_all()
+
+    group_adds = [call for call in fake_ahk.calls if call[0] == "GroupAdd"]
+    assert group_adds == [
+        ("GroupAdd", "ahkpy_group_1", "ahk_exe notepad.exe", "", "", "Untitled", ""),
+        ("GroupAdd", "ahkpy_group_2", "ahk_exe calc.exe", "", "", "", ""),
+    ]
+    assert [call[:2] for call in fake_ahk.calls if call[0].startswith("Win")] == [
+        ("WinMinimize", "ahk_group ahkpy_group_1"),
+        ("WinMaximize", "ahk_group ahkpy_group_1"),
+        ("WinRestore", "ahk_group ahkpy_group_1"),
+        ("WinHide", "ahk_group ahkpy_group_2"),
+    ]
+    assert notepads.window_group() == "ahkpy_group_1"
+
+
+def test_geometry(fake_ahk):
+    def win_get_pos(title, *args):
+        if title == "ahk_id 4660":
+            return {"X": 10, "Y": 20, "Width": 300, "Height": 200}
+        return {"X": "", "Y": "", "Width": "", "Height": ""}
+
+    fake_ahk.handlers["WinGetPos"] = win_get_pos
+    win = ahk.Window(0x1234)
+
+    with win.geometry() as g:
+        assert g.rect == (10, 20, 300, 200)
+        g.x += 5
+        g.y += 5
+        g.width = 300  # Not changed
+        assert g.position == (15, 25)
+        assert g.size == (300, 200)
+    assert [call[0] for call in fake_ahk.calls if call[0].startswith("Win")] == ["WinGetPos", "WinMove"]
+    assert fake_ahk.calls[-1] == ("WinMove", "ahk_id 4660", "", 15, 25, "", "")
+    assert g.rect == ahk.WindowRect(15, 25, 300, 200)
+
+    # No changes, no move.
+    fake_ahk.calls.clear()
+    with win.geometry() as g:
+        g.position = (10, 20)
+    assert [call[0] for call in fake_ahk.calls if call[0].startswith("Win")] == ["WinGetPos"]
+
+    # The changes are discarded on error.
+    fake_ahk.calls.clear()
+    with pytest.raises(ZeroDivisionError):
+        with win.geometry() as g:
+            g.size = (100, 100)
+            1 / 0
+    assert [call[0] for call in fake_ahk.calls if call[0].startswith("Win")] == ["WinGetPos"]
+
+    fake_ahk.calls.clear()
+    win.size = (640, 480)
+    assert fake_ahk.calls[-1] == ("WinMove", "ahk_id 4660", "", "", "", 640, 480)
+
+    rect = win.rect_snapshot
+    assert rect == ahk.WindowRect(x=10, y=20, width=300, height=200)
+    assert rect.width == 300
+
+    with ahk.Window(None).geometry() as g:
+        assert g.x is None
+        assert g.rect is None
+        g.x = 100
+    assert ahk.Window(None).rect_snapshot is None
+
+
+def test_window_cache(fake_ahk, monkeypatch):
+    from ahkpy.window_message import HSHELL_WINDOWDESTROYED, _shell_hook
+
+    monkeypatch.setattr(_shell_hook, "subscribers", [])
+    monkeypatch.setattr(_shell_hook, "_register", lambda: None)
+    monkeypatch.setattr(_shell_hook, "_unregister", lambda: None)
+
+    existing = {"ahk_id 16", "ahk_id 32"}
+    fake_ahk.handlers["WinGetClass"] = lambda title, *args: "Notepad" if title in existing else ""
+    fake_ahk.handlers["WinGetTitle"] = lambda title, *args: "Untitled" if title in existing else ""
+    fake_ahk.handlers["WinExist"] = lambda title, *args: 1 if title in existing else 0
+    fake_ahk.handlers["WinGet"] = lambda cmd, title, *args: {"PID": 100, "MinMax": 0}[cmd] if title in existing else ""
+
+    def ahk_calls(cmd):
+        return sum(1 for call in fake_ahk.calls if call[0] == cmd)
+
+    win = ahk.Window(0x10)
+    cache = ahk.WindowCache(ttl=60, maxsize=1)
+    assert not cache.is_enabled
+    with cache:
+        assert cache.is_enabled
+        with pytest.raises(RuntimeError, match="already enabled"):
+            ahk.WindowCache().enable()
+
+        for _ in range(3):
+            assert win.class_name == "Notepad"
+            assert win.pid == 100
+            assert win.title == "Untitled"
+            assert win.is_restored
+        assert ahk_calls("WinGetClass") == 1
+        assert ahk_calls("WinGetTitle") == 1
+        assert cache.cache_info() == ahk.WindowCacheInfo(hits=8, misses=4, maxsize=1, currsize=1)
+
+        # Changing the window drops the mutable attributes.
+        win.minimize()
+        assert win.class_name == "Notepad"
+        assert win.title == "Untitled"
+        assert ahk_calls("WinGetClass") == 1
+        assert ahk_calls("WinGetTitle") == 2
+
+        cache.invalidate(win, "class_name")
+        assert win.class_name == "Notepad"
+        assert ahk_calls("WinGetClass") == 2
+        with pytest.raises(ValueError, match="not a cached attribute"):
+            cache.invalidate(win, "text")
+
+        # The least recently used window is dropped.
+        assert ahk.Window(0x20).class_name == "Notepad"
+        assert cache.cache_info().currsize == 1
+        assert win.class_name == "Notepad"
+        assert ahk_calls("WinGetClass") == 4
+
+        # The destroyed windows are dropped.
+        existing.discard("ahk_id 16")
+        _shell_hook.dispatch(HSHELL_WINDOWDESTROYED, 0x10)
+        assert win.class_name is None
+        # The missing attributes are not cached.
+        assert win.class_name is None
+        assert ahk_calls("WinGetClass") == 6
+        assert cache.cache_info().currsize == 0
+
+    assert not cache.is_enabled
+    assert _shell_hook.subscribers == []
+    ahk.Window(0x20).class_name
+    ahk.Window(0x20).class_name
+    assert ahk_calls("WinGetClass") == 8
+
+
+def test_window_cache_ttl(fake_ahk, monkeypatch):
+    now = 1000.0
+    monkeypatch.setattr(ahk.window.time, "monotonic", lambda: now)
+    fake_ahk.handlers["WinGet"] = lambda cmd, *args: {"Style": 0x10000000, "PID": 100}[cmd]
+    win = ahk.Window(0x10)
+    with ahk.WindowCache(ttl=0.5, track_destroyed=False) as cache:
+        assert ahk.WindowStyle.VISIBLE in win.style
+        assert win.pid == 100
+        now += 0.4
+        win.style
+        assert cache.cache_info().misses == 2
+        now += 0.2
+        win.style
+        win.pid
+        assert cache.cache_info().misses == 3
+
+        cache.invalidate()
+        assert cache.cache_info().currsize == 0
+
+    with pytest.raises(ValueError, match="ttl must not be negative"):
+        ahk.WindowCache(ttl=-1)
+    with pytest.raises(ValueError, match="maxsize must be positive"):
+        ahk.WindowCache(maxsize=0)
+
+
+def test_control_snapshot(fake_ahk):
+    from .conftest import win_snapshot_result
+
+    rows = [
+        {
+            "id": 0x100, "class_nn": "Edit1", "class_name": "Edit", "text": "line 1\r\n\tline 2",
+            "is_visible": 1, "is_enabled": 1, "is_checked": 0, "x": 0, "y": 0, "width": 200, "height": 100,
+        },
+        {
+            "id": 0x200, "class_nn": "Button1", "class_name": "Button", "text": "OK",
+            "is_visible": 1, "is_enabled": 0, "is_checked": 0, "x": 0, "y": 110, "width": 80, "height": 24,
+        },
+    ]
+
+    def win_control_snapshot(fields, title, *args):
+        if title != "ahk_id 16":
+            return ""
+        return win_snapshot_result(fields, rows)
+
+    fake_ahk.handlers["WinControlSnapshot"] = win_control_snapshot
+    win = ahk.Window(0x10)
+
+    snapshot = win.control_snapshot()
+    assert fake_ahk.calls[-1] == (
+        "WinControlSnapshot", "id,class_nn,class_name,text,is_visible,is_enabled,x,y,width,height", "ahk_id 16", "",
+    )
+    assert len(snapshot) == 2
+    assert list(snapshot) == [ahk.Control(0x100), ahk.Control(0x200)]
+    assert snapshot["Button1"] == ahk.Control(0x200)
+    assert snapshot[0] == ahk.Control(0x100)
+    assert "Edit1" in snapshot
+    assert "Edit2" not in snapshot
+    assert ahk.Control(0x200) in snapshot
+    assert snapshot.index(0x200) == 1
+    # The text with tabs and newlines is kept intact.
+    assert snapshot.row(snapshot.index("Edit1")) == {
+        "id": 0x100, "class_nn": "Edit1", "class_name": "Edit", "text": "line 1\r\n\tline 2",
+        "is_visible": True, "is_enabled": True, "x": 0, "y": 0, "width": 200, "height": 100,
+        "rect": (0, 0, 200, 100),
+    }
+    assert snapshot.row(1)["is_enabled"] is False
+    with pytest.raises(ValueError, match="'Edit2' is not in the snapshot"):
+        snapshot.index("Edit2")
+
+    snapshot = win.control_snapshot(fields="is_checked")
+    assert snapshot.fields == ("id", "is_checked")
+    assert snapshot.row(0) == {"id": 0x100, "is_checked": False}
+    with pytest.raises(KeyError, match="class_nn"):
+        snapshot["Edit1"]
+
+    with pytest.raises(ValueError, match="'title' is not a valid snapshot field"):
+        win.control_snapshot(fields=("title",))
+    assert ahk.Window(0x20).control_snapshot() is None
+
+
+def test_iter_list_items(fake_ahk):
+    rows = [[f"item {i}", f"line 1\n\tline {i}", str(i * 10)] for i in range(7)]
+
+    def get_list_view_rows(hwnd, start, count, columns):
+        if hwnd != 0x100:
+            return ""
+        columns = [int(c) for c in columns.split(",")] if columns else range(3)
+        values = [rows[i][c] for i in range(start, min(start + count, len(rows))) for c in columns]
+        return {
+            "rows": min(start + count, len(rows)) - start if start < len(rows) else 0,
+            "text": "s" + "".join(values),
+            "lengths": ",".join(str(len(v)) for v in values),
+        }
+
+    fake_ahk.handlers["ControlGetListViewRows"] = get_list_view_rows
+    control = ahk.Control(0x100)
+
+    def list_view_calls():
+        calls = [call for call in fake_ahk.calls if call[0] == "ControlGetListViewRows"]
+        fake_ahk.calls.clear()
+        return calls
+
+    assert list(control.iter_list_items(chunk=3)) == rows
+    assert [call[2:4] for call in list_view_calls()] == [(0, 3), (3, 3), (6, 3)]
+
+    assert list(control.iter_list_items(2, 5, columns=[2, 1], chunk=2)) == [
+        ["20", "line 1\n\tline 2"],
+        ["30", "line 1\n\tline 3"],
+        ["40", "line 1\n\tline 4"],
+    ]
+    assert list_view_calls() == [
+        ("ControlGetListViewRows", 0x100, 2, 2, "2,1"),
+        ("ControlGetListViewRows", 0x100, 4, 1, "2,1"),
+    ]
+
+    # The rows are read lazily.
+    items = control.iter_list_items(chunk=2)
+    assert next(items) == rows[0]
+    assert len(list_view_calls()) == 1
+    items.close()
+
+    assert list(control.iter_list_items(7)) == []
+    assert list(control.iter_list_items(3, 3)) == []
+    assert list(ahk.Control(0x200).iter_list_items()) == []
+
+    with pytest.raises(ValueError, match="must not be negative"):
+        list(control.iter_list_items(-1))
+    with pytest.raises(ValueError, match="chunk must be positive"):
+        list(control.iter_list_items(chunk=0))
+    with pytest.raises(ValueError, match="column indexes must not be negative"):
+        list(control.iter_list_items(columns=[-1]))
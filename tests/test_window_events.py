@@ -0,0 +1,149 @@
+import asyncio
+import ctypes
+
+import pytest
+
+import ahkpy as ahk
+from ahkpy.window_events import _event_source, _SHELLHOOKINFO
+from ahkpy.window_message import (
+    HSHELL_GETMINRECT,
+    HSHELL_REDRAW,
+    HSHELL_WINDOWACTIVATED,
+    HSHELL_WINDOWCREATED,
+    HSHELL_WINDOWDESTROYED,
+    _shell_hook,
+)
+from .conftest import FakeDesktop
+
+EventType = ahk.WindowEventType
+
+
+@pytest.fixture()
+def desktop(fake_ahk, monkeypatch):
+    # Don't register the shell hook window.
+    monkeypatch.setattr(_shell_hook, "subscribers", [])
+    monkeypatch.setattr(_shell_hook, "_register", lambda: None)
+    desktop = FakeDesktop(fake_ahk)
+    desktop.hook_subscribers = _shell_hook.subscribers
+    desktop.add(0x10, "Untitled - Notepad")
+    desktop.add(0x20, "Calculator", class_name="ApplicationFrameWindow", pid=300, exe="ApplicationFrameHost.exe")
+    yield desktop
+    for subscription in list(_event_source.subscriptions):
+        subscription.unsubscribe()
+
+
+def send(code, l_param):
+    _shell_hook.dispatch(code, l_param)
+
+
+def drain(subscription):
+    events = []
+    while True:
+        event = subscription.get(timeout=0)
+        if event is None:
+            return events
+        events.append((event.type, event.window.id, event.title))
+
+
+def test_events(desktop):
+    sub = ahk.window_events(ahk.windows.filter(exe="notepad.exe"))
+    assert desktop.hook_subscribers == [_event_source.handle_shell_event]
+
+    desktop.add(0x30, "Notepad")
+    send(HSHELL_WINDOWCREATED, 0x30)
+    send(HSHELL_WINDOWACTIVATED, 0x30)
+    send(HSHELL_WINDOWACTIVATED, 0x20)  # Not matching
+
+    # Redraw without changing the title is not an event.
+    send(HSHELL_REDRAW, 0x30)
+    desktop.windows[0x30]["title"] = "notes.txt - Notepad"
+    send(HSHELL_REDRAW, 0x30)
+    desktop.windows[0x10]["title"] = "readme.txt - Notepad"
+    send(HSHELL_REDRAW, 0x10)
+
+    info = _SHELLHOOKINFO(hwnd=0x30)
+    desktop.windows[0x30]["min_max"] = -1
+    send(HSHELL_GETMINRECT, ctypes.addressof(info))
+    desktop.windows[0x30]["min_max"] = 0
+    send(HSHELL_GETMINRECT, ctypes.addressof(info))
+
+    del desktop.windows[0x30]
+    send(HSHELL_WINDOWDESTROYED, 0x30)
+    del desktop.windows[0x20]
+    send(HSHELL_WINDOWDESTROYED, 0x20)  # Not matching
+
+    assert drain(sub) == [
+        (EventType.CREATED, 0x30, "Notepad"),
+        (EventType.ACTIVATED, 0x30, "Notepad"),
+        (EventType.TITLE_CHANGED, 0x30, "notes.txt - Notepad"),
+        (EventType.TITLE_CHANGED, 0x10, "readme.txt - Notepad"),
+        (EventType.MINIMIZED, 0x30, "notes.txt - Notepad"),
+        (EventType.RESTORED, 0x30, "notes.txt - Notepad"),
+        (EventType.DESTROYED, 0x30, "notes.txt - Notepad"),
+    ]
+
+    sub.unsubscribe()
+    assert not sub.is_active
+    assert desktop.hook_subscribers == []
+    assert sub.get() is None
+    assert list(sub) == []
+
+
+def test_subscriber_filtering(desktop):
+    calculator_events = []
+    notepad = ahk.window_events(ahk.windows.filter(class_name="Notepad"))
+    calculator = ahk.window_events(ahk.windows.filter("Calc"), calculator_events.append)
+    assert len(desktop.hook_subscribers) == 1
+
+    send(HSHELL_WINDOWACTIVATED, 0x20)
+    send(HSHELL_WINDOWACTIVATED, 0x10)
+    # The window stops matching the query.
+    desktop.windows[0x20]["class_name"] = "Other"
+    desktop.windows[0x10]["class_name"] = "Other"
+    send(HSHELL_REDRAW, 0x10)
+    send(HSHELL_WINDOWDESTROYED, 0x10)
+
+    assert drain(notepad) == [(EventType.ACTIVATED, 0x10, "Untitled - Notepad")]
+    assert [(e.type, e.window.id) for e in calculator_events] == [(EventType.ACTIVATED, 0x20)]
+
+    calculator.unsubscribe()
+    assert len(desktop.hook_subscribers) == 1
+    notepad.unsubscribe()
+    assert desktop.hook_subscribers == []
+
+
+def test_overflow(desktop):
+    sub = ahk.window_events(max_queue=2)
+    for _ in range(5):
+        send(HSHELL_WINDOWACTIVATED, 0x10)
+    assert sub.get(timeout=0).type is EventType.ACTIVATED
+    # New events are dropped until the queue is drained.
+    send(HSHELL_WINDOWACTIVATED, 0x20)
+    assert sub.get(timeout=0).type is EventType.ACTIVATED
+    overflow = sub.get(timeout=0)
+    assert overflow.type is EventType.OVERFLOW
+    assert overflow.window == ahk.Window(None)
+    assert overflow.dropped == 4
+    assert sub.get(timeout=0) is None
+
+    send(HSHELL_WINDOWACTIVATED, 0x20)
+    assert drain(sub) == [(EventType.ACTIVATED, 0x20, "Calculator")]
+
+    with pytest.raises(ValueError, match="max_queue must be positive"):
+        ahk.window_events(max_queue=0)
+    with pytest.raises(TypeError, match="callback must be callable"):
+        ahk.window_events(ahk.windows, "not callable")
+
+
+def test_async_iterator(desktop):
+    async def main():
+        events = []
+        sub = ahk.window_events()
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.01, send, HSHELL_WINDOWACTIVATED, 0x10)
+        loop.call_later(0.02, sub.unsubscribe)
+        async for event in sub:
+            events.append((event.type, event.window.id))
+        return events
+
+    assert asyncio.run(main()) == [(EventType.ACTIVATED, 0x10)]
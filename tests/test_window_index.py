@@ -0,0 +1,127 @@
+import pytest
+
+import ahkpy as ahk
+from ahkpy.window_message import (
+    HSHELL_REDRAW,
+    HSHELL_RUDEAPPACTIVATED,
+    HSHELL_WINDOWACTIVATED,
+    HSHELL_WINDOWCREATED,
+    HSHELL_WINDOWDESTROYED,
+)
+from .conftest import win_snapshot_result
+
+
+class FakeDesktop:
+    def __init__(self, fake_ahk):
+        self.windows = {}
+        self.active = 0
+        self.snapshots = []
+        fake_ahk.handlers["WinSnapshot"] = self.win_snapshot
+        fake_ahk.handlers["WinExist"] = lambda title, *args: self.active if title == "A" else 0
+
+    def add(self, win_id, title, class_name="Notepad", pid=100, exe="notepad.exe"):
+        self.windows[win_id] = {
+            "id": win_id, "title": title, "class_name": class_name, "pid": pid, "process_name": exe,
+        }
+
+    def win_snapshot(self, fields, title, *query):
+        self.snapshots.append(title)
+        rows = list(self.windows.values())
+        if title.startswith("ahk_id "):
+            win_id = int(title[len("ahk_id "):])
+            rows = [row for row in rows if row["id"] == win_id]
+        return win_snapshot_result(fields, rows)
+
+
+@pytest.fixture()
+def desktop(fake_ahk):
+    desktop = FakeDesktop(fake_ahk)
+    desktop.add(0x10, "Untitled - Notepad")
+    desktop.add(0x20, "notes.txt - Notepad", pid=200, exe="Notepad.exe")
+    desktop.add(0x30, "Calculator", class_name="ApplicationFrameWindow", pid=300, exe="ApplicationFrameHost.exe")
+    desktop.active = 0x10
+    return desktop
+
+
+@pytest.fixture()
+def index(desktop):
+    index = ahk.WindowIndex(reconcile_interval=None)
+    assert index.reconcile() == 3
+    return index
+
+
+def test_lookups(desktop, index):
+    assert len(index) == 3
+    assert list(index) == [ahk.Window(0x10), ahk.Window(0x20), ahk.Window(0x30)]
+    assert ahk.Window(0x20) in index
+    assert index.get(0x20) == {
+        "id": 0x20, "title": "notes.txt - Notepad", "class_name": "Notepad", "pid": 200,
+        "process_name": "Notepad.exe",
+    }
+    assert index.get(0x99) is None
+    assert index.by_exe("NOTEPAD.EXE") == [ahk.Window(0x10), ahk.Window(0x20)]
+    assert index.by_pid(300) == [ahk.Window(0x30)]
+    assert index.by_class("Notepad") == [ahk.Window(0x10), ahk.Window(0x20)]
+    assert index.by_class("Foo") == []
+    assert index.first(class_name="Notepad", pid=200) == ahk.Window(0x20)
+    assert index.first(class_name="Notepad", pid=300) == ahk.Window(None)
+    assert index.first() == ahk.Window(0x10)
+    assert index.active == ahk.Window(0x10)
+
+    # Lookups don't call AHK.
+    snapshots = len(desktop.snapshots)
+    index.by_exe("notepad.exe")
+    index.first(pid=100)
+    assert len(desktop.snapshots) == snapshots
+
+
+def test_shell_events(desktop, index):
+    desktop.add(0x40, "Paint", class_name="MSPaintApp", pid=400, exe="mspaint.exe")
+    index.handle_shell_event(HSHELL_WINDOWCREATED, 0x40)
+    assert desktop.snapshots[-1] == "ahk_id 64"
+    assert index.by_exe("mspaint.exe") == [ahk.Window(0x40)]
+
+    desktop.windows[0x40]["title"] = "picture.png - Paint"
+    index.handle_shell_event(HSHELL_REDRAW, 0x40)
+    assert index.get(0x40)["title"] == "picture.png - Paint"
+
+    index.handle_shell_event(HSHELL_WINDOWACTIVATED, 0x40)
+    assert index.active == ahk.Window(0x40)
+    snapshots = len(desktop.snapshots)
+    index.handle_shell_event(HSHELL_RUDEAPPACTIVATED, 0x20)
+    assert index.active == ahk.Window(0x20)
+    # Activating a known window doesn't call AHK.
+    assert len(desktop.snapshots) == snapshots
+    index.handle_shell_event(HSHELL_WINDOWACTIVATED, 0)
+    assert index.active == ahk.Window(None)
+
+    del desktop.windows[0x40]
+    index.handle_shell_event(HSHELL_WINDOWDESTROYED, 0x40)
+    assert 0x40 not in index
+    assert index.by_exe("mspaint.exe") == []
+    assert index.by_pid(400) == []
+
+    # The window is destroyed before the index gets the created event.
+    index.handle_shell_event(HSHELL_WINDOWCREATED, 0x50)
+    assert 0x50 not in index
+
+
+def test_reconcile(desktop, index):
+    # The events of these changes are missed.
+    del desktop.windows[0x10]
+    desktop.windows[0x20]["class_name"] = "Notepad2"
+    desktop.add(0x40, "Paint", class_name="MSPaintApp", pid=400, exe="mspaint.exe")
+    desktop.active = 0x40
+
+    assert index.reconcile() == 3
+    assert set(index) == {ahk.Window(0x20), ahk.Window(0x30), ahk.Window(0x40)}
+    assert index.by_exe("notepad.exe") == [ahk.Window(0x20)]
+    assert index.by_class("Notepad") == []
+    assert index.by_class("Notepad2") == [ahk.Window(0x20)]
+    assert index.active == ahk.Window(0x40)
+    assert index.reconcile() == 0
+
+
+def test_invalid_interval():
+    with pytest.raises(ValueError, match="reconcile_interval must be positive"):
+        ahk.WindowIndex(reconcile_interval=0)
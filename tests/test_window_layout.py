@@ -0,0 +1,82 @@
+import pytest
+
+import ahkpy as ahk
+
+
+@pytest.fixture()
+def desktop(fake_ahk):
+    rects = {
+        0x10: (0, 0, 800, 600),
+        0x20: (100, 100, 400, 300),
+        0x30: (0, 0, 1920, 1080),
+    }
+
+    def win_get_rects(ids):
+        result = []
+        for win_id in map(int, ids.split(",")):
+            if win_id in rects:
+                result.extend((win_id, *rects[win_id]))
+        return ",".join(map(str, result))
+
+    def win_apply_layout(moves, delay):
+        ids = moves.split(",")[::5]
+        return "s" + ",".join(win_id for win_id in ids if int(win_id) in rects)
+
+    fake_ahk.handlers["WinGetRects"] = win_get_rects
+    fake_ahk.handlers["WinApplyLayout"] = win_apply_layout
+    return fake_ahk
+
+
+def layout_calls(fake_ahk):
+    return [call[1:] for call in fake_ahk.calls if call[0] == "WinApplyLayout"]
+
+
+def test_apply_layout(desktop, settings):
+    settings.win_delay = 0.05
+    moved = ahk.apply_layout({
+        ahk.Window(0x10): (0, 0, 960, 1080),
+        0x20: ahk.WindowRect(100, 100, 400, 300),  # Already in place
+        ahk.Window(0x30): (None, 50, None, None),
+        0x40: (0, 0, 100, 100),  # Doesn't exist
+        ahk.Window(None): (0, 0, 100, 100),
+    })
+    assert moved == [ahk.Window(0x10), ahk.Window(0x30)]
+    assert layout_calls(desktop) == [("16,0,0,960,1080,48,0,50,1920,1080", 50)]
+    # The rects are read and applied in two calls without setting the delay.
+    assert desktop.crossings == 2
+    assert [call[0] for call in desktop.calls] == ["WinGetRects", "WinApplyLayout"]
+
+
+def test_nothing_to_move(desktop):
+    assert ahk.apply_layout({}) == []
+    assert ahk.apply_layout({0x10: (0, 0, 800, 600)}) == []
+    assert layout_calls(desktop) == []
+
+
+def test_skip_unchanged(desktop, settings):
+    settings.win_delay = None
+    # The current rects are not needed. AHK skips the window that doesn't
+    # exist.
+    moved = ahk.apply_layout({0x10: (0, 0, 800, 600), 0x40: (1, 2, 3, 4)}, skip_unchanged=False)
+    assert moved == [ahk.Window(0x10)]
+    assert desktop.calls == [("WinApplyLayout", "16,0,0,800,600,64,1,2,3,4", -1)]
+
+    desktop.calls.clear()
+    assert ahk.apply_layout({0x40: (1, 2, 3, 4)}, skip_unchanged=False) == []
+    assert desktop.calls == [("WinApplyLayout", "64,1,2,3,4", -1)]
+
+
+def test_invalid_layout(desktop):
+    with pytest.raises(TypeError, match="must be a mapping"):
+        ahk.apply_layout([(ahk.Window(0x10), (0, 0, 1, 1))])
+    with pytest.raises(TypeError, match="controls cannot be moved"):
+        ahk.apply_layout({ahk.Control(0x10): (0, 0, 1, 1)})
+    with pytest.raises(TypeError, match="windows or window ids"):
+        ahk.apply_layout({"Notepad": (0, 0, 1, 1)})
+    with pytest.raises(TypeError, match="must be a"):
+        ahk.apply_layout({0x10: 5})
+    with pytest.raises(ValueError, match="must have 4 values"):
+        ahk.apply_layout({0x10: (0, 0)})
+    with pytest.raises(ValueError, match="must not be negative"):
+        ahk.apply_layout({0x10: (0, 0, -1, None)})
+    assert desktop.calls == []
@@ -0,0 +1,151 @@
+import pytest
+
+import ahkpy as ahk
+
+
+VISIBLE = int(ahk.WindowStyle.VISIBLE)
+
+
+@pytest.fixture()
+def snapshot():
+    return ahk.WindowSnapshot({
+        "id": [0x10, 0x20, 0x30, 0x40, 0x50],
+        "title": ["Untitled - Notepad", "*notes.txt - Notepad", "Calculator", "", "Hidden Notepad"],
+        "class_name": ["Notepad", "Notepad", "ApplicationFrameWindow", "Shell_TrayWnd", "Notepad"],
+        "pid": [100, 200, 300, 400, 100],
+        "process_name": ["notepad.exe", "Notepad.exe", "ApplicationFrameHost.exe", "explorer.exe", "notepad.exe"],
+        "process_path": [
+            r"C:\Windows\System32\notepad.exe",
+            r"C:\Windows\System32\notepad.exe",
+            r"C:\Windows\System32\ApplicationFrameHost.exe",
+            r"C:\Windows\explorer.exe",
+            r"C:\Windows\System32\notepad.exe",
+        ],
+        "style": [VISIBLE, VISIBLE, VISIBLE, VISIBLE, 0],
+    })
+
+
+def ids(query, snapshot):
+    return [snapshot.column("id")[i] for i in query.select(snapshot)]
+
+
+def test_title_modes(snapshot):
+    query = ahk.windows.query()
+    assert ids(query, snapshot) == [0x10, 0x20, 0x30, 0x40]
+    assert ids(query.filter("Untitled"), snapshot) == [0x10]
+    assert ids(query.filter("Notepad", match="contains"), snapshot) == [0x10, 0x20]
+    assert ids(query.filter("notepad", match="contains"), snapshot) == []
+    assert ids(query.filter("Calculator", match="exact"), snapshot) == [0x30]
+    assert ids(query.filter("Calc", match="exact"), snapshot) == []
+    assert ids(query.filter(r"^\*.* - Notepad$", match="regex"), snapshot) == [0x20]
+    assert ids(query.filter(r"i)^untitled", match="regex"), snapshot) == [0x10]
+
+    with pytest.raises(ValueError, match="not supported"):
+        query.filter("U)a+", match="regex").select(snapshot)
+    with pytest.raises(ValueError, match="invalid regex"):
+        query.filter("(", match="regex").select(snapshot)
+    with pytest.raises(ValueError, match="keyword arguments"):
+        query.filter("ahk_class Notepad").select(snapshot)
+
+
+def test_criteria(snapshot):
+    query = ahk.windows.query()
+    assert ids(query.filter(class_name="Notepad"), snapshot) == [0x10, 0x20]
+    assert ids(query.filter(class_name="^App", match="regex"), snapshot) == [0x30]
+    assert ids(query.filter(id=0x20), snapshot) == [0x20]
+    assert ids(query.filter(id=None), snapshot) == []
+    assert ids(query.filter(pid=300), snapshot) == [0x30]
+    assert ids(query.filter(exe="NOTEPAD.EXE"), snapshot) == [0x10, 0x20]
+    assert ids(query.filter(exe=r"C:\Windows\explorer.exe"), snapshot) == [0x40]
+    assert ids(query.filter(exe=r"\\System32\\", match="regex"), snapshot) == [0x10, 0x20, 0x30]
+    assert ids(query.include_hidden_windows().filter(pid=100), snapshot) == [0x10, 0x50]
+
+
+def test_callables(snapshot):
+    query = ahk.windows.query()
+    assert ids(query.filter(lambda title: title.endswith("Notepad")), snapshot) == [0x10, 0x20]
+    assert ids(query.filter(pid=lambda pid: pid >= 300), snapshot) == [0x30, 0x40]
+    assert ids(query.where(lambda row: row["class_name"] != "Notepad"), snapshot) == [0x30, 0x40]
+    assert ids(query.where(lambda row: ahk.WindowStyle.VISIBLE in row["style"]), snapshot) == [0x10, 0x20, 0x30, 0x40]
+
+
+def test_exclude(snapshot):
+    query = ahk.windows.query()
+    assert ids(query.exclude(class_name="Notepad"), snapshot) == [0x30, 0x40]
+    assert ids(query.exclude(id=0x10).exclude(pid=400), snapshot) == [0x20, 0x30]
+    assert ids(query.exclude(exe="notepad.exe", title="*", match="startswith"), snapshot) == [0x10, 0x30, 0x40]
+    assert ids(query.exclude(title=lambda title: not title), snapshot) == [0x10, 0x20, 0x30]
+    # Windows.exclude() criteria are also compiled.
+    assert ids(ahk.windows.exclude("Calc").query(), snapshot) == [0x10, 0x20, 0x40]
+
+    with pytest.raises(ValueError, match="cannot be combined"):
+        query.exclude(title="Calc", text="OK")
+
+
+def test_missing_fields(snapshot):
+    query = ahk.windows.query().filter(exe=r"C:\Windows\explorer.exe")
+    assert "process_path" in query.fields
+    small = ahk.WindowSnapshot({"id": [1], "style": [VISIBLE]})
+    with pytest.raises(ValueError, match="process_path"):
+        query.select(small)
+
+
+def test_text_criteria(fake_ahk, snapshot):
+    fake_ahk.handlers["WinExist"] = lambda title, text, *exclude: 0x20 if title == "ahk_id 32" else 0
+    query = ahk.windows.query().filter(exe="notepad.exe", text="Save")
+    assert ids(query, snapshot) == [0x20]
+    # Only the windows that matched the other criteria are checked with AHK.
+    assert [call[1] for call in fake_ahk.calls if call[0] == "WinExist"] == ["ahk_id 16", "ahk_id 32"]
+
+
+def test_active_window(fake_ahk, snapshot):
+    fake_ahk.handlers["WinExist"] = lambda title, *args: 0x30 if title == "A" else 0
+    assert ids(ahk.windows.query().filter("A"), snapshot) == [0x30]
+
+
+def test_shared_snapshot(fake_ahk):
+    ahk.WindowQuery.clear_cache()
+
+    def win_snapshot(fields, *query):
+        fields = fields.split(",")
+        row = {
+            "id": 0x10, "title": "Notepad", "class_name": "Notepad", "pid": 100, "process_name": "notepad.exe",
+            "process_path": r"C:\Windows\notepad.exe", "style": VISIBLE,
+        }
+        result = {}
+        for field in fields:
+            value = row[field]
+            if isinstance(value, str):
+                result[field] = f"s{value}"
+                result[f"{field}_len"] = len(value)
+            else:
+                result[field] = value
+        return result
+
+    fake_ahk.handlers["WinSnapshot"] = win_snapshot
+
+    def snapshot_calls():
+        return sum(1 for call in fake_ahk.calls if call[0] == "WinSnapshot")
+
+    query = ahk.WindowQuery(max_age=10)
+    assert query.filter("Notepad").first() == ahk.Window(0x10)
+    assert len(query.filter(class_name="Notepad")) == 1
+    assert list(query.filter(pid=200)) == []
+    assert query.filter(pid=200).last() == ahk.Window(None)
+    assert snapshot_calls() == 1
+
+    # The query that needs more fields takes a new snapshot.
+    assert query.filter(exe=r"C:\Windows\notepad.exe").exist() == ahk.Window(0x10)
+    assert snapshot_calls() == 2
+    assert query.filter("Notepad").exist() == ahk.Window(0x10)
+    assert snapshot_calls() == 2
+
+    ahk.WindowQuery.clear_cache()
+    assert query.filter("Notepad").exist() == ahk.Window(0x10)
+    assert snapshot_calls() == 3
+
+    # The outdated snapshot is not reused.
+    query = ahk.WindowQuery(max_age=0)
+    query.first()
+    query.first()
+    assert snapshot_calls() == 5
@@ -0,0 +1,122 @@
+import pytest
+
+import ahkpy as ahk
+from .conftest import win_snapshot_result
+
+
+W = ahk.Window
+
+
+@pytest.fixture()
+def index():
+    # Ordered from top to bottom.
+    return ahk.WindowSpatialIndex([
+        (0x10, (100, 100, 200, 200)),
+        (W(0x20), (0, 0, 1920, 1080)),
+        (0x30, (1920, 0, 1920, 1080)),
+        (0x40, (400, 100, 200, 200)),
+        (0x50, (100, 500, 200, 200)),
+    ], cell_size=100)
+
+
+def test_queries(index):
+    assert len(index) == 5
+    assert list(index) == [W(0x10), W(0x20), W(0x30), W(0x40), W(0x50)]
+    assert 0x30 in index and W(0x30) in index and 0x99 not in index
+    assert index.rect(W(0x10)) == ahk.WindowRect(100, 100, 200, 200)
+    assert index.rect(0x99) is None
+
+    assert index.at_point(150, 150) == [W(0x10), W(0x20)]
+    assert index.at_point(300, 300) == [W(0x20)]  # Right/bottom edges are exclusive
+    assert index.at_point(1920, 0) == [W(0x30)]
+    assert index.at_point(-1, -1) == []
+
+    assert index.intersecting((1900, 0, 40, 10)) == [W(0x20), W(0x30)]
+    assert index.intersecting((0, 0, 4000, 4000)) == list(index)
+    assert index.intersecting((300, 100, 100, 100)) == [W(0x20)]
+    assert index.contained_in((0, 0, 1920, 1080)) == [W(0x10), W(0x20), W(0x40), W(0x50)]
+    assert index.contained_in((100, 100, 500, 200)) == [W(0x10), W(0x40)]
+
+    with pytest.raises(ValueError, match="must have 4 values"):
+        index.intersecting((0, 0))
+    with pytest.raises(TypeError, match="must be a"):
+        index.contained_in(None)
+
+
+def test_nearest(index):
+    assert index.nearest("right", 0x10) == W(0x40)
+    assert index.nearest("down", W(0x10)) == W(0x50)
+    assert index.nearest("left", 0x40) == W(0x10)
+    assert index.nearest("up", 0x50) == W(0x10)
+    assert index.nearest("left", 0x10) == W(None)
+    assert index.nearest("right", (3000, 0, 10, 10)) == W(None)
+    # The z-order breaks the tie.
+    index.update(0x60, (400, 100, 200, 200))
+    assert index.nearest("right", 0x10) == W(0x60)
+    with pytest.raises(ValueError, match="not a valid direction"):
+        index.nearest("forward", 0x10)
+
+
+def test_nearest_active(index, fake_ahk):
+    fake_ahk.handlers["WinActive"] = lambda *args: 0x40
+    assert index.nearest("left") == W(0x10)
+    fake_ahk.handlers["WinActive"] = lambda *args: 0
+    assert index.nearest("left") == W(None)
+
+
+def test_updates(index):
+    index.update(0x10, (2000, 100, 200, 200))
+    assert index.at_point(150, 150) == [W(0x20)]
+    assert index.at_point(2050, 150) == [W(0x10), W(0x30)]
+    assert list(index)[0] == W(0x10)
+
+    index.raise_window(0x30)
+    assert index.at_point(2050, 150) == [W(0x30), W(0x10)]
+    index.raise_window(0x99)
+
+    index.update(W(0x70), (2000, 100, 10, 10))
+    assert index.at_point(2005, 105) == [W(0x70), W(0x30), W(0x10)]
+
+    index.remove(0x30)
+    index.remove(0x99)
+    assert index.at_point(2050, 150) == [W(0x10)]
+    assert len(index) == 5
+    assert not index._cells.get((25, 0))
+
+    with pytest.raises(ValueError, match="nonexistent window"):
+        index.update(W(None), (0, 0, 1, 1))
+    with pytest.raises(ValueError, match="cell_size must be positive"):
+        ahk.WindowSpatialIndex(cell_size=0)
+
+
+def test_refresh(index, fake_ahk):
+    rects = {0x10: (500, 500, 100, 100), 0x20: (0, 0, 1920, 1080), 0x40: (400, 100, 200, 200), 0x50: (0, 0, 10, 10)}
+    requested = []
+
+    def get_rects(ids):
+        requested.append(ids)
+        return ",".join(
+            ",".join(map(str, (win_id, *rects[win_id])))
+            for win_id in map(int, ids.split(","))
+            if win_id in rects
+        )
+
+    fake_ahk.handlers["WinGetRects"] = get_rects
+    assert index.refresh(0x10, W(0x30)) == 2
+    assert requested == ["16,48"]
+    assert index.rect(0x10) == (500, 500, 100, 100)
+    assert 0x30 not in index
+    assert index.refresh() == 1
+    assert index.at_point(5, 5) == [W(0x20), W(0x50)]
+
+
+def test_spatial_index(fake_ahk):
+    rows = [
+        {"id": 0x10, "x": 0, "y": 0, "width": 100, "height": 100, "min_max": 0},
+        {"id": 0x20, "x": -32000, "y": -32000, "width": 160, "height": 28, "min_max": -1},
+        {"id": 0x30, "x": 50, "y": 50, "width": 100, "height": 100, "min_max": 1},
+    ]
+    fake_ahk.handlers["WinSnapshot"] = lambda fields, *query: win_snapshot_result(fields, rows)
+    index = ahk.windows.spatial_index()
+    assert list(index) == [W(0x10), W(0x30)]
+    assert index.at_point(60, 60) == [W(0x10), W(0x30)]